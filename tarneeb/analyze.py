@@ -0,0 +1,340 @@
+"""Post-game analysis: what every card play and bid cost against the best choice.
+
+Run from the repository root with for example
+
+    python -m tarneeb.simulate -n 1 -w 1 --record game.rec
+    python -m tarneeb.analyze game.rec
+    python -m tarneeb.analyze game.rec --depth 8 --no-bids -w 8 --cache analysis.db
+
+Rounds come from a record file (see ``records``) or, with ``round_from_game``,
+from a ``TarneebGame`` whose round has just been played out. Each round is
+replayed trick by trick and every decision is scored double dummy, with all
+four hands visible:
+
+  * a card play by the tricks the player's team then takes from the current
+    trick on, against the best legal card;
+  * a bid (unless ``bids=False``) by the points the bidder's team nets from the
+    round against the best bid or pass it could have made. Later bids are
+    kept where they are still legal and become passes otherwise, and the
+    contract is played out double dummy.
+
+By default every decision is analysed. Full deals are the expensive part
+(a few tenths of a second per solve with the compiled solver core, seconds
+without it), so ``depth`` can limit the card play to the last tricks of a
+round and ``bids=False`` skips the bids, which need a full-deal solve for
+every trump suit. Reports say what was left out (see ``not_analysed``).
+
+The positions to solve are reduced to their canonical form (see
+``canonical``) and spread over a process pool. Every worker keeps one solver
+whose transposition table then serves all rounds and trump suits. Results are
+cached per canonical position, in memory and optionally in a shared file, so
+repeated analyses are answered without solving anything.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import canonical
+import records
+from card import Card
+from decisions import DecisionCache
+from solver import DoubleDummySolver
+from state import COMPLETE, GameState, bid_move
+
+# Card plays are analysed exactly in the last DEFAULT_DEPTH tricks of a round
+DEFAULT_DEPTH = 13
+
+# Canonical positions always have trump suit 0
+_solver = None
+
+
+def solve(task):
+    """Solve one canonical position (worker entry point).
+
+    ``("moves", hands, trick, leader)`` gives the tricks of every legal card
+    as ``((card_id, tricks), ...)`` and ``("tricks", hands, leader)`` the
+    tricks of both teams.
+    """
+    global _solver
+    if _solver is None:
+        _solver = DoubleDummySolver(Card.SUITS[0])
+    if task[0] == "moves":
+        _, hands, trick, leader = task
+        return tuple(sorted(_solver.solve_moves(hands, leader, trick).items()))
+    _, hands, leader = task
+    return _solver.solve(hands, leader)
+
+
+def _cards_left(task):
+    return sum(bin(hand).count("1") for hand in task[1])
+
+
+def round_from_game(game):
+    """The round ``game`` has just played out, as ``records.decode_round`` gives it.
+
+    Must be called before the round is scored (from a recorder, say), while
+    ``play_history`` and ``trick_winners`` still describe it.
+    """
+    return records.decode_round(records.encode_round(game))
+
+
+def play_points(round_info, depth=DEFAULT_DEPTH):
+    """Decision points of the card play, with their canonical solver tasks.
+
+    Returns a list of ``(trick, seat, card_id, task, relabeling)`` for the
+    plays of the last ``depth`` tricks.
+    """
+    trump = Card.SUIT_INDEX[round_info["trump"]]
+    hands = [sum(1 << card_id for card_id in cards) for cards in round_info["deal"]]
+    state = GameState(hands, round_info["dealer"])
+    for i in range(4):
+        seat = (state.dealer + 1 + i) % 4
+        suit = trump if seat == round_info["bidder"] else 0
+        state.apply(bid_move(round_info["bids"][seat], suit))
+
+    points = []
+    for i, (seat, card_id) in enumerate(round_info["plays"]):
+        trick_number = i // 4
+        if 13 - trick_number <= depth:
+            position, relabeling = canonical.canonicalize(state.hands, state.trump, state.lead, state.trick)
+            order = tuple(position.trick[(state.leader + j) % 4] for j in range(i % 4))
+            task = ("moves", position.hands, order, state.leader)
+            points.append((trick_number + 1, seat, card_id, task, relabeling))
+        state.apply(card_id)
+        if i % 4 == 3:
+            state.apply(COMPLETE)
+    return points
+
+
+def trick_tasks(round_info):
+    """Canonical tasks giving the double-dummy tricks of the deal with each trump suit."""
+    hands = [sum(1 << card_id for card_id in cards) for cards in round_info["deal"]]
+    leader = (round_info["dealer"] + 1) % 4
+    tasks = []
+    for trump in range(4):
+        position, _ = canonical.canonicalize(hands, trump)
+        tasks.append(("tricks", position.hands, leader))
+    return tasks
+
+
+def net_points(team, bidder, bid, trump, tricks):
+    """Points ``team`` gains over the other team when ``bidder`` plays ``bid`` in ``trump``."""
+    won = tricks[trump]
+    bidding_team = bidder % 2
+    points = [won[0], won[1]]
+    if points[bidding_team] < bid:
+        points[bidding_team] = -bid
+    return points[team] - points[1 - team]
+
+
+def auction(round_info, index, choice, tricks):
+    """Final ``(bidder, bid, trump)`` when the ``index``-th bid is replaced by ``choice``.
+
+    ``choice`` is ``(bid, trump)`` with 0 for a pass. Later bids that are no
+    longer high enough become passes, and a winning bid with no recorded
+    trump gets the suit its team does best in.
+    """
+    dealer = round_info["dealer"]
+    highest, bidder, trump = 0, -1, None
+    for i in range(4):
+        seat = (dealer + 1 + i) % 4
+        if i == index:
+            bid, suit = choice
+        else:
+            bid = round_info["bids"][seat]
+            suit = Card.SUIT_INDEX[round_info["trump"]] if seat == round_info["bidder"] else None
+        if bid > highest:
+            highest, bidder, trump = bid, seat, suit
+    if bidder < 0:
+        # Everyone passed: the dealer takes 7, in the recorded trump when that
+        # happened in the game and in the best suit for the dealer otherwise
+        if round_info["forced"]:
+            trump = Card.SUIT_INDEX[round_info["trump"]]
+        else:
+            trump = max(range(4), key=lambda t: net_points(dealer % 2, dealer, 7, t, tricks))
+        return dealer, 7, trump
+    if trump is None:
+        # An outbid seat that wins once the later bid is taken back never
+        # named a trump, so it gets the suit that suits its team best
+        trump = max(range(4), key=lambda t: net_points(bidder % 2, bidder, highest, t, tricks))
+    return bidder, highest, trump
+
+
+def bid_report(round_info, tricks):
+    """Cost in points of every bid of a round, given the double-dummy tricks per trump suit."""
+    dealer = round_info["dealer"]
+    report = []
+    highest = 0
+    for i in range(4):
+        seat = (dealer + 1 + i) % 4
+        team = seat % 2
+        actual = round_info["bids"][seat]
+        suit = Card.SUIT_INDEX[round_info["trump"]] if seat == round_info["bidder"] else 0
+        chosen = net_points(team, *auction(round_info, i, (actual, suit), tricks), tricks)
+
+        best, best_choice = None, None
+        choices = [(0, 0)] + [(bid, t) for bid in range(max(highest + 1, 7), 14) for t in range(4)]
+        for choice in choices:
+            value = net_points(team, *auction(round_info, i, choice, tricks), tricks)
+            if best is None or value > best:
+                best, best_choice = value, choice
+        report.append({
+            "seat": seat,
+            "bid": actual,
+            "points": chosen,
+            "best": best,
+            "best_bid": (f"{best_choice[0]} {Card.SUITS[best_choice[1]]}" if best_choice[0] else "pass"),
+            "cost": best - chosen,
+        })
+        highest = max(highest, actual)
+    return report
+
+
+def not_analysed(depth, bids):
+    """The decisions an analysis with ``depth`` and ``bids`` leaves out, for reports."""
+    skipped = []
+    if depth < 12:
+        skipped.append(f"card plays of tricks 1-{13 - depth}")
+    elif depth == 12:
+        skipped.append("card plays of trick 1")
+    if not bids:
+        skipped.append("bids")
+    return skipped
+
+
+def analyze_rounds(rounds, depth=DEFAULT_DEPTH, bids=True, workers=None, cache=None):
+    """Analyse decoded rounds; returns one report dictionary per round.
+
+    ``cache`` is a ``DecisionCache`` for the solved positions; a fresh one
+    is used when it is None.
+    """
+    workers = workers or os.cpu_count() or 1
+    cache = cache if cache is not None else DecisionCache()
+    points = [play_points(round_info, depth) for round_info in rounds]
+    tasks = [task for round_points in points for _, _, _, task, _ in round_points]
+    if bids:
+        tasks += [task for round_info in rounds for task in trick_tasks(round_info)]
+
+    # Solve the positions that are not cached yet, the slowest first
+    missing = sorted({task for task in tasks if cache.get(task) is None}, key=_cards_left, reverse=True)
+    if workers == 1 or len(missing) < 2:
+        for task in missing:
+            cache.put(task, solve(task))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for task, result in zip(missing, pool.map(solve, missing, chunksize=4)):
+                cache.put(task, result)
+    cache.flush()
+
+    reports = []
+    for round_info, round_points in zip(rounds, points):
+        plays = []
+        for trick, seat, card_id, task, relabeling in round_points:
+            values = {relabeling.restore_card(card): tricks for card, tricks in cache.get(task)}
+            best = max(values.values())
+            plays.append({
+                "trick": trick,
+                "seat": seat,
+                "card": str(Card.from_id(card_id)),
+                "tricks": values[card_id],
+                "best": best,
+                "best_cards": [str(Card.from_id(card)) for card in sorted(values) if values[card] == best],
+                "cost": best - values[card_id],
+            })
+        report = {
+            "dealer": round_info["dealer"],
+            "contract": f"{round_info['bid']} {round_info['trump']} by seat {round_info['bidder']}",
+            "analysed_from_trick": 14 - depth if depth < 13 else 1,
+            "plays": plays,
+        }
+        if bids:
+            tricks = [cache.get(task) for task in trick_tasks(round_info)]
+            report["double_dummy_tricks"] = {Card.SUITS[t]: list(tricks[t]) for t in range(4)}
+            report["bids"] = bid_report(round_info, tricks)
+        reports.append(report)
+    return reports
+
+
+def summarize(reports):
+    """Per-seat totals: decisions analysed, costly ones and what they cost."""
+    seats = [{"plays": 0, "costly_plays": 0, "tricks_lost": 0, "bids": 0, "costly_bids": 0, "points_lost": 0}
+             for _ in range(4)]
+    for report in reports:
+        for play in report["plays"]:
+            seat = seats[play["seat"]]
+            seat["plays"] += 1
+            seat["costly_plays"] += play["cost"] > 0
+            seat["tricks_lost"] += play["cost"]
+        for bid in report.get("bids", ()):
+            seat = seats[bid["seat"]]
+            seat["bids"] += 1
+            seat["costly_bids"] += bid["cost"] > 0
+            seat["points_lost"] += bid["cost"]
+    return seats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find the costly bids and card plays of recorded Tarneeb rounds.")
+    parser.add_argument("record", help="record file written by simulate.py --record")
+    parser.add_argument("-r", "--rounds", default=None, metavar="START:STOP",
+                        help="slice of rounds to analyse (default: all)")
+    parser.add_argument("-d", "--depth", type=int, default=DEFAULT_DEPTH,
+                        help="analyse the card play of this many final tricks (13 for all)")
+    parser.add_argument("--bids", action=argparse.BooleanOptionalAction, default=True,
+                        help="analyse the bids too, which solves every full deal (default: on)")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--cache", metavar="FILE", help="keep solved positions in this file across runs")
+    parser.add_argument("--all", action="store_true", help="list every decision, not just the costly ones")
+    parser.add_argument("--json", action="store_true", help="print the full report as JSON")
+    args = parser.parse_args(argv)
+
+    reader = records.RecordReader(args.record)
+    start, stop = 0, len(reader)
+    if args.rounds:
+        first, _, last = args.rounds.partition(":")
+        start = int(first) if first else 0
+        stop = int(last) if last else len(reader)
+    rounds = [reader[i] for i in range(start, min(stop, len(reader)))]
+
+    depth = min(max(args.depth, 1), 13)
+    skipped = not_analysed(depth, args.bids)
+    cache = DecisionCache(path=args.cache)
+    began = time.perf_counter()
+    try:
+        reports = analyze_rounds(rounds, depth, args.bids, args.workers, cache)
+    finally:
+        cache.close()
+    elapsed = time.perf_counter() - began
+
+    if args.json:
+        print(json.dumps({"rounds": reports, "seats": summarize(reports), "not_analysed": skipped,
+                          "elapsed_sec": round(elapsed, 3)}))
+        return
+    for number, report in enumerate(reports, start):
+        print(f"Round {number}: {report['contract']}, dealer seat {report['dealer']}")
+        for bid in report.get("bids", ()):
+            if bid["cost"] or args.all:
+                made = f"bid {bid['bid']}" if bid["bid"] else "pass"
+                print(f"  bidding  seat {bid['seat']} {made:<8} nets {bid['points']:+d}, "
+                      f"{bid['best_bid']} nets {bid['best']:+d}  (-{bid['cost']} points)")
+        for play in report["plays"]:
+            if play["cost"] or args.all:
+                print(f"  trick {play['trick']:>2} seat {play['seat']} {play['card']:<4} takes {play['tricks']}, "
+                      f"{'/'.join(play['best_cards'])} takes {play['best']}  (-{play['cost']} tricks)")
+    print(f"Analysed {len(reports)} rounds in {elapsed:.2f}s")
+    if skipped:
+        print(f"  NOT analysed: {' and '.join(skipped)} (see --depth and --bids)")
+    for seat, totals in enumerate(summarize(reports)):
+        line = f"  seat {seat}: {totals['costly_plays']}/{totals['plays']} plays cost {totals['tricks_lost']} tricks"
+        if args.bids:
+            line += f", {totals['costly_bids']}/{totals['bids']} bids cost {totals['points_lost']} points"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Time-based tweens for card sprites moving across the table.
+
+A ``Tween`` moves one surface between two screen positions over a fixed
+duration, so where a card is depends only on the clock and not on how many
+frames were drawn: a slow frame simply lands the card further along. The
+``Animator`` advances all tweens once per frame with ``update``, which
+returns the rectangles to repaint (where the cards were and where they are
+now), and ``draw`` blits the cards at the positions of that frame. Surfaces
+are the shared card sprites, nothing is rendered per frame.
+"""
+import time
+
+import pygame
+
+DEFAULT_REFRESH_RATE = 60  # Frames per second when the display does not report one
+
+
+def linear(t):
+    return t
+
+
+def ease_out_cubic(t):
+    """Fast start, gentle landing."""
+    return 1 - (1 - t) ** 3
+
+
+def ease_in_out_quad(t):
+    """Slow start and end, fastest half way."""
+    return 2 * t * t if t < 0.5 else 1 - (-2 * t + 2) ** 2 / 2
+
+
+def refresh_rate():
+    """Refresh rate of the display in frames per second."""
+    # pygame.display.get_current_refresh_rate is only in newer pygame releases
+    get_rate = getattr(pygame.display, "get_current_refresh_rate", None)
+    try:
+        rate = get_rate() if get_rate else 0
+    except pygame.error:
+        rate = 0
+    return rate or DEFAULT_REFRESH_RATE
+
+
+class Tween:
+    """Moves ``surface`` from the top-left position ``start`` to ``end``."""
+
+    def __init__(self, surface, start, end, start_time, duration, easing=ease_out_cubic, key=None):
+        self.surface = surface
+        self.start = start
+        self.end = end
+        self.start_time = start_time
+        self.duration = duration
+        self.easing = easing
+        self.key = key  # What the tween stands for, e.g. the id of the card in flight
+
+    def progress(self, now):
+        """Fraction of the duration that has passed, from 0 to 1."""
+        if self.duration <= 0:
+            return 1.0
+        return min(1.0, max(0.0, (now - self.start_time) / self.duration))
+
+    def rect(self, now):
+        """Where the surface is drawn at time ``now``."""
+        t = self.easing(self.progress(now))
+        x = self.start[0] + (self.end[0] - self.start[0]) * t
+        y = self.start[1] + (self.end[1] - self.start[1]) * t
+        return self.surface.get_rect(topleft=(round(x), round(y)))
+
+
+class Animator:
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.tweens = []
+        self.frame = []  # (tween, rect) drawn this frame
+        self.last_frame = None  # Time of the last update
+        self.frame_interval = 1 / refresh_rate()
+
+    def add(self, surface, start, end, duration, easing=ease_out_cubic, key=None):
+        """Start moving ``surface`` from ``start`` to ``end`` now; returns the tween."""
+        tween = Tween(surface, start, end, self.clock(), duration, easing, key)
+        self.tweens.append(tween)
+        return tween
+
+    def active(self):
+        return bool(self.tweens)
+
+    def is_moving(self, key):
+        """Whether a running tween has this key."""
+        return any(tween.key == key for tween in self.tweens)
+
+    def update(self):
+        """Advance every tween to the current time.
+
+        Returns the rectangles that need repainting: the previous and new
+        position of every card in flight. Finished tweens are dropped after
+        this frame, which also repaints their last position without them.
+        """
+        now = self.clock()
+        self.last_frame = now
+        dirty = [rect for _, rect in self.frame]
+        self.frame = []
+        running = []
+        for tween in self.tweens:
+            rect = tween.rect(now)
+            dirty.append(rect)
+            if tween.progress(now) < 1:
+                self.frame.append((tween, rect))
+                running.append(tween)
+        self.tweens = running
+        return dirty
+
+    def draw(self, surface):
+        """Blit the tweens at the positions of the last ``update``."""
+        for tween, rect in self.frame:
+            surface.blit(tween.surface, rect)
+
+    def timeout_ms(self):
+        """Milliseconds until the next frame is due, or None while nothing moves."""
+        if not self.tweens and not self.frame:
+            return None
+        if self.last_frame is None:
+            return 0
+        wait = self.last_frame + self.frame_interval - self.clock()
+        return max(0, int(wait * 1000))
+
+    def clear(self):
+        self.tweens = []
+        self.frame = []
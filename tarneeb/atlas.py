@@ -0,0 +1,156 @@
+"""Card sprite atlas.
+
+All 52 card faces and the card back are scaled once to the card size and
+packed into a single image: one row per suit, one column per rank and the
+back in the first slot of a fifth row. Cards without an image get a plain
+placeholder. The atlas is cached on disk, keyed by the card size and the
+size and modification time of every source image, so later runs load one
+PNG instead of 53. Within a process it is loaded once, converted to the
+display format, and shared by every ``GUI`` as subsurfaces; the sets of the
+last few card sizes are kept, so resizing the window back and forth does not
+rebuild them.
+"""
+import hashlib
+import os
+import sys
+from collections import OrderedDict
+
+import pygame
+
+from card import Card
+import fonts
+import perf
+
+ASSETS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+CARDS_PATH = os.path.join(ASSETS_PATH, "cards")
+CACHE_PATH = os.path.join(ASSETS_PATH, "cache")
+CARD_SIZE = (80, 116)
+
+# Bump when the atlas layout or the placeholder drawing changes
+ATLAS_VERSION = 1
+
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+RED = (200, 0, 0)
+
+# Card sizes whose converted sprites stay loaded
+MAX_LOADED = 4
+
+# Converted atlases and their sprites, by card size, least recently used first
+_loaded = OrderedDict()
+
+
+def source_paths():
+    """Image file for every card face, keyed by (suit, rank), and the card back."""
+    faces = {(suit, rank): os.path.join(CARDS_PATH, f"{rank}_of_{suit}.png")
+             for suit in Card.SUITS for rank in Card.RANKS}
+    return faces, os.path.join(CARDS_PATH, "card_back.png")
+
+
+def atlas_key(size):
+    """Digest of the card size and the size/mtime of every existing source image."""
+    faces, back = source_paths()
+    digest = hashlib.sha1(f"{ATLAS_VERSION} {size[0]}x{size[1]}".encode())
+    for path in list(faces.values()) + [back]:
+        if os.path.exists(path):
+            stat = os.stat(path)
+            digest.update(f"{os.path.basename(path)} {stat.st_size} {stat.st_mtime_ns}".encode())
+    return digest.hexdigest()[:16]
+
+
+def slot_rect(slot, size):
+    """Rectangle of a (row, column) slot in the atlas."""
+    row, col = slot
+    return pygame.Rect(col * size[0], row * size[1], size[0], size[1])
+
+
+def draw_placeholder(surface, card, rect):
+    """Plain card face: white with a border and the card name."""
+    pygame.draw.rect(surface, WHITE, rect)
+    pygame.draw.rect(surface, BLACK, rect, 2)
+    text_color = RED if card.suit in ["hearts", "diamonds"] else BLACK
+    # 24 points on the 80 pixel wide card, in proportion for other sizes
+    text = fonts.render(fonts.get_font('Arial', max(8, rect.width * 24 // 80)), str(card), text_color)
+    surface.blit(text, (rect.x + 5, rect.y + 5))
+
+
+def draw_card_back(surface, rect):
+    """Generated red patterned card back."""
+    w, h = rect.size
+    back = pygame.Surface((w, h))
+    back.fill((180, 0, 0))  # Red background
+    pygame.draw.rect(back, BLACK, pygame.Rect(5, 5, w - 10, h - 10), 2)
+
+    # Create a pattern on the card back
+    for i in range(0, w, 10):
+        for j in range(0, h, 10):
+            if (i + j) % 20 == 0:
+                pygame.draw.rect(back, (150, 0, 0), pygame.Rect(i, j, 5, 5))
+    surface.blit(back, rect)
+
+
+def build_atlas(size=CARD_SIZE):
+    """Draw the atlas surface from the source images and placeholders."""
+    atlas = pygame.Surface((size[0] * 13, size[1] * 5), pygame.SRCALPHA)
+    faces, back = source_paths()
+    for (suit, rank), path in faces.items():
+        rect = slot_rect((Card.SUIT_INDEX[suit], Card.RANK_INDEX[rank]), size)
+        if os.path.exists(path):
+            atlas.blit(pygame.transform.scale(pygame.image.load(path), size), rect)
+        else:
+            draw_placeholder(atlas, Card(suit, rank), rect)
+
+    rect = slot_rect((4, 0), size)
+    if os.path.exists(back):
+        atlas.blit(pygame.transform.scale(pygame.image.load(back), size), rect)
+    else:
+        draw_card_back(atlas, rect)
+    return atlas
+
+
+def load_atlas(size=CARD_SIZE):
+    """The atlas surface, read from the disk cache or built and cached."""
+    path = os.path.join(CACHE_PATH, f"cards_{size[0]}x{size[1]}_{atlas_key(size)}.png")
+    if os.path.exists(path):
+        try:
+            return pygame.image.load(path)
+        except pygame.error:
+            pass  # Unreadable cache, rebuild it
+
+    atlas = build_atlas(size)
+    try:
+        os.makedirs(CACHE_PATH, exist_ok=True)
+        pygame.image.save(atlas, path)
+    except (OSError, pygame.error):
+        pass  # The cache is only an optimization
+    return atlas
+
+
+def load_cards(size=CARD_SIZE):
+    """Shared card sprites as ``({(suit, rank): surface}, card_back)``."""
+    if size in _loaded:
+        _loaded.move_to_end(size)
+        return _loaded[size]
+
+    atlas = load_atlas(size)
+    if pygame.display.get_surface() is not None:
+        # Blits from display-format surfaces skip per-pixel conversion
+        atlas = atlas.convert_alpha()
+
+    faces = {}
+    for suit in Card.SUITS:
+        for rank in Card.RANKS:
+            slot = (Card.SUIT_INDEX[suit], Card.RANK_INDEX[rank])
+            faces[(suit, rank)] = atlas.subsurface(slot_rect(slot, size))
+    back = atlas.subsurface(slot_rect((4, 0), size))
+
+    # Only keep converted sprites, an unconverted set is reloaded once a display exists
+    if pygame.display.get_surface() is not None:
+        _loaded[size] = (faces, back)
+        if len(_loaded) > MAX_LOADED:
+            _loaded.popitem(last=False)
+    return faces, back
+
+
+# Timed by perf while profiling is enabled
+perf.register(sys.modules[__name__], "load_atlas", "load_cards")
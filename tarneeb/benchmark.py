@@ -0,0 +1,457 @@
+"""Micro and macro benchmarks for the engine and the renderer.
+
+Run from the repository root with ``python -m tarneeb.benchmark`` or from the
+``tarneeb`` folder with ``python benchmark.py``. Every case is timed several
+times on fixed, seeded inputs and the best run is kept. Results can be
+written as JSON, saved as a baseline and compared against one later; the
+exit status is 1 when any case got slower than the allowed threshold.
+
+The ``gui_draw`` case uses SDL's dummy video driver, so no display is needed.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import bitboard
+import canonical
+import tricktable
+from card import Card
+from deck import Deck
+from game import TarneebGame
+from knowledge import Knowledge
+from player import Player
+from simulate import new_stats, play_game
+from solver import DoubleDummySolver
+from state import COMPLETE, DONE, PLAYING, GameState
+from vecenv import VecEnv
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+SEED = 1234
+
+
+def random_hand(rng, size=13):
+    """A sorted random hand of ``size`` cards."""
+    deck = Deck()
+    hand = rng.sample(deck.cards, size)
+    Deck._sort_hand(hand)
+    return hand
+
+
+def random_trick_args(rng):
+    """Random arguments for ``Player.ai_play`` as ``TarneebGame.ai_turn`` passes them."""
+    player = Player("Bench", 0)
+    deck = Deck().cards
+    rng.shuffle(deck)
+    player.set_hand(sorted(deck[:13], key=lambda card: card.id))
+    played = rng.randint(0, 3)
+    # The other three seats in table order, those yet to play are None
+    trick = deck[13:13 + played] + [None] * (3 - played)
+    leading_suit = trick[0].suit if played else None
+    trump_suit = rng.choice(Card.SUITS)
+    return player, trick, leading_suit, trump_suit
+
+
+def bench_card_beats(rng):
+    cards = Deck().cards
+    cases = [(rng.choice(cards), rng.choice(cards), rng.choice(Card.SUITS), rng.choice(Card.SUITS))
+             for _ in range(1000)]
+
+    def run():
+        for card, other, leading_suit, trump_suit in cases:
+            card.beats(other, leading_suit, trump_suit)
+    return len(cases), run
+
+
+def bench_trick_winners(rng):
+    # One vectorized call over a large batch of full tricks, in play order
+    tricks = np.array([rng.sample(range(52), 4) for _ in range(100_000)], dtype=np.int8)
+    trumps = np.array([rng.randrange(4) for _ in range(len(tricks))], dtype=np.int8)
+
+    def run():
+        tricktable.trick_winners(tricks, trumps)
+    return len(tricks), run
+
+
+def bench_get_valid_cards(rng):
+    cases = []
+    for _ in range(500):
+        player = Player("Bench", 0)
+        player.set_hand(random_hand(rng, rng.randint(1, 13)))
+        cases.append((player, rng.choice(Card.SUITS + [None])))
+
+    def run():
+        for player, leading_suit in cases:
+            player.get_valid_cards(leading_suit)
+    return len(cases), run
+
+
+def bench_ai_play(rng):
+    cases = [random_trick_args(rng) for _ in range(500)]
+
+    def run():
+        for player, trick, leading_suit, trump_suit in cases:
+            player.ai_play(trick, leading_suit, trump_suit)
+    return len(cases), run
+
+
+def bench_ai_bid(rng):
+    cases = []
+    for _ in range(500):
+        player = Player("Bench", 0)
+        player.set_hand(random_hand(rng))
+        cases.append((player, rng.choice([0, 0, 7, 8, 9])))
+
+    def run():
+        for player, highest_bid in cases:
+            player.ai_bid(highest_bid, [0, 0, 0, 0])
+    return len(cases), run
+
+
+def bench_complete_trick(rng):
+    game = TarneebGame()
+    game.bidding_phase = False
+    game.trick_phase = True
+    game.trump_suit = rng.choice(Card.SUITS)
+    cards = Deck().cards
+    tricks = []
+    for _ in range(500):
+        trick = rng.sample(cards, 4)
+        tricks.append((trick, rng.choice(trick).suit))
+
+    def run():
+        # Hands stay full, so the round is never scored
+        for trick, leading_suit in tricks:
+            game.current_trick = list(trick)
+            game.leading_suit = leading_suit
+            game.complete_trick()
+    return len(tricks), run
+
+
+def bench_state_apply_undo(rng):
+    cases = []
+    for _ in range(50):
+        ids = list(range(52))
+        rng.shuffle(ids)
+        hands = [sum(1 << card_id for card_id in ids[i::4]) for i in range(4)]
+        state = GameState(hands, rng.randrange(4))
+        while state.phase != DONE:
+            state.apply(rng.choice(state.legal_moves()))
+        moves = state.moves[:state.ply]
+        while state.ply:
+            state.undo()
+        cases.append((state, moves))
+
+    def run():
+        # Play every round to the end and take it all back
+        for state, moves in cases:
+            for move in moves:
+                state.apply(move)
+            for _ in moves:
+                state.undo()
+    return sum(len(moves) for _, moves in cases), run
+
+
+def bench_canonicalize(rng):
+    positions = []
+    for _ in range(50):
+        ids = list(range(52))
+        rng.shuffle(ids)
+        state = GameState([sum(1 << card_id for card_id in ids[i::4]) for i in range(4)], rng.randrange(4))
+        while state.phase != DONE:
+            if state.phase == PLAYING:
+                positions.append((state.hands[:], state.trump, state.lead, state.trick[:]))
+            state.apply(rng.choice(state.legal_moves()))
+
+    def run():
+        for hands, trump, lead, trick in positions:
+            canonical.canonicalize(hands, trump, lead, trick)
+    return len(positions), run
+
+
+def bench_sample_deals(rng):
+    # Five tricks into a random round, with whatever suits were shown out of
+    ids = list(range(52))
+    rng.shuffle(ids)
+    state = GameState([sum(1 << card_id for card_id in ids[i::4]) for i in range(4)], rng.randrange(4))
+    knowledge = Knowledge()
+    while state.phase != PLAYING:
+        state.apply(rng.choice(state.legal_moves()))
+    while bitboard.popcount(knowledge.unseen) > 32:
+        move = rng.choice(state.legal_moves())
+        if move == COMPLETE:
+            knowledge.complete_trick()
+        else:
+            knowledge.play(state.to_move, move)
+        state.apply(move)
+    sampler = knowledge.sampler(0, state.hands[0])
+    deals = 10000
+
+    def run():
+        sampler.deals(deals, SEED)
+    return deals, run
+
+
+def bench_solve_deal(rng):
+    # Full deals from the opening lead, with a fresh table for every deal
+    deals = []
+    for _ in range(12):
+        deck = Deck()
+        rng.shuffle(deck.cards)
+        deals.append([sum(1 << card.id for card in hand) for hand in deck.deal()])
+
+    def run():
+        for hands in deals:
+            DoubleDummySolver("spades").solve(hands, 0)
+    return len(deals), run
+
+
+def bench_vecenv_step(rng):
+    tables, steps = 1024, 50
+    env = VecEnv(tables, seed=SEED)
+
+    def run():
+        # Random legal actions from a fixed seed, so every run plays the same games
+        choice = np.random.default_rng(SEED)
+        env.rng = np.random.default_rng(SEED)
+        obs = env.reset()
+        for _ in range(steps):
+            actions = np.argmax(choice.random(obs["legal"].shape) * obs["legal"], axis=1)
+            obs, _, _, _ = env.step(actions)
+    return tables * steps, run
+
+
+def bench_full_round(rng):
+    rounds = 20
+
+    def run():
+        random.seed(SEED)  # Same games on every timed run
+        game = TarneebGame(target_score=10 ** 6)
+        for player in game.players:
+            player.ai = True
+        for _ in range(rounds):
+            tricks = 0
+            while tricks < 13:
+                if game.ai_turn() == "trick_complete":
+                    game.complete_trick()
+                    tricks += 1
+    return rounds, run
+
+
+def bench_full_game(rng):
+    games = 10
+
+    def run():
+        random.seed(SEED)  # Same games on every timed run
+        stats = new_stats()
+        for _ in range(games):
+            play_game(TarneebGame(), stats)
+    return games, run
+
+
+def make_gui(size=(800, 600)):
+    """A GUI on SDL's dummy display of ``size`` showing a hand in progress."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")  # Keep --json output clean
+    import pygame
+    from gui import GUI
+
+    pygame.init()
+    screen = pygame.display.set_mode(size)
+    random.seed(SEED)
+    game = TarneebGame()
+    for player in game.players:
+        player.ai = True
+    # Finish the bidding and play a couple of cards so every layer is drawn
+    while game.bidding_phase:
+        game.ai_turn()
+    game.ai_turn()
+    game.ai_turn()
+
+    # GUI loads its card images relative to the working directory
+    cwd = os.getcwd()
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        return GUI(screen, game)
+    finally:
+        os.chdir(cwd)
+
+
+def bench_gui_draw(rng):
+    gui = make_gui()
+    frames = 30
+
+    def run():
+        for _ in range(frames):
+            gui.invalidate()  # Time a full repaint, not an idle frame
+            gui.draw()
+    return frames, run
+
+
+def bench_gui_draw_4k(rng):
+    # A spectator display: the layout and sprites scaled to 3840x2160
+    gui = make_gui((3840, 2160))
+    frames = 5
+
+    def run():
+        for _ in range(frames):
+            gui.invalidate()
+            gui.draw()
+    return frames, run
+
+
+def bench_gui_idle_frame(rng):
+    gui = make_gui()
+    gui.draw()
+    frames = 30
+
+    def run():
+        for _ in range(frames):
+            gui.draw()
+    return frames, run
+
+
+BENCHMARKS = {
+    "card_beats": bench_card_beats,
+    "trick_winners": bench_trick_winners,
+    "get_valid_cards": bench_get_valid_cards,
+    "ai_play": bench_ai_play,
+    "ai_bid": bench_ai_bid,
+    "complete_trick": bench_complete_trick,
+    "state_apply_undo": bench_state_apply_undo,
+    "canonicalize": bench_canonicalize,
+    "sample_deals": bench_sample_deals,
+    "solve_deal": bench_solve_deal,
+    "vecenv_step": bench_vecenv_step,
+    "full_round": bench_full_round,
+    "full_game": bench_full_game,
+    "gui_draw": bench_gui_draw,
+    "gui_draw_4k": bench_gui_draw_4k,
+    "gui_idle_frame": bench_gui_idle_frame,
+}
+
+
+def time_case(setup, repeat=5, min_time=0.2):
+    """Time one benchmark case and return its result dictionary."""
+    ops, run = setup(random.Random(SEED))
+    run()  # Warm up caches and lazy loading
+
+    # Grow the loop count until one timing is long enough to be stable
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            run()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or loops >= 1 << 16:
+            break
+        loops *= 2
+
+    best = elapsed
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            run()
+        best = min(best, time.perf_counter() - start)
+
+    per_op = best / (loops * ops)
+    return {
+        "ops": loops * ops,
+        "seconds": round(best, 6),
+        "per_op_us": round(per_op * 1e6, 3),
+        "ops_per_sec": round(1 / per_op, 1),
+    }
+
+
+def run_benchmarks(names=None, repeat=5, min_time=0.2):
+    """Run the named benchmarks (all by default) and return the report."""
+    names = names or list(BENCHMARKS)
+    results = {}
+    for name in names:
+        results[name] = time_case(BENCHMARKS[name], repeat, min_time)
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def compare(report, baseline, threshold=0.1):
+    """Compare per-op times with a baseline report.
+
+    Returns a list of ``(name, baseline_us, current_us, change)`` rows and the
+    names of the cases that are slower than ``threshold`` (0.1 is 10%).
+    """
+    rows = []
+    regressions = []
+    for name, result in report["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        change = result["per_op_us"] / base["per_op_us"] - 1
+        rows.append((name, base["per_op_us"], result["per_op_us"], change))
+        if change > threshold:
+            regressions.append(name)
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Tarneeb engine and renderer.")
+    parser.add_argument("names", nargs="*", metavar="name",
+                        help=f"benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per benchmark, the best is kept")
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum seconds per timed run")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("-o", "--output", help="also write the JSON report to this file")
+    parser.add_argument("--save-baseline", action="store_true", help=f"store the report as the baseline ({BASELINE_PATH})")
+    parser.add_argument("--baseline", default=None, help="compare against this baseline file")
+    parser.add_argument("--compare", action="store_true", help="compare against the stored baseline")
+    parser.add_argument("--threshold", type=float, default=0.1, help="allowed slowdown before failing (0.1 = 10%%)")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark: {', '.join(unknown)}")
+
+    report = run_benchmarks(args.names, args.repeat, args.min_time)
+
+    baseline_path = args.baseline or (BASELINE_PATH if args.compare else None)
+    regressions = []
+    if baseline_path:
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        rows, regressions = compare(report, baseline, args.threshold)
+        report["baseline"] = baseline_path
+        report["threshold"] = args.threshold
+        report["changes"] = {name: round(change, 4) for name, _, _, change in rows}
+        report["regressions"] = regressions
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for name, result in report["results"].items():
+            line = f"{name:>16}: {result['per_op_us']:>12.3f} us/op {result['ops_per_sec']:>12.1f} ops/s"
+            if name in report.get("changes", {}):
+                line += f" {report['changes'][name]:>+8.1%}"
+                if name in regressions:
+                    line += "  REGRESSION"
+            print(line)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(BASELINE_PATH, "w") as f:
+            json.dump({key: report[key] for key in ("python", "platform", "results")}, f, indent=2)
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+"""Precomputed bid-equity table.
+
+Every 13-card hand is reduced, for a chosen trump suit, to a small feature
+tuple: trump length, which of the trump A/K/Q it holds, side aces, side kings
+and the length of its shortest side suit (capped at 3). The table stores, per
+feature cell, how many simulated deals fell into it, the average number of
+tricks the hand's team took and the fraction of deals in which that team took
+at least 7..13 tricks. Bidding then becomes a single row lookup.
+
+The table is built offline with ``python bidtable.py`` by dealing random hands
+and playing them out with the same fast playout policy as the Monte Carlo AI.
+It is saved as a ``.npy`` file and opened with ``mmap_mode="r"``, so every
+process shares the same read-only pages. Bidding reads the default table
+once into a tuple per cell (``get_rows``): a NumPy row lookup costs more
+than the rest of a bid, and the whole table is only a few thousand cells.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import bitboard
+import dealer
+from bitboard import LANE, RANK_MASKS, SUIT_MASKS
+from card import Card
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "bid_equity.npy")
+
+# Feature dimensions: trump length, trump A/K/Q bits, side aces, side kings, shortest side suit
+SHAPE = (14, 8, 4, 4, 4)
+CELLS = int(np.prod(SHAPE))
+BIDS = range(7, 14)
+
+# Table columns
+SAMPLES = 0
+TRICKS = 1
+SUCCESS = 2  # SUCCESS + (bid - 7) is the rate of taking at least ``bid`` tricks
+
+# Cells with fewer samples are treated as unknown
+MIN_SAMPLES = 30
+
+_table = None
+_loaded = False
+_rows = None
+
+
+def feature_index(mask, trump_index):
+    """Row of the table for a hand bitboard with trump suit ``trump_index``."""
+    trump = mask & SUIT_MASKS[trump_index]
+    side = mask & ~SUIT_MASKS[trump_index]
+    length = bitboard.popcount(trump)
+    tops = trump >> (13 * trump_index + 10)  # Queen, king and ace are the top three bits
+    aces = bitboard.popcount(side & RANK_MASKS[12])
+    kings = bitboard.popcount(side & RANK_MASKS[11])
+    shortest = min(bitboard.popcount(mask & SUIT_MASKS[s]) for s in range(4) if s != trump_index)
+    return (((length * 8 + tops) * 4 + aces) * 4 + kings) * 4 + min(shortest, 3)
+
+
+# (length, queen/king/ace bits, has the ace, has the king) of every 13-bit suit lane
+_LANE_FEATURES = [(bitboard.popcount(lane), lane >> 10, lane >> 12, lane >> 11 & 1) for lane in range(1 << 13)]
+
+
+def feature_indices(mask):
+    """``feature_index`` of a hand for each of the four trump suits."""
+    suits = (_LANE_FEATURES[mask & LANE], _LANE_FEATURES[mask >> 13 & LANE],
+             _LANE_FEATURES[mask >> 26 & LANE], _LANE_FEATURES[mask >> 39 & LANE])
+    lengths = sorted(suit[0] for suit in suits)
+    aces = suits[0][2] + suits[1][2] + suits[2][2] + suits[3][2]
+    kings = suits[0][3] + suits[1][3] + suits[2][3] + suits[3][3]
+    indices = []
+    for length, tops, ace, king in suits:
+        # The shortest side suit is the second shortest suit when the trump suit is the shortest
+        shortest = lengths[1] if length == lengths[0] else lengths[0]
+        indices.append((((length * 8 + tops) * 4 + aces - ace) * 4 + kings - king) * 4 + min(shortest, 3))
+    return indices
+
+
+def load_table(path=TABLE_PATH):
+    """Memory-map the table at ``path``, or return None if it does not exist."""
+    if not os.path.exists(path):
+        return None
+    return np.load(path, mmap_mode="r")
+
+
+def get_table():
+    """The shared default table, loaded on first use (None if not built)."""
+    global _table, _loaded
+    if not _loaded:
+        _table = load_table()
+        _loaded = True
+    return _table
+
+
+def get_rows():
+    """The shared default table as one tuple per cell, None where unknown (None if not built)."""
+    global _rows
+    if _rows is None:
+        table = get_table()
+        if table is None:
+            return None
+        _rows = [tuple(row) if row[SAMPLES] >= MIN_SAMPLES else None for row in table.tolist()]
+    return _rows
+
+
+def lookup(mask, trump_suit, table=None):
+    """Table row for a hand and trump suit name, or None if unknown."""
+    if table is None:
+        rows = get_rows()
+        return rows[feature_index(mask, Card.SUITS.index(trump_suit))] if rows is not None else None
+    row = table[feature_index(mask, Card.SUITS.index(trump_suit))]
+    if row[SAMPLES] < MIN_SAMPLES:
+        return None
+    return row
+
+
+def best_trump(mask, table=None):
+    """Trump suit with the highest expected tricks for a hand and its table row.
+
+    Returns ``(None, None)`` when no table is available or the hand's cells
+    were not sampled.
+    """
+    rows = get_rows() if table is None else table
+    if rows is None:
+        return None, None
+    best_suit, best_row = None, None
+    for suit, index in zip(Card.SUITS, feature_indices(mask)):
+        row = rows[index]
+        if table is not None and row[SAMPLES] < MIN_SAMPLES:
+            row = None
+        if row is not None and (best_row is None or row[TRICKS] > best_row[TRICKS]):
+            best_suit, best_row = suit, row
+    return best_suit, best_row
+
+
+def success_rate(row, bid):
+    """Fraction of sampled deals in which the team took at least ``bid`` tricks."""
+    return float(row[SUCCESS + bid - 7])
+
+
+def run_chunk(seed, num_deals):
+    """Simulate ``num_deals`` deals and return per-cell counts (worker entry point)."""
+    # Imported here because montecarlo imports player, which imports this module
+    from montecarlo import playout
+
+    rng = np.random.default_rng(seed)
+    counts = np.zeros(CELLS, dtype=np.int64)
+    trick_totals = np.zeros(CELLS, dtype=np.int64)
+    histogram = np.zeros((CELLS, 14), dtype=np.int64)
+    masks = dealer.deal_masks(dealer.deal_batch(num_deals, rng))
+    leaders = rng.integers(0, 4, num_deals)
+
+    for deal, leader in zip(masks, leaders):
+        hands = [int(mask) for mask in deal]
+        for trump_index, suit in enumerate(Card.SUITS):
+            tricks = playout(hands, int(leader), (), suit)
+            # Every seat's hand is a sample for its own team's result
+            for seat in range(4):
+                cell = feature_index(hands[seat], trump_index)
+                counts[cell] += 1
+                trick_totals[cell] += tricks[seat % 2]
+                histogram[cell, tricks[seat % 2]] += 1
+    return counts, trick_totals, histogram
+
+
+def build_table(num_deals, workers=None, seed=0, chunk_size=5000):
+    """Simulate ``num_deals`` deals across a process pool and return the table."""
+    workers = workers or os.cpu_count() or 1
+    sizes = [min(chunk_size, num_deals - start) for start in range(0, num_deals, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    totals = None
+    if workers == 1:
+        for part in map(run_chunk, seeds, sizes):
+            totals = part if totals is None else [a + b for a, b in zip(totals, part)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for part in pool.map(run_chunk, seeds, sizes):
+                totals = part if totals is None else [a + b for a, b in zip(totals, part)]
+    counts, trick_totals, histogram = totals
+
+    table = np.zeros((CELLS, SUCCESS + len(BIDS)), dtype=np.float32)
+    seen = np.maximum(counts, 1)
+    table[:, SAMPLES] = counts
+    table[:, TRICKS] = trick_totals / seen
+    # Reverse cumulative sum gives the number of deals with at least n tricks
+    at_least = histogram[:, ::-1].cumsum(axis=1)[:, ::-1]
+    for bid in BIDS:
+        table[:, SUCCESS + bid - 7] = at_least[:, bid] / seen
+    return table
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the bid-equity table from simulated deals.")
+    parser.add_argument("-n", "--deals", type=int, default=200000, help="number of deals to simulate")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("-s", "--seed", type=int, default=0, help="RNG seed")
+    parser.add_argument("-o", "--output", default=TABLE_PATH, help="where to write the table")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    table = build_table(args.deals, args.workers, args.seed)
+    np.save(args.output, table)
+    known = int((table[:, SAMPLES] >= MIN_SAMPLES).sum())
+    print(f"{args.deals} deals in {time.perf_counter() - start:.1f}s, "
+          f"{known} of {CELLS} cells with at least {MIN_SAMPLES} samples -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""52-bit integer hand representation.
+
+A card with id ``suit_index * 13 + rank_index`` is stored as bit ``id``, so
+every suit occupies its own 13-bit lane with the lowest rank in the lowest
+bit. Follow-suit checks, legal moves and highest/lowest card lookups are then
+plain integer operations instead of scans over lists of ``Card`` objects.
+"""
+from card import Card
+
+LANE = (1 << 13) - 1
+FULL_DECK = (1 << 52) - 1
+
+# Mask of all 13 cards of a suit, by suit name and by suit index
+SUIT_MASKS = [LANE << (13 * i) for i in range(4)]
+SUIT_MASK = {suit: SUIT_MASKS[i] for i, suit in enumerate(Card.SUITS)}
+
+# Mask of the four cards of a given rank, by rank index
+RANK_MASKS = [sum(1 << (13 * s + r) for s in range(4)) for r in range(13)]
+
+# Aces, kings and queens of every suit
+HONOR_MASK = RANK_MASKS[12] | RANK_MASKS[11] | RANK_MASKS[10]
+
+
+def popcount(mask):
+    """Number of cards in a mask."""
+    return bin(mask).count("1")
+
+
+if hasattr(int, "bit_count"):  # Python 3.10+
+    popcount = int.bit_count
+
+
+def hand_mask(cards):
+    """Bitboard of a list of cards."""
+    mask = 0
+    for card in cards:
+        mask |= card.bit
+    return mask
+
+
+def suit_mask(mask, suit):
+    """Cards of ``suit`` in ``mask``."""
+    return mask & SUIT_MASK[suit]
+
+
+def has_suit(mask, suit):
+    """True if ``mask`` holds any card of ``suit``."""
+    return bool(mask & SUIT_MASK[suit])
+
+
+def legal_mask(mask, leading_suit=None):
+    """Cards of ``mask`` that may be played to a trick led in ``leading_suit``."""
+    if leading_suit is not None:
+        follow = mask & SUIT_MASK[leading_suit]
+        if follow:
+            return follow
+    return mask
+
+
+def highest(mask):
+    """Id of the highest card in ``mask`` or -1 if empty."""
+    return mask.bit_length() - 1
+
+
+def lowest(mask):
+    """Id of the lowest card in ``mask`` or -1 if empty."""
+    return (mask & -mask).bit_length() - 1
+
+
+def ranks(mask):
+    """Collapse all suits into one 13-bit lane of the ranks present."""
+    return (mask | mask >> 13 | mask >> 26 | mask >> 39) & LANE
+
+
+def highest_rank_cards(mask):
+    """All cards of ``mask`` sharing its highest rank."""
+    if not mask:
+        return 0
+    return mask & RANK_MASKS[ranks(mask).bit_length() - 1]
+
+
+def lowest_rank_cards(mask):
+    """All cards of ``mask`` sharing its lowest rank."""
+    if not mask:
+        return 0
+    collapsed = ranks(mask)
+    return mask & RANK_MASKS[(collapsed & -collapsed).bit_length() - 1]
+
+
+def above(card_id):
+    """Cards of the same suit ranked above ``card_id``."""
+    return SUIT_MASKS[card_id // 13] & ~((2 << card_id) - 1)
+
+
+def beating_mask(mask, card_id, leading_suit, trump_suit):
+    """Cards of ``mask`` that beat the card ``card_id`` (same rules as ``Card.beats``).
+
+    A ``card_id`` of -1 means no card has been played yet, so every card wins.
+    """
+    if card_id < 0:
+        return mask
+    trump = SUIT_MASK[trump_suit] if trump_suit is not None else 0
+    if (1 << card_id) & trump:
+        return mask & above(card_id)
+    winners = mask & trump
+    if leading_suit is not None:
+        lead = SUIT_MASK[leading_suit]
+        if (1 << card_id) & lead:
+            winners |= mask & above(card_id)
+        else:
+            winners |= mask & lead
+    return winners
+
+
+def iter_ids(mask):
+    """Yield the card ids of ``mask`` from lowest to highest."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def to_cards(mask):
+    """Create ``Card`` objects for every card in ``mask``."""
+    return [Card.from_id(card_id) for card_id in iter_ids(mask)]
@@ -0,0 +1,184 @@
+"""Canonical forms of card-play positions.
+
+Two positions play out the same way, trick for trick, when they differ only
+in
+
+  * which non-trump suit is which: suits other than the trump suit and the
+    suit led to the current trick can be relabelled freely, and
+  * cards that are already gone: only the order of the cards still in play
+    (in the hands and in the current trick) decides who wins a trick, so a
+    7 and a 9 with the 8 already played are as good as neighbours.
+
+``canonicalize`` maps a position to one representative of its class. Within
+each suit the cards still in play are renumbered from the ace down, so the
+gaps left by played cards disappear. The trump suit becomes suit 0, the
+suit led to the current trick the next one and the remaining suits follow
+in a fixed order of their card layouts, so every position of a class gets
+the same ``Canonical`` tuple, ready to key caches and solver tables.
+
+The ``Relabeling`` returned alongside translates cards, masks and suits
+between the two forms, so a decision found on the canonical position (a
+card, or a suit) can be mapped back onto the original one.
+
+Canonical positions preserve trick outcomes, not absolute ranks, so they
+suit exact analysis (see ``solver``) but not the heuristics, which look at
+honours and rank counts.
+"""
+from collections import namedtuple
+
+from bitboard import LANE
+from card import Card
+
+# hands: four bitboards; trick: canonical card id played by each seat (-1 if
+# none); trump, lead: canonical suit index or -1
+Canonical = namedtuple("Canonical", "hands trick trump lead")
+
+# Ranks of the set bits of a 13-bit lane, from the highest down
+_LANE_RANKS = [tuple(rank for rank in range(12, -1, -1) if lane >> rank & 1) for lane in range(1 << 13)]
+
+# Canonical lane of the cards ``lane`` among the cards in play ``live``, keyed by (live, lane)
+_compacted = {}
+
+
+def _compact(live, lane):
+    """Renumber the cards of ``lane`` by their place among ``live``, from the ace down."""
+    key = (live, lane)
+    result = _compacted.get(key)
+    if result is None:
+        result = 0
+        for i, rank in enumerate(_LANE_RANKS[live]):
+            if lane >> rank & 1:
+                result |= 1 << 12 - i
+        _compacted[key] = result
+    return result
+
+
+class Relabeling:
+    """Translation between a position's cards and those of its canonical form."""
+
+    def __init__(self, suits, live):
+        self.suits = suits  # Canonical suit index of every original suit index
+        self.live = live  # Bitboard of the original cards in play
+        self.original_suits = [0] * 4
+        for suit, canonical in enumerate(suits):
+            self.original_suits[canonical] = suit
+        self._cards = None
+
+    @property
+    def cards(self):
+        """Canonical card id of every original card still in play."""
+        if self._cards is None:
+            self._cards = {}
+            for suit in range(4):
+                shift = 13 * self.suits[suit]
+                for i, rank in enumerate(_LANE_RANKS[self.live >> 13 * suit & LANE]):
+                    self._cards[13 * suit + rank] = shift + 12 - i
+        return self._cards
+
+    def card(self, card_id):
+        """Canonical id of an original card that is still in play."""
+        return self.cards[card_id]
+
+    def restore_card(self, card_id):
+        """Original id of a canonical card."""
+        suit = self.original_suits[card_id // 13]
+        return 13 * suit + _LANE_RANKS[self.live >> 13 * suit & LANE][12 - card_id % 13]
+
+    def mask(self, mask):
+        """Canonical bitboard of an original one (cards in play only)."""
+        result = 0
+        for suit in range(4):
+            live = self.live >> 13 * suit & LANE
+            result |= _compact(live, mask >> 13 * suit & live) << 13 * self.suits[suit]
+        return result
+
+    def restore_mask(self, mask):
+        """Original bitboard of a canonical one."""
+        result = 0
+        for card_id in range(52):
+            if mask >> card_id & 1:
+                result |= 1 << self.restore_card(card_id)
+        return result
+
+    def suit(self, suit):
+        """Canonical index of an original suit index (-1 stays -1)."""
+        return self.suits[suit] if suit >= 0 else -1
+
+    def restore_suit(self, suit):
+        return self.original_suits[suit] if suit >= 0 else -1
+
+
+def canonicalize(hands, trump=-1, lead=-1, trick=(-1, -1, -1, -1)):
+    """Canonical form of a position and the relabeling that produced it.
+
+    ``hands`` are four bitboards, ``trump`` and ``lead`` suit indices (-1 if
+    none) and ``trick`` the card id each seat played to the current trick
+    (-1 if none). Returns ``(Canonical, Relabeling)``.
+    """
+    h0, h1, h2, h3 = hands
+    live = h0 | h1 | h2 | h3
+    for card_id in trick:
+        if card_id >= 0:
+            live |= 1 << card_id
+
+    # Renumber every suit's cards in play from the ace down and describe the
+    # suit by where its canonical cards are
+    layouts = []
+    for suit in range(4):
+        shift = 13 * suit
+        suit_live = live >> shift & LANE
+        lanes = (_compact(suit_live, h0 >> shift & LANE), _compact(suit_live, h1 >> shift & LANE),
+                 _compact(suit_live, h2 >> shift & LANE), _compact(suit_live, h3 >> shift & LANE))
+        # Canonical rank each seat played to the trick in this suit
+        played = tuple(_compact(suit_live, 1 << card_id - shift).bit_length() - 1
+                       if card_id // 13 == suit else -1 for card_id in trick)
+        role = 0 if suit == trump else 1 if suit == lead else 2
+        layouts.append((role, lanes, played, suit))
+
+    # Trump first, then the led suit, then the others by layout
+    layouts.sort()
+    suits = [0, 0, 0, 0]
+    canonical_hands = [0, 0, 0, 0]
+    canonical_trick = [-1, -1, -1, -1]
+    for canonical, (_, lanes, played, suit) in enumerate(layouts):
+        suits[suit] = canonical
+        shift = 13 * canonical
+        for seat in range(4):
+            canonical_hands[seat] |= lanes[seat] << shift
+            if played[seat] >= 0:
+                canonical_trick[seat] = shift + played[seat]
+
+    relabeling = Relabeling(suits, live)
+    position = Canonical(tuple(canonical_hands), tuple(canonical_trick),
+                         relabeling.suit(trump), relabeling.suit(lead))
+    return position, relabeling
+
+
+def from_game(game):
+    """Canonical form of the card play of a ``TarneebGame`` round; see ``canonicalize``."""
+    trump = Card.SUIT_INDEX[game.trump_suit] if game.trump_suit is not None else -1
+    lead = Card.SUIT_INDEX[game.leading_suit] if game.leading_suit is not None else -1
+    trick = [card.id if card is not None else -1 for card in game.current_trick]
+    return canonicalize([player.mask for player in game.players], trump, lead, trick)
+
+
+def from_state(state):
+    """Canonical form of the card play of a ``GameState``; see ``canonicalize``."""
+    return canonicalize(state.hands, state.trump, state.lead, state.trick)
+
+
+def position_key(game):
+    """Hashable key shared by every position of a ``TarneebGame`` that plays out the same.
+
+    Besides the canonical cards it holds the seat on lead and the seat to
+    move, and the tricks each team has won so far.
+    """
+    position, _ = from_game(game)
+    return (position, game.trick_starter, game.current_player, game.tricks_won[0], game.tricks_won[1])
+
+
+def restore(position, relabeling):
+    """The original hands, trick, trump and lead of a canonical position."""
+    hands = tuple(relabeling.restore_mask(mask) for mask in position.hands)
+    trick = tuple(relabeling.restore_card(card_id) if card_id >= 0 else -1 for card_id in position.trick)
+    return hands, trick, relabeling.restore_suit(position.trump), relabeling.restore_suit(position.lead)
@@ -2,10 +2,18 @@ class Card:
     SUITS = ["clubs", "diamonds", "hearts", "spades"]
     RANKS = ["2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K", "A"]
     SUIT_SYMBOLS = {"clubs": "♣", "diamonds": "♦", "hearts": "♥", "spades": "♠"}
+    SUIT_INDEX = {suit: i for i, suit in enumerate(SUITS)}
+    RANK_INDEX = {rank: i for i, rank in enumerate(RANKS)}
+    # Every table on the server holds 52 cards, so skip the per-card __dict__
+    __slots__ = ("suit", "rank", "value", "id", "bit", "visible", "image", "small_image")
     
     def __init__(self, suit, rank):
         self.suit = suit
         self.rank = rank
+        # Rank order, card id (one 13-card lane per suit) and bitboard bit
+        self.value = Card.RANK_INDEX[rank]
+        self.id = Card.SUIT_INDEX[suit] * 13 + self.value
+        self.bit = 1 << self.id
         self.visible = False
         self.image = None
         self.small_image = None
@@ -16,9 +24,10 @@ class Card:
     def __repr__(self):
         return self.__str__()
     
-    @property
-    def value(self):
-        return Card.RANKS.index(self.rank)
+    @classmethod
+    def from_id(cls, card_id):
+        """Create the card with the given id (0-51)."""
+        return cls(cls.SUITS[card_id // 13], cls.RANKS[card_id % 13])
     
     def beats(self, other, leading_suit, trump_suit):
         # If the other card is None, this card wins by default
@@ -0,0 +1,189 @@
+"""Reference client for the table server (see server.py).
+
+Play at a table from the terminal:
+
+    python tarneeb/client.py --name Ann
+    python tarneeb/client.py --table 3          # take a free seat at table 3
+
+Commands: ``bid 8 hearts``, ``pass``, ``play QH`` (rank and suit letter) or
+``play 3`` (hand position), ``state``, ``stats`` and ``quit``.
+
+``--bots N`` instead opens N connections that each sit at their own table
+and play random legal moves as fast as the server answers, then prints the
+round trip times they saw; use it to load-test a server.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from card import Card
+from server import DEFAULT_HOST, DEFAULT_PORT, LatencyStats
+
+SUIT_LETTERS = {suit[0].upper(): suit for suit in Card.SUITS}
+
+
+def card_name(card_id):
+    return str(Card.from_id(card_id))
+
+
+def parse_card(text, hand):
+    """Card id from ``"QH"``/``"10d"`` or a hand position; None if not recognized."""
+    text = text.strip().upper()
+    if text.isdigit() and int(text) < len(hand):
+        return hand[int(text)]
+    rank, suit = text[:-1], SUIT_LETTERS.get(text[-1:])
+    if suit is None or rank not in Card.RANKS:
+        return None
+    return Card.SUITS.index(suit) * 13 + Card.RANKS.index(rank)
+
+
+def parse_command(line, state):
+    """Protocol message for a command line, or None if it is not understood."""
+    words = line.split()
+    if not words:
+        return None
+    command = words[0].lower()
+    if command == "pass":
+        return {"op": "bid", "bid": 0}
+    if command == "bid" and len(words) == 3 and words[1].isdigit():
+        suit = next((s for s in Card.SUITS if s.startswith(words[2].lower())), None)
+        return {"op": "bid", "bid": int(words[1]), "suit": suit}
+    if command == "play" and len(words) == 2 and state:
+        card_id = parse_card(words[1], state["hand"])
+        return {"op": "play", "card": card_id} if card_id is not None else None
+    if command in ("state", "stats", "leave"):
+        return {"op": command}
+    return None
+
+
+def format_state(state):
+    """Text description of a state message."""
+    names = state["names"]
+    lines = [f"Table {state['table']}, scores {state['scores'][0]}-{state['scores'][1]}, "
+             f"tricks {state['tricks_won'][0]}-{state['tricks_won'][1]}"]
+    if state["phase"] == "bidding":
+        bids = ", ".join(f"{names[i]}: {bid or '-'}" for i, bid in enumerate(state["bids"]))
+        lines.append(f"Bidding ({bids})")
+    else:
+        lines.append(f"Contract {state['highest_bid']} {state['trump']} by {names[state['highest_bidder']]}")
+        trick = [f"{names[i]}: {card_name(c)}" for i, c in enumerate(state["trick"]) if c is not None]
+        if trick:
+            lines.append("Trick: " + ", ".join(trick))
+    lines.append("Hand: " + " ".join(f"{i}:{card_name(c)}" for i, c in enumerate(state["hand"])))
+    if state["your_turn"]:
+        if "legal" in state:
+            lines.append("Your turn, legal: " + " ".join(card_name(c) for c in state["legal"]))
+        else:
+            lines.append("Your turn")
+    return "\n".join(lines)
+
+
+async def send(writer, message):
+    writer.write(json.dumps(message).encode() + b"\n")
+    await writer.drain()
+
+
+async def interactive(host, port, name, table=None):
+    reader, writer = await asyncio.open_connection(host, port, limit=1 << 20)
+    join = {"op": "join", "name": name}
+    if table is not None:
+        join["table"] = table
+    await send(writer, join)
+    loop = asyncio.get_running_loop()
+    state = {}
+
+    async def read_server():
+        while True:
+            line = await reader.readline()
+            if not line:
+                print("Disconnected")
+                return
+            message = json.loads(line)
+            if message["type"] == "state":
+                state.clear()
+                state.update(message)
+                print(format_state(message), flush=True)
+            elif message["type"] == "error":
+                print("Error:", message["message"], flush=True)
+            else:
+                print(json.dumps(message), flush=True)
+
+    server_task = loop.create_task(read_server())
+    while not server_task.done():
+        line = await loop.run_in_executor(None, sys.stdin.readline)
+        if not line or line.strip().lower() == "quit":
+            break
+        message = parse_command(line, state)
+        if message is None:
+            print("Commands: bid N SUIT, pass, play CARD, state, stats, quit")
+            continue
+        await send(writer, message)
+    server_task.cancel()
+    writer.close()
+
+
+async def bot(host, port, rng, latency, games=1):
+    """Play ``games`` games with random legal moves, timing each move's answer."""
+    reader, writer = await asyncio.open_connection(host, port, limit=1 << 20)
+    await send(writer, {"op": "join", "name": "Bot"})
+    sent = None
+    while games:
+        line = await reader.readline()
+        if not line:
+            break
+        message = json.loads(line)
+        if message["type"] == "game_over":
+            games -= 1
+            if games:
+                await send(writer, {"op": "leave"})
+                await send(writer, {"op": "join", "name": "Bot"})
+            continue
+        if message["type"] != "state" or not message["your_turn"]:
+            continue
+        if sent is not None:
+            latency.add(time.perf_counter() - sent)
+            sent = None
+        if message["phase"] == "bidding":
+            move = {"op": "bid", "bid": 0}
+        elif "legal" in message:
+            move = {"op": "play", "card": rng.choice(message["legal"])}
+        else:
+            continue  # Full trick waiting to be collected
+        sent = time.perf_counter()
+        await send(writer, move)
+    writer.close()
+
+
+async def run_bots(host, port, count, games, seed):
+    latency = LatencyStats()
+    start = time.perf_counter()
+    await asyncio.gather(*(bot(host, port, random.Random(seed + i), latency, games) for i in range(count)))
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"bots": count, "games": count * games, "elapsed_sec": round(elapsed, 3),
+                      "moves": latency.count, "round_trip": latency.summary()}))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Connect to a Tarneeb table server.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="server address")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="server port")
+    parser.add_argument("--name", default="Player", help="name shown at the table")
+    parser.add_argument("--table", type=int, default=None, help="join this table instead of a new one")
+    parser.add_argument("--bots", type=int, default=0, help="run N random bots instead")
+    parser.add_argument("--games", type=int, default=1, help="games each bot plays")
+    parser.add_argument("-s", "--seed", type=int, default=0, help="RNG seed of the bots")
+    args = parser.parse_args(argv)
+    if args.bots:
+        asyncio.run(run_bots(args.host, args.port, args.bots, args.games, args.seed))
+    else:
+        asyncio.run(interactive(args.host, args.port, args.name, args.table))
+
+
+if __name__ == "__main__":
+    main()
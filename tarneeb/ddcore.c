@@ -0,0 +1,898 @@
+/* Double-dummy search core for solver.py, loaded through ctypes by ddcore.py.
+ *
+ * This is the search of DoubleDummySolver: null-window searches ("can
+ * team 0 take at least target tricks?") over bitboard hands, bounds from
+ * quick tricks and top trumps, one card of every run of equivalent cards,
+ * a sharper move ordering, and a partition-search transposition table. On
+ * top of that it counts tricks cashed after crossing to partner and first
+ * tries the lead that last refuted a position with as many tricks left.
+ * Every search reports the cards whose ranks decided it, and its bound is
+ * stored for all positions with the same suit lengths per hand, leader, and
+ * owners of the top cards of each suit down to the lowest deciding card.
+ *
+ * The table has a fixed size; when it fills up it keeps the positions with
+ * the most tricks left and drops the rest.
+ */
+#include <stdint.h>
+#include <stdlib.h>
+#include <string.h>
+
+typedef uint64_t u64;
+
+#define LANE 0x1FFFULL
+#define PROBES 8
+#define KEEP 4  /* Keep a quarter of the table when pruning */
+
+static const u64 SUIT_MASKS[4] = {LANE, LANE << 13, LANE << 26, LANE << 39};
+
+/* Bounds of the positions with the same lengths, leader, number of top
+ * cards per suit (tops) and owners of those top cards */
+typedef struct {
+    u64 lengths;
+    uint32_t tops;  /* Leader + 1 in the top bits, so never 0 for a used entry */
+    uint32_t owners[4];
+    signed char lower, upper;
+} Entry;
+
+/* The tops patterns stored for one lengths and leader, in a list of blocks */
+typedef struct {
+    u64 lengths;
+    int leader;  /* Seat + 1, 0 for an unused bucket */
+    int first;  /* Index of the first Block, -1 for none */
+} Bucket;
+
+#define BLOCK 6
+
+typedef struct {
+    uint32_t tops[BLOCK];
+    int count, next;
+    u64 filter[BLOCK][2];  /* Bits owner_bits() of every owners stored under a pattern */
+} Block;
+
+typedef struct {
+    u64 trump;  /* Mask of the trump suit, 0 without trumps */
+    int table_bits;  /* 2 ** table_bits entries, an eighth as many buckets and blocks */
+    size_t capacity;
+    Entry *entries;
+    Bucket *buckets;
+    Block *blocks;
+    size_t entry_count, bucket_count, block_count;
+    long long nodes;
+    int killer[14];  /* Lead that last cut off, by tricks left, plus one */
+} Solver;
+
+/* Everything a trick-boundary search needs to find or store its entry */
+typedef struct {
+    u64 lengths;
+    int leader;
+    u64 codes[4];  /* Owners of every outstanding card, see position() */
+    int counts[4];  /* Outstanding cards per suit */
+} Position;
+
+/* Cards per 13-bit lane; a table beats the compiler's portable popcount */
+static uint8_t LANE_COUNT[1 << 13];
+
+static int popcount(u64 x)
+{
+    return LANE_COUNT[x & LANE] + LANE_COUNT[x >> 13 & LANE] + LANE_COUNT[x >> 26 & LANE]
+           + LANE_COUNT[x >> 39 & LANE];
+}
+
+static int top_id(u64 x) { return 63 - __builtin_clzll(x); }
+
+static u64 suit_of(int card_id) { return SUIT_MASKS[card_id / 13]; }
+
+/* Does card_id beat the currently winning card win_id? */
+static int beats(const Solver *s, int card_id, int win_id, u64 lead)
+{
+    u64 bit = 1ULL << card_id, win_bit = 1ULL << win_id;
+    if (bit & s->trump)
+        return !(win_bit & s->trump) || card_id > win_id;
+    if (bit & lead)
+        return !(win_bit & s->trump) && card_id > win_id;
+    return 0;
+}
+
+/* Cards of hand ranked above every card of others (same suit). */
+static u64 top_cards(u64 hand, u64 others)
+{
+    if (!others)
+        return hand;
+    return hand & ~((2ULL << top_id(others)) - 1);
+}
+
+/* The count highest cards of a single-suit mask. */
+static u64 top_of(u64 cards, int count)
+{
+    u64 top = 0;
+    while (count--) {
+        u64 bit = 1ULL << top_id(cards);
+        top |= bit;
+        cards ^= bit;
+    }
+    return top;
+}
+
+/* Lower bound on the tricks the leader wins by cashing top cards, and the
+ * cards it relies on. Suits stop being counted once need is reached, which
+ * keeps the cards to the ones that matter. */
+static int quick_tricks(const Solver *s, const u64 *h, int leader, int need, u64 *cards)
+{
+    u64 hand = h[leader];
+    u64 lho = h[(leader + 1) & 3], rho = h[(leader + 3) & 3];
+    u64 others = lho | rho | h[(leader + 2) & 3];
+    u64 trump = s->trump;
+    int tricks = 0;
+    *cards = 0;
+    if (trump) {
+        u64 tops = top_cards(hand & trump, others & trump);
+        tricks = popcount(tops);
+        *cards = tops;
+        if (tricks >= need)
+            return tricks;
+        /* Side-suit winners only stand once the opponents are out of trumps,
+         * or for as many rounds as every opponent with trumps left follows */
+        int lho_ruffs = popcount(lho & trump) > tricks, rho_ruffs = popcount(rho & trump) > tricks;
+        if (lho_ruffs || rho_ruffs) {
+            int best = 0;
+            u64 best_cards = 0;
+            for (int suit = 0; suit < 4; suit++) {
+                u64 mask = SUIT_MASKS[suit];
+                if (mask == trump)
+                    continue;
+                u64 suit_tops = top_cards(hand & mask, others & mask);
+                int count = popcount(suit_tops);
+                if (lho_ruffs && popcount(lho & mask) < count)
+                    count = popcount(lho & mask);
+                if (rho_ruffs && popcount(rho & mask) < count)
+                    count = popcount(rho & mask);
+                if (count > best) {
+                    best = count;
+                    best_cards = top_of(suit_tops, count);
+                }
+            }
+            *cards |= best_cards;
+            return tricks + best;
+        }
+    }
+    for (int suit = 0; suit < 4 && tricks < need; suit++) {
+        if (SUIT_MASKS[suit] == trump)
+            continue;
+        u64 tops = top_cards(hand & SUIT_MASKS[suit], others & SUIT_MASKS[suit]);
+        tricks += popcount(tops);
+        *cards |= tops;
+    }
+    return tricks;
+}
+
+/* Tricks the leader's side wins by cashing the leader's top cards, then
+ * leading to a top card of partner's and cashing partner's top cards, and
+ * the cards it relies on. Partner must not need to throw a top card on the
+ * leader's winners, and the opponents must be out of trumps once the
+ * leader's top trumps are played. */
+static int crossing_tricks(const Solver *s, const u64 *h, int leader, u64 *cards)
+{
+    u64 hand = h[leader], mate = h[(leader + 2) & 3];
+    u64 lho = h[(leader + 1) & 3], rho = h[(leader + 3) & 3];
+    u64 mine = 0, theirs = 0;
+    int entry = 0, discards = 0, spare = 0;
+    *cards = 0;
+    for (int suit = 0; suit < 4; suit++) {
+        u64 mask = SUIT_MASKS[suit];
+        u64 cashed = top_cards(hand & mask, (lho | rho | mate) & mask);
+        u64 kept = top_cards(mate & mask, (lho | rho | hand) & mask);
+        int count = popcount(cashed), held = popcount(mate & mask);
+        mine |= cashed;
+        theirs |= kept;
+        if (cashed) {
+            /* Partner follows as long as it can and throws a card after that */
+            if (count > held)
+                discards += count - held;
+            else
+                spare += held - count;
+        } else {
+            spare += held - popcount(kept);
+            if (kept && hand & mask)
+                entry = 1;
+        }
+    }
+    if (!entry || discards > spare)
+        return 0;
+    if (s->trump) {
+        int drawn = popcount(mine & s->trump);
+        if (popcount(lho & s->trump) > drawn || popcount(rho & s->trump) > drawn)
+            return 0;
+    }
+    *cards = mine | theirs;
+    return popcount(mine | theirs);
+}
+
+/* Tricks the leader's side wins by leading a card of some suit to a top
+ * card of partner's and cashing partner's top cards from there, and the
+ * cards it relies on. The card led to partner must not be ruffed. */
+static int entry_tricks(const Solver *s, const u64 *h, int leader, u64 *cards)
+{
+    int partner = (leader + 2) & 3;
+    u64 lho = h[(leader + 1) & 3], rho = h[(leader + 3) & 3];
+    int ruffs = s->trump && ((lho | rho) & s->trump);
+    *cards = 0;
+    for (int suit = 0; suit < 4; suit++) {
+        u64 mask = SUIT_MASKS[suit];
+        if (!(h[leader] & mask) || !top_cards(h[partner] & mask, (h[leader] | lho | rho) & mask))
+            continue;
+        if (ruffs && mask != s->trump && (!(lho & mask) || !(rho & mask)))
+            continue;
+        return quick_tricks(s, h, partner, 13, cards);
+    }
+    return 0;
+}
+
+/* Tricks the side of seat is sure to win with trumps above all of the
+ * opponents' trumps, and the cards it relies on. */
+static int sure_trump_tricks(const Solver *s, const u64 *h, int seat, u64 *cards)
+{
+    u64 trump = s->trump;
+    *cards = 0;
+    if (!trump)
+        return 0;
+    u64 mine = h[seat & 3] & trump, partner = h[(seat + 2) & 3] & trump;
+    u64 tops = top_cards(mine | partner, (h[(seat + 1) & 3] | h[(seat + 3) & 3]) & trump);
+    if (!tops)
+        return 0;
+    *cards = tops;
+    /* Partners' top trumps may fall on the same trick */
+    int a = popcount(tops & mine), b = popcount(tops & partner);
+    return a > b ? a : b;
+}
+
+/* Tricks the leader's side is sure of by cashing top cards of the leader or
+ * of partner, or with top trumps, counting no further than need. */
+static int cashing_tricks(const Solver *s, const u64 *h, int leader, int need, u64 *cards)
+{
+    u64 other_cards;
+    int tricks = quick_tricks(s, h, leader, need, cards);
+    if (tricks >= need)
+        return tricks;
+    int other = crossing_tricks(s, h, leader, &other_cards);
+    if (other > tricks) {
+        tricks = other;
+        *cards = other_cards;
+        if (tricks >= need)
+            return tricks;
+    }
+    other = entry_tricks(s, h, leader, &other_cards);
+    if (other > tricks) {
+        tricks = other;
+        *cards = other_cards;
+        if (tricks >= need)
+            return tricks;
+    }
+    other = sure_trump_tricks(s, h, leader, &other_cards);
+    if (other > tricks) {
+        tricks = other;
+        *cards = other_cards;
+    }
+    return tricks;
+}
+
+/* Team that wins the final trick, and the card that won it by rank, if any. */
+static int last_trick(const Solver *s, const u64 *h, int leader, u64 *relevant)
+{
+    int win_id = top_id(h[leader]), win_seat = leader, contested = 0;
+    u64 lead = suit_of(win_id);
+    for (int i = 1; i < 4; i++) {
+        int seat = (leader + i) & 3;
+        int card_id = top_id(h[seat]);
+        int same_suit = card_id / 13 == win_id / 13;
+        if (beats(s, card_id, win_id, lead)) {
+            win_id = card_id;
+            win_seat = seat;
+            contested = same_suit;
+        } else if (same_suit) {
+            contested = 1;
+        }
+    }
+    *relevant = contested ? 1ULL << win_id : 0;
+    return win_seat & 1;
+}
+
+/* COMPRESS[m][x]: the bits of x at the set bits of m, packed from bit 0,
+ * for 7-bit m and x. SPREAD[x]: bit i of x moved to bit 2 * i. */
+static uint8_t COMPRESS[128][128];
+static uint16_t SPREAD[128];
+
+static void init_tables(void)
+{
+    for (int x = 1; x < 1 << 13; x++)
+        LANE_COUNT[x] = (uint8_t)(LANE_COUNT[x >> 1] + (x & 1));
+    for (int m = 0; m < 128; m++)
+        for (int x = 0; x < 128; x++) {
+            int packed = 0, n = 0;
+            for (int bit = 0; bit < 7; bit++)
+                if (m >> bit & 1)
+                    packed |= (x >> bit & 1) << n++;
+            COMPRESS[m][x] = (uint8_t)packed;
+        }
+    for (int x = 0; x < 128; x++) {
+        int spread = 0;
+        for (int bit = 0; bit < 7; bit++)
+            spread |= (x >> bit & 1) << 2 * bit;
+        SPREAD[x] = (uint16_t)spread;
+    }
+}
+
+/* The bits of a 13-bit lane x at the cards of the lane cards, spread to
+ * every other bit. */
+static u64 spread_at(u64 x, u64 cards)
+{
+    u64 packed = COMPRESS[cards & 127][x & 127]
+                 | (u64)COMPRESS[cards >> 7][x >> 7] << popcount(cards & 127);
+    return SPREAD[packed & 127] | (u64)SPREAD[packed >> 7] << 14;
+}
+
+/* Suit lengths per hand, and per suit a leading 1 followed by two bits (the
+ * seat) for every outstanding card from the top down, so the owners of the
+ * top k of n cards are code >> 2 * (n - k). */
+static void position(const u64 *h, int leader, Position *p)
+{
+    p->lengths = 0;
+    p->leader = leader;
+    for (int suit = 0; suit < 4; suit++) {
+        int shift = 13 * suit;
+        u64 l0 = h[0] >> shift & LANE, l1 = h[1] >> shift & LANE;
+        u64 l2 = h[2] >> shift & LANE, l3 = h[3] >> shift & LANE;
+        u64 cards = l0 | l1 | l2 | l3;
+        p->lengths = p->lengths << 16 | (u64)popcount(l0) << 12 | (u64)popcount(l1) << 8
+                     | (u64)popcount(l2) << 4 | (u64)popcount(l3);
+        p->counts[suit] = popcount(cards);
+        p->codes[suit] = 1ULL << 2 * p->counts[suit] | spread_at(l1 | l3, cards)
+                         | spread_at(l2 | l3, cards) << 1;
+    }
+}
+
+static u64 mix(u64 x)
+{
+    x ^= x >> 31;
+    x *= 0x9E3779B97F4A7C15ULL;
+    return x ^ x >> 29;
+}
+
+static size_t bucket_slot(const Solver *s, u64 lengths, int leader)
+{
+    return mix(lengths * 4 + leader) >> (67 - s->table_bits);
+}
+
+static size_t entry_slot(const Solver *s, u64 lengths, uint32_t tops, const uint32_t *owners)
+{
+    u64 x = mix(lengths ^ (u64)tops << 40);
+    x = mix(x ^ owners[0] ^ (u64)owners[1] << 32);
+    x = mix(x ^ owners[2] ^ (u64)owners[3] << 32);
+    return x >> (64 - s->table_bits);
+}
+
+static void clear(Solver *s)
+{
+    memset(s->entries, 0, s->capacity * sizeof(Entry));
+    memset(s->buckets, 0, s->capacity / 8 * sizeof(Bucket));
+    s->entry_count = s->bucket_count = s->block_count = 0;
+    memset(s->killer, 0, sizeof s->killer);
+}
+
+static Bucket *find_bucket(Solver *s, u64 lengths, int leader, int create)
+{
+    size_t mask = s->capacity / 8 - 1, slot = bucket_slot(s, lengths, leader);
+    for (int i = 0; i < PROBES; i++) {
+        Bucket *bucket = &s->buckets[(slot + i) & mask];
+        if (bucket->leader == leader + 1 && bucket->lengths == lengths)
+            return bucket;
+        if (!bucket->leader) {
+            if (!create)
+                return NULL;
+            bucket->leader = leader + 1;
+            bucket->lengths = lengths;
+            bucket->first = -1;
+            s->bucket_count++;
+            return bucket;
+        }
+    }
+    return NULL;
+}
+
+static Entry *find_entry(Solver *s, u64 lengths, uint32_t tops, const uint32_t *owners, int create)
+{
+    size_t mask = s->capacity - 1, slot = entry_slot(s, lengths, tops, owners);
+    for (int i = 0; i < PROBES; i++) {
+        Entry *entry = &s->entries[(slot + i) & mask];
+        if (entry->tops == tops && entry->lengths == lengths && !memcmp(entry->owners, owners, sizeof(entry->owners)))
+            return entry;
+        if (!entry->tops) {
+            if (!create)
+                return NULL;
+            entry->tops = tops;
+            entry->lengths = lengths;
+            memcpy(entry->owners, owners, sizeof(entry->owners));
+            entry->lower = 0;
+            entry->upper = 13;
+            s->entry_count++;
+            return entry;
+        }
+    }
+    return NULL;
+}
+
+/* Tops patterns pack the leader and four counts of 4 bits. */
+static uint32_t pack_tops(int leader, const int *tops)
+{
+    return (uint32_t)(leader + 1) << 16 | tops[0] << 12 | tops[1] << 8 | tops[2] << 4 | tops[3];
+}
+
+static void pattern_owners(const Position *p, uint32_t tops, uint32_t *owners)
+{
+    for (int suit = 0; suit < 4; suit++) {
+        int k = tops >> (12 - 4 * suit) & 15;
+        owners[suit] = (uint32_t)(p->codes[suit] >> 2 * (p->counts[suit] - k));
+    }
+}
+
+static void owner_bits(const uint32_t *owners, u64 *bits)
+{
+    u64 x = mix(owners[0] ^ (u64)owners[1] << 16 ^ (u64)owners[2] << 32 ^ (u64)owners[3] << 48);
+    bits[0] = 1ULL << (x >> 58);
+    bits[1] = 1ULL << (x >> 52 & 63);
+}
+
+/* Mask of the top cards of each suit named by a tops pattern. */
+static u64 pattern_cards(u64 outstanding, uint32_t tops)
+{
+    u64 cards = 0;
+    for (int suit = 0; suit < 4; suit++) {
+        int k = tops >> (12 - 4 * suit) & 15;
+        if (k)
+            cards |= top_of(outstanding & SUIT_MASKS[suit], k);
+    }
+    return cards;
+}
+
+/* Lowest card of every run of equivalent legal cards. */
+static int representatives(u64 legal, u64 hand, u64 outstanding, int *reps)
+{
+    u64 others = outstanding & ~hand;
+    u64 cards = legal;
+    int n = 0;
+    while (cards) {
+        u64 low = cards & -cards;
+        int card_id = top_id(low);
+        reps[n++] = card_id;
+        /* Skip the rest of the run: all our cards up to the next card held elsewhere */
+        u64 suit = suit_of(card_id);
+        u64 blockers = others & suit & ~((low << 1) - 1);
+        if (blockers)
+            cards &= ~((blockers & -blockers) - 1);
+        else
+            cards &= ~suit;
+    }
+    return n;
+}
+
+/* The strongest card hand can play to a trick led in lead, or -1 when it
+ * can only discard. */
+static int best_reply(const Solver *s, u64 hand, u64 lead)
+{
+    if (hand & lead)
+        return top_id(hand & lead);
+    if (hand & s->trump)
+        return top_id(hand & s->trump);
+    return -1;
+}
+
+/* Is card_id the lowest of a run of hand's cards up to the second highest
+ * of the suit's cards in play, the highest being someone else's? */
+static int forces_top(u64 hand, u64 cards, int card_id)
+{
+    int top = top_id(cards);
+    if (hand >> top & 1 || cards == 1ULL << top)
+        return 0;
+    u64 run = cards & ~(1ULL << top) & ~((1ULL << card_id) - 1);
+    return (run & ~hand) == 0;
+}
+
+/* Representative cards, most promising first. */
+static int ordered_moves(const Solver *s, u64 legal, u64 hand, const u64 *h, int seat, int index,
+                         u64 lead, int win_id, int win_seat, u64 outstanding, int *moves)
+{
+    int n = representatives(legal, hand, outstanding, moves);
+    if (n == 1)
+        return n;
+    u64 trump = s->trump;
+    int keys[13];
+
+    for (int i = 0; i < n; i++) {
+        int card_id = moves[i], rank = card_id % 13;
+        u64 suit = suit_of(card_id);
+        int is_trump = (1ULL << card_id & trump) != 0;
+        if (index == 0) {
+            u64 partner = h[(seat + 2) & 3], lho = h[(seat + 1) & 3], rho = h[(seat + 3) & 3];
+            u64 theirs = (lho | rho) & suit;
+            int score;
+            if (!theirs || (top_id(theirs) < top_id(hand & suit) && !(theirs >> card_id)))
+                score = 4;  /* Cashing a winner */
+            else if ((partner & suit) && top_id(partner & suit) > top_id(theirs))
+                score = 3;  /* Leading towards partner's winner */
+            else if (forces_top(hand, outstanding & suit, card_id))
+                score = 2;  /* Driving out their top card */
+            else
+                score = 1;
+            if (suit != trump && trump) {
+                if ((!(lho & suit) && (lho & trump)) || (!(rho & suit) && (rho & trump)))
+                    score -= 3;  /* An opponent can ruff */
+                else if (!(partner & suit) && (partner & trump))
+                    score += 1;  /* Partner can ruff */
+            }
+            /* Opponents free to discard make for a bushier search */
+            int left = popcount(outstanding) / 4;
+            int width = (lho & suit ? popcount(lho & suit) : left)
+                        + (rho & suit ? popcount(rho & suit) : left);
+            keys[i] = (10 - score) * 100 + width * 20 + rank;
+        } else if (index < 3) {
+            /* The cheapest card that keeps the trick for our side against
+             * the best the players still to come can do, then low cards */
+            int wins = beats(s, card_id, win_id, lead);
+            int best = wins ? card_id : win_id;
+            int ours = wins || (win_seat & 1) == (seat & 1);
+            int reply = best_reply(s, h[(seat + 1) & 3], lead);
+            if (reply >= 0 && beats(s, reply, best, lead)) {
+                best = reply;
+                ours = 0;
+            }
+            if (index == 1 && !ours) {
+                reply = best_reply(s, h[(seat + 2) & 3], lead);
+                ours = reply >= 0 && beats(s, reply, best, lead);
+            }
+            keys[i] = (ours ? 0 : wins ? 1000 : 2000) + is_trump * 100 + rank;
+        } else if ((win_seat & 1) == (seat & 1)) {
+            /* Partner is winning: the lowest cards first and never waste trumps */
+            keys[i] = is_trump * 100 + rank;
+        } else {
+            /* Cheapest winning card first, then the lowest losing cards */
+            keys[i] = (beats(s, card_id, win_id, lead) ? 0 : 1000) + is_trump * 100 + rank;
+        }
+    }
+    for (int i = 1; i < n; i++) {
+        int key = keys[i], move = moves[i], j = i - 1;
+        while (j >= 0 && keys[j] > key) {
+            keys[j + 1] = keys[j];
+            moves[j + 1] = moves[j];
+            j--;
+        }
+        keys[j + 1] = key;
+        moves[j + 1] = move;
+    }
+    return n;
+}
+
+static int search(Solver *s, u64 *h, int leader, int target, u64 *relevant);
+
+/* The entry of a position pattern, added to the table with its pattern if
+ * it is new, or NULL when the table is too crowded around it. */
+static Entry *store(Solver *s, u64 lengths, uint32_t tops, const uint32_t *owners, int remaining)
+{
+    Bucket *bucket = find_bucket(s, lengths, (int)(tops >> 16) - 1, 1);
+    Entry *entry = bucket ? find_entry(s, lengths, tops, owners, 1) : NULL;
+    if (!entry || entry->upper != 13 || entry->lower != 0)
+        return entry;
+    entry->upper = (signed char)remaining;
+    Block *block = NULL;
+    int i = 0;
+    for (int b = bucket->first; b >= 0 && !block; b = s->blocks[b].next)
+        for (i = 0; i < s->blocks[b].count; i++)
+            if (s->blocks[b].tops[i] == tops) {
+                block = &s->blocks[b];
+                break;
+            }
+    if (!block) {
+        if (bucket->first < 0 || s->blocks[bucket->first].count == BLOCK) {
+            int b = (int)s->block_count++;
+            s->blocks[b].count = 0;
+            s->blocks[b].next = bucket->first;
+            bucket->first = b;
+        }
+        block = &s->blocks[bucket->first];
+        i = block->count++;
+        block->tops[i] = tops;
+        block->filter[i][0] = block->filter[i][1] = 0;
+    }
+    u64 bits[2];
+    owner_bits(owners, bits);
+    block->filter[i][0] |= bits[0];
+    block->filter[i][1] |= bits[1];
+    return entry;
+}
+
+static int entry_remaining(const Entry *entry)
+{
+    int cards = 0;
+    for (u64 lengths = entry->lengths; lengths; lengths >>= 4)
+        cards += lengths & 15;
+    return cards / 4;
+}
+
+/* Make room in a full table: keep the entries of the positions with the
+ * most tricks left, the dearest to search again, and drop the rest. */
+static void prune(Solver *s)
+{
+    size_t count[14] = {0}, kept = 0;
+    int least = 14;
+    for (size_t i = 0; i < s->capacity; i++)
+        if (s->entries[i].tops)
+            count[entry_remaining(&s->entries[i])]++;
+    while (least > 0 && kept + count[least - 1] <= s->capacity / KEEP)
+        kept += count[--least];
+    Entry *keep = kept ? malloc(kept * sizeof(Entry)) : NULL;
+    size_t n = 0;
+    if (keep)
+        for (size_t i = 0; i < s->capacity; i++)
+            if (s->entries[i].tops && entry_remaining(&s->entries[i]) >= least)
+                keep[n++] = s->entries[i];
+    int killer[14];
+    memcpy(killer, s->killer, sizeof killer);
+    clear(s);
+    memcpy(s->killer, killer, sizeof killer);
+    for (size_t i = 0; i < n; i++) {
+        Entry *entry = store(s, keep[i].lengths, keep[i].tops, keep[i].owners, 13);
+        if (entry) {
+            entry->lower = keep[i].lower;
+            entry->upper = keep[i].upper;
+        }
+    }
+    free(keep);
+}
+
+/* Try every card for the index-th player of the trick. */
+static int play(Solver *s, u64 *h, int leader, int index, u64 lead, int win_id, int win_seat,
+                int contested, u64 outstanding, int target, u64 *relevant)
+{
+    int seat = (leader + index) & 3;
+    u64 hand = h[seat];
+    u64 legal = index && (hand & lead) ? hand & lead : hand;
+    int maximizing = !(seat & 1);
+    int moves[13];
+    int n = ordered_moves(s, legal, hand, h, seat, index, lead, win_id, win_seat, outstanding, moves);
+    int depth = popcount(outstanding) / 4;
+    u64 skipped = 0;
+    *relevant = 0;
+
+    /* A lead that refuted a sibling position often refutes this one too */
+    if (index == 0 && s->killer[depth]) {
+        for (int i = 1; i < n; i++)
+            if (moves[i] == s->killer[depth] - 1) {
+                memmove(moves + 1, moves, i * sizeof(int));
+                moves[0] = s->killer[depth] - 1;
+                break;
+            }
+    }
+
+    for (int i = 0; i < n; i++) {
+        int card_id = moves[i], result;
+        if (skipped >> card_id & 1)
+            continue;
+        u64 card_lead = lead, child_relevant;
+        int new_win_id = win_id, new_win_seat = win_seat, new_contested = contested;
+        if (index == 0) {
+            card_lead = suit_of(card_id);
+            new_win_id = card_id;
+            new_win_seat = seat;
+            new_contested = 0;
+        } else {
+            int same_suit = card_id / 13 == win_id / 13;
+            /* Decided by rank, which makes the winning rank relevant */
+            if (same_suit)
+                new_contested = 1;
+            if (beats(s, card_id, win_id, lead)) {
+                new_win_id = card_id;
+                new_win_seat = seat;
+                if (!same_suit)
+                    new_contested = 0;
+            }
+        }
+
+        h[seat] = hand & ~(1ULL << card_id);
+        if (index == 3) {
+            result = search(s, h, new_win_seat, target - !(new_win_seat & 1), &child_relevant);
+            if (new_contested)
+                child_relevant |= 1ULL << new_win_id;
+        } else {
+            result = play(s, h, leader, index + 1, card_lead, new_win_id, new_win_seat,
+                          new_contested, outstanding, target, &child_relevant);
+        }
+        h[seat] = hand;
+
+        if (result == maximizing) {
+            if (index == 0)
+                s->killer[depth] = card_id + 1;
+            *relevant = child_relevant;
+            return result;
+        }
+        *relevant |= child_relevant;
+        /* Cards of the suit below every card that decided the searches so far
+         * would have done no better */
+        u64 suit = suit_of(card_id);
+        u64 deciding = *relevant & suit;
+        u64 below = deciding ? (deciding & -deciding) - 1 : ~0ULL;
+        if (1ULL << card_id & below)
+            skipped |= suit & below;
+    }
+    return !maximizing;
+}
+
+/* Can team 0 win target of the remaining tricks with leader on lead? Sets
+ * relevant to the cards whose ranks decided it. */
+static int search(Solver *s, u64 *h, int leader, int target, u64 *relevant)
+{
+    *relevant = 0;
+    if (target <= 0)
+        return 1;
+    u64 outstanding = h[0] | h[1] | h[2] | h[3];
+    int remaining = popcount(outstanding) / 4;
+    if (target > remaining)
+        return 0;
+    if (remaining == 1)
+        return last_trick(s, h, leader, relevant) == 0;
+
+    /* Tricks the side on lead can cash straight away and top trumps of the
+     * other side bound the result */
+    int side = leader & 1;
+    int need = side ? remaining - target + 1 : target;  /* Tricks that settle it for the side on lead */
+    if (cashing_tricks(s, h, leader, need, relevant) >= need)
+        return !side;
+    if (sure_trump_tricks(s, h, leader + 1, relevant) > remaining - need)
+        return side;
+    *relevant = 0;
+
+    Position p;
+    uint32_t owners[4];
+    position(h, leader, &p);
+    Bucket *bucket = find_bucket(s, p.lengths, leader, 0);
+    for (int b = bucket ? bucket->first : -1; b >= 0; b = s->blocks[b].next) {
+        Block *block = &s->blocks[b];
+        for (int i = 0; i < block->count; i++) {
+            uint32_t tops = block->tops[i];
+            u64 bits[2];
+            pattern_owners(&p, tops, owners);
+            owner_bits(owners, bits);
+            if (!(block->filter[i][0] & bits[0]) || !(block->filter[i][1] & bits[1]))
+                continue;
+            Entry *entry = find_entry(s, p.lengths, tops, owners, 0);
+            if (entry && (entry->lower >= target || entry->upper < target)) {
+                /* Patterns that answer are tried first next time */
+                Block *first = &s->blocks[bucket->first];
+                block->tops[i] = first->tops[0];
+                first->tops[0] = tops;
+                memcpy(bits, block->filter[i], sizeof(bits));
+                memcpy(block->filter[i], first->filter[0], sizeof(bits));
+                memcpy(first->filter[0], bits, sizeof(bits));
+                *relevant = pattern_cards(outstanding, tops);
+                return entry->lower >= target;
+            }
+        }
+    }
+
+    s->nodes++;
+    u64 deciding;
+    int result = play(s, h, leader, 0, 0, -1, -1, 0, outstanding, target, &deciding);
+
+    /* Widen the deciding cards to the top cards of each suit down to the
+     * lowest deciding one and store the bound under that pattern */
+    int counts[4];
+    for (int suit = 0; suit < 4; suit++) {
+        u64 suit_cards = outstanding & SUIT_MASKS[suit];
+        u64 rel = deciding & suit_cards;
+        if (rel) {
+            u64 cards = suit_cards & ~((rel & -rel) - 1);
+            *relevant |= cards;
+            counts[suit] = popcount(cards);
+        } else {
+            counts[suit] = 0;
+        }
+    }
+    uint32_t tops = pack_tops(leader, counts);
+    pattern_owners(&p, tops, owners);
+
+    if (4 * s->entry_count > 3 * s->capacity || 32 * s->bucket_count > 3 * s->capacity
+            || 8 * s->block_count == s->capacity)
+        prune(s);
+    Entry *entry = store(s, p.lengths, tops, owners, remaining);
+    if (!entry)
+        return result;  /* Too many collisions to store it */
+    if (result) {
+        if (target > entry->lower)
+            entry->lower = (signed char)target;
+    } else if (target - 1 < entry->upper) {
+        entry->upper = (signed char)(target - 1);
+    }
+    return result;
+}
+
+/* Null-window search starting inside a (possibly empty) trick. */
+static int root(Solver *s, u64 *h, int leader, const int *trick, int count, int target)
+{
+    u64 relevant;
+    if (!count)
+        return search(s, h, leader, target, &relevant);
+    u64 lead = suit_of(trick[0]);
+    int win_id = trick[0], win_seat = leader, contested = 0;
+    for (int i = 1; i < count; i++) {
+        if (trick[i] / 13 == win_id / 13)
+            contested = 1;
+        if (beats(s, trick[i], win_id, lead)) {
+            win_id = trick[i];
+            win_seat = (leader + i) & 3;
+        }
+    }
+    if (count == 4)
+        return search(s, h, win_seat, target - !(win_seat & 1), &relevant);
+    u64 outstanding = h[0] | h[1] | h[2] | h[3];
+    for (int i = 0; i < count; i++)
+        outstanding |= 1ULL << trick[i];
+    return play(s, h, leader, count, lead, win_id, win_seat, contested, outstanding, target,
+                &relevant);
+}
+
+Solver *dd_new(u64 trump, int table_bits)
+{
+    if (!SPREAD[1])
+        init_tables();
+    Solver *s = calloc(1, sizeof(Solver));
+    if (!s)
+        return NULL;
+    s->trump = trump;
+    s->table_bits = table_bits;
+    s->capacity = (size_t)1 << table_bits;
+    s->entries = calloc(s->capacity, sizeof(Entry));
+    s->buckets = calloc(s->capacity / 8, sizeof(Bucket));
+    s->blocks = malloc(s->capacity / 8 * sizeof(Block));
+    if (!s->entries || !s->buckets || !s->blocks) {
+        free(s->entries);
+        free(s->buckets);
+        free(s->blocks);
+        free(s);
+        return NULL;
+    }
+    return s;
+}
+
+void dd_free(Solver *s)
+{
+    if (s) {
+        free(s->entries);
+        free(s->buckets);
+        free(s->blocks);
+        free(s);
+    }
+}
+
+void dd_clear(Solver *s) { clear(s); }
+
+long long dd_nodes(const Solver *s) { return s->nodes; }
+
+/* Tricks team 0 still wins; trick holds the count card ids already played. */
+int dd_solve(Solver *s, const u64 *hands, int leader, const int *trick, int count)
+{
+    u64 h[4] = {hands[0], hands[1], hands[2], hands[3]};
+    int low = 0, high = (popcount(h[0] | h[1] | h[2] | h[3]) + count) / 4;
+    /* Step from an even split towards the value with null-window searches */
+    int target = (high + 1) / 2;
+    while (low < high) {
+        if (root(s, h, leader, trick, count, target)) {
+            low = target;
+            target++;
+        } else {
+            high = target - 1;
+            target--;
+        }
+        if (target > high)
+            target = high;
+        if (target <= low)
+            target = low + 1;
+    }
+    return low;
+}
@@ -0,0 +1,124 @@
+"""Compiled search core for ``solver``.
+
+``ddcore.c`` is the double-dummy search of ``DoubleDummySolver`` in C, about
+a hundred times faster than the Python search, which takes seconds on full
+deals. It is built with the system C compiler the first time it is needed
+and loaded with ``ctypes``. The library is kept in ``__pycache__`` next to
+this file (or the temporary directory if that is not writable) under a name
+holding a hash of the source, machine type, compiler and flags, so an edited
+source or another machine gets its own build. ``load()`` returns None when
+there is no compiler and ``solver`` then falls back to the Python search; set
+``TARNEEB_NO_CCORE`` to force that.
+"""
+import ctypes
+import hashlib
+import os
+import platform
+import shlex
+import subprocess
+import sys
+import sysconfig
+import tempfile
+
+SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ddcore.c")
+
+# Positions in a core's transposition table, as a power of two (24 bytes each)
+TABLE_BITS = 20
+
+_library = None
+_loaded = False
+
+
+def load():
+    """The loaded core library, or None if it cannot be built."""
+    global _library, _loaded
+    if not _loaded:
+        _loaded = True
+        if not os.environ.get("TARNEEB_NO_CCORE"):
+            try:
+                _library = _open(_build())
+            except (OSError, subprocess.SubprocessError) as error:
+                print(f"ddcore: using the Python solver ({error})", file=sys.stderr)
+    return _library
+
+
+def _build():
+    compiler = shlex.split(os.environ.get("CC") or sysconfig.get_config_var("CC") or "cc")
+    with open(SOURCE, "rb") as source:
+        code = source.read()
+    # Portable flags, so a library shared between machines runs on all of them;
+    # the name still holds the machine, compiler and flags it was built for
+    names = []
+    for flags in (["-O3"], ["-O2"]):
+        key = repr((platform.machine(), compiler, flags)).encode()
+        digest = hashlib.sha1(code + key).hexdigest()[:16]
+        names.append((flags, f"ddcore-{digest}{'.dll' if sys.platform == 'win32' else '.so'}"))
+    folders = [os.path.join(os.path.dirname(SOURCE), "__pycache__"), tempfile.gettempdir()]
+    for folder in folders:
+        for _, name in names:
+            path = os.path.join(folder, name)
+            if os.path.exists(path):
+                return path
+
+    error = None
+    for folder in folders:
+        try:
+            os.makedirs(folder, exist_ok=True)
+        except OSError as failure:
+            error = failure
+            continue
+        for flags, name in names:
+            path = os.path.join(folder, name)
+            # Several processes may build at once, so each writes its own file first
+            partial = f"{path}.{os.getpid()}"
+            try:
+                subprocess.run(compiler + flags + ["-shared", "-fPIC", "-o", partial, SOURCE],
+                               check=True, capture_output=True, timeout=120)
+                os.replace(partial, path)
+                return path
+            except (OSError, subprocess.SubprocessError) as failure:
+                error = failure
+    raise error
+
+
+def _open(path):
+    library = ctypes.CDLL(path)
+    library.dd_new.argtypes = [ctypes.c_uint64, ctypes.c_int]
+    library.dd_new.restype = ctypes.c_void_p
+    library.dd_free.argtypes = [ctypes.c_void_p]
+    library.dd_free.restype = None
+    library.dd_clear.argtypes = [ctypes.c_void_p]
+    library.dd_clear.restype = None
+    library.dd_nodes.argtypes = [ctypes.c_void_p]
+    library.dd_nodes.restype = ctypes.c_longlong
+    library.dd_solve.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_uint64), ctypes.c_int,
+                                 ctypes.POINTER(ctypes.c_int), ctypes.c_int]
+    library.dd_solve.restype = ctypes.c_int
+    return library
+
+
+class Search:
+    """One solver of the core, with its own transposition table."""
+
+    def __init__(self, library, trump):
+        self.library = library
+        self.handle = library.dd_new(trump, TABLE_BITS)
+        if not self.handle:
+            raise MemoryError("no memory for the solver's transposition table")
+
+    def __del__(self):
+        if getattr(self, "handle", None):
+            self.library.dd_free(self.handle)
+            self.handle = None
+
+    @property
+    def nodes(self):
+        return self.library.dd_nodes(self.handle)
+
+    def clear(self):
+        self.library.dd_clear(self.handle)
+
+    def solve(self, hands, leader, trick=()):
+        """Tricks team 0 still wins, as ``DoubleDummySolver.solve``."""
+        return self.library.dd_solve(self.handle, (ctypes.c_uint64 * 4)(*hands), leader,
+                                     (ctypes.c_int * 4)(*trick), len(trick))
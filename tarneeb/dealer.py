@@ -0,0 +1,87 @@
+"""Vectorized shuffle-and-deal for generating many deals at once.
+
+A batch of ``n`` deals is an ``(n, 4, 13)`` ``int8`` array of card ids
+(``suit_index * 13 + rank_index``, see ``Card.id``), with every hand sorted
+by id. Deals can also be turned into per-seat bitboards (see ``bitboard``)
+or back into lists of ``Card`` objects for ``TarneebGame``.
+"""
+import numpy as np
+
+from card import Card
+from deck import Deck
+
+
+def make_rng(seed=None):
+    """Return a ``numpy.random.Generator`` for a seed (or an existing generator)."""
+    if isinstance(seed, np.random.Generator):
+        return seed
+    return np.random.default_rng(seed)
+
+
+def spawn_rngs(seed, count):
+    """Create ``count`` independent generators from one seed, e.g. one per worker."""
+    return [np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(count)]
+
+
+def deal_batch(n, rng=None):
+    """Deal ``n`` random deals as an ``(n, 4, 13)`` array of sorted card ids."""
+    rng = make_rng(rng)
+    # Sorting uniform random keys gives a uniform permutation of each deck
+    deals = np.argsort(rng.random((n, 52)), axis=1).astype(np.int8)
+    deals = deals.reshape(n, 4, 13)
+    deals.sort(axis=2)
+    return deals
+
+
+def deal_masks(deals):
+    """Convert an ``(n, 4, 13)`` array of card ids into ``(n, 4)`` uint64 bitboards."""
+    bits = np.left_shift(np.uint64(1), deals.astype(np.uint64))
+    return bits.sum(axis=-1, dtype=np.uint64)
+
+
+def hands_from_ids(deal):
+    """Convert one ``(4, 13)`` deal into four sorted lists of ``Card`` objects."""
+    hands = []
+    for seat_ids in deal:
+        hand = [Card.from_id(int(card_id)) for card_id in seat_ids]
+        Deck._sort_hand(hand)
+        hands.append(hand)
+    return hands
+
+
+def hands_from_masks(masks):
+    """Convert four bitboards into four sorted lists of ``Card`` objects."""
+    hands = []
+    for mask in masks:
+        mask = int(mask)
+        hand = [Card.from_id(card_id) for card_id in range(52) if mask >> card_id & 1]
+        Deck._sort_hand(hand)
+        hands.append(hand)
+    return hands
+
+
+class BatchDealer:
+    """Seeded source of deals that hands them out in large vectorized batches."""
+
+    def __init__(self, seed=None, batch_size=65536):
+        self.rng = make_rng(seed)
+        self.batch_size = batch_size
+        self._batch = None
+        self._next = 0
+
+    def deal(self, n):
+        """Deal ``n`` deals at once as an ``(n, 4, 13)`` array."""
+        return deal_batch(n, self.rng)
+
+    def masks(self, n):
+        """Deal ``n`` deals at once as ``(n, 4)`` uint64 bitboards."""
+        return deal_masks(deal_batch(n, self.rng))
+
+    def next_hands(self):
+        """Return the next deal as ``Card`` hands, refilling the batch as needed."""
+        if self._batch is None or self._next >= len(self._batch):
+            self._batch = deal_batch(self.batch_size, self.rng)
+            self._next = 0
+        deal = self._batch[self._next]
+        self._next += 1
+        return hands_from_ids(deal)
@@ -0,0 +1,214 @@
+"""Memoized AI decisions.
+
+``CachedStrategy`` answers a seat's decisions from a ``DecisionCache`` and
+only asks the strategy it wraps (the built-in heuristics by default) on a
+miss. Situations are keyed by exactly what that strategy looks at, as plain
+tuples of ints and strings:
+
+    ("bid", hand mask, highest bid)
+    ("trump", hand mask)
+    ("play", seat, legal-card mask, trick card ids by seat (-1 if none), leading suit, trump suit)
+
+Plays are stored as card ids, not hand indices, so the answer is the same
+for any order of the hand; a play with a single legal card is not cached.
+Only the decisions a strategy lists in ``cacheable`` (those that depend on
+nothing but their key and cost more than a lookup) are memoized, the others
+are passed straight through. For the built-in heuristics that is the bids:
+a play takes about as long as a lookup.
+
+The cache keeps the most recently used entries in memory. With ``path`` it
+is also backed by an SQLite file that any number of processes can share:
+misses in memory are looked up there and new decisions are written back in
+batches, so later runs and the other workers of a simulation or tournament
+start warm. Counters are in ``stats()``.
+
+A cache may be used from several threads (the table server runs blocking
+strategies in a thread pool): a lock guards the entries and the one SQLite
+connection, which is opened to be shared between threads.
+"""
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from strategy import Strategy, make_strategy
+
+# Entries kept in memory per cache
+DEFAULT_SIZE = 200_000
+# New decisions written to the disk store per transaction
+FLUSH_EVERY = 1000
+
+_MISSING = object()
+
+
+def bid_key(player, game):
+    return ("bid", player.mask, game.highest_bid)
+
+
+def trump_key(player):
+    return ("trump", player.mask)
+
+
+def play_key(player, valid, game):
+    trick = tuple([card.id if card is not None else -1 for card in game.current_trick])
+    return ("play", player.id, valid, trick, game.leading_suit, game.trump_suit)
+
+
+def encode(item):
+    return json.dumps(item, separators=(",", ":"))
+
+
+def decode(text):
+    """Key or decision from its JSON text, with the tuples JSON turned into lists restored."""
+    item = json.loads(text)
+    if isinstance(item, list):
+        return tuple(tuple(part) if isinstance(part, list) else part for part in item)
+    return item
+
+
+class DecisionCache:
+    """Bounded LRU map from situation keys to decisions, optionally backed by a file."""
+
+    def __init__(self, size=DEFAULT_SIZE, path=None):
+        self.size = size
+        self.path = path
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._db = None  # Opened on first use, so every process gets its own connection
+        self._pending = []  # (key, value) not written to the store yet
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """The decision stored for ``key``, or None."""
+        with self._lock:
+            value = self.entries.get(key, _MISSING)
+            if value is not _MISSING:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return value
+            if self.path is not None:
+                row = self._store().execute("SELECT value FROM decisions WHERE key = ?",
+                                            (encode(key),)).fetchone()
+                if row is not None:
+                    value = decode(row[0])
+                    self._remember(key, value)
+                    self.disk_hits += 1
+                    return value
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._remember(key, value)
+            if self.path is not None:
+                self._pending.append((encode(key), encode(value)))
+                if len(self._pending) >= FLUSH_EVERY:
+                    self._flush()
+
+    def _remember(self, key, value):
+        self.entries[key] = value
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def _store(self):
+        if self._db is None:
+            # Concurrent writers wait for each other instead of failing; the
+            # lock serializes the threads sharing the connection
+            self._db = sqlite3.connect(self.path, timeout=60, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS decisions (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        return self._db
+
+    def flush(self):
+        """Write the pending decisions to the disk store."""
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if self._pending:
+            db = self._store()
+            with db:
+                db.executemany("INSERT OR IGNORE INTO decisions VALUES (?, ?)", self._pending)
+            self._pending = []
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def stats(self):
+        """Hit and miss counters and the hit rate of the lookups so far."""
+        with self._lock:
+            return self._stats()
+
+    def _stats(self):
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "lookups": lookups,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "entries": len(self.entries),
+            "evictions": self.evictions,
+        }
+
+
+class CachedStrategy(Strategy):
+    """Another strategy's decisions, memoized by situation."""
+
+    name = "cached"
+
+    def __init__(self, inner="heuristic", size=DEFAULT_SIZE, path=None):
+        self.inner = make_strategy(inner)
+        if not self.inner.cacheable:
+            raise ValueError(f"strategy {self.inner} has no decisions that can be cached")
+        self.cache = DecisionCache(size, path)
+        self.blocking = self.inner.blocking
+
+    def bid(self, player, game):
+        if "bid" not in self.inner.cacheable:
+            return self.inner.bid(player, game)
+        key = bid_key(player, game)
+        decision = self.cache.get(key)
+        if decision is None:
+            decision = tuple(self.inner.bid(player, game))
+            self.cache.put(key, decision)
+        return decision
+
+    def choose_trump(self, player, game):
+        if "trump" not in self.inner.cacheable:
+            return self.inner.choose_trump(player, game)
+        key = trump_key(player)
+        suit = self.cache.get(key)
+        if suit is None:
+            suit = self.inner.choose_trump(player, game)
+            self.cache.put(key, suit)
+        return suit
+
+    def play(self, player, game):
+        if "play" not in self.inner.cacheable:
+            return self.inner.play(player, game)
+        valid = player.valid_mask(game.leading_suit)
+        if valid and not valid & (valid - 1):
+            # A single legal card is no decision
+            return player.index_of(valid)
+        key = play_key(player, valid, game)
+        card_id = self.cache.get(key)
+        if card_id is None:
+            card_id = player.hand[self.inner.play(player, game)].id
+            self.cache.put(key, card_id)
+        return player.index_of(1 << card_id)
+
+    def stats(self):
+        return self.cache.stats()
+
+    def close(self):
+        self.cache.close()
+        self.inner.close()
@@ -2,16 +2,16 @@ import random
 from card import Card
 
 class Deck:
+    # Cards carry no per-game state, so every deck deals the same 52 objects
+    CARDS = tuple(Card(suit, rank) for suit in Card.SUITS for rank in Card.RANKS)
+    
     def __init__(self):
         self.cards = []
         self.reset()
     
     def reset(self):
         """Create a new deck with all 52 cards."""
-        self.cards = []
-        for suit in Card.SUITS:
-            for rank in Card.RANKS:
-                self.cards.append(Card(suit, rank))
+        self.cards = list(Deck.CARDS)
     
     def shuffle(self):
         """Randomly shuffle the deck."""
@@ -33,7 +33,8 @@ class Deck:
         
         return hands
     
-    def _sort_hand(self, hand):
+    @staticmethod
+    def _sort_hand(hand):
         """Sort a hand by suit and rank."""
         # Sort by suit first (hearts, spades, diamonds, clubs) then by rank
         suit_order = {"hearts": 0, "spades": 1, "diamonds": 2, "clubs": 3}
@@ -0,0 +1,46 @@
+"""Shared fonts and a cache of rendered text.
+
+``pygame.font.SysFont`` scans the system font list on every call and
+``Font.render`` rasterizes the string again each time, so draw code gets its
+fonts from ``get_font`` and its text surfaces from ``render``. Rendered
+surfaces are kept in a bounded LRU cache keyed by (font, text, colour); the
+returned surfaces are shared and must not be drawn on.
+"""
+from collections import OrderedDict
+
+import pygame
+
+# Upper bound on cached text surfaces; scores and messages change, labels don't
+MAX_TEXT_SURFACES = 512
+
+_fonts = {}
+_text_cache = OrderedDict()
+
+
+def get_font(name, size, bold=False):
+    """The shared ``SysFont`` for a name, size and weight, created on first use."""
+    key = (name, size, bold)
+    font = _fonts.get(key)
+    if font is None:
+        font = _fonts[key] = pygame.font.SysFont(name, size, bold=bold)
+    return font
+
+
+def render(font, text, color, antialias=True):
+    """Rendered surface of ``text``, reused while it stays in the cache."""
+    key = (font, text, color, antialias)
+    surf = _text_cache.get(key)
+    if surf is not None:
+        _text_cache.move_to_end(key)
+        return surf
+    surf = font.render(text, antialias, color)
+    _text_cache[key] = surf
+    if len(_text_cache) > MAX_TEXT_SURFACES:
+        _text_cache.popitem(last=False)
+    return surf
+
+
+def clear():
+    """Drop every cached font and surface, e.g. after ``pygame.quit()``."""
+    _fonts.clear()
+    _text_cache.clear()
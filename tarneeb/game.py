@@ -1,29 +1,36 @@
 from deck import Deck
+from knowledge import Knowledge
 from player import Player
+import perf
+import tricktable
 import random
 
 class TarneebGame:
-    def __init__(self, target_score=31):
+    def __init__(self, target_score=31, players=None, dealer=None, hands=None):
         self.deck = Deck()
-        self.players = [
-            Player("You", 0),
-            Player("AI-1", 1),
-            Player("Partner", 2),
-            Player("AI-2", 3)
-        ]
-        self.players[0].ai = False  # First player is human
+        if players is None:
+            players = [
+                Player("You", 0),
+                Player("AI-1", 1),
+                Player("Partner", 2),
+                Player("AI-2", 3)
+            ]
+            players[0].ai = False  # First player is human
+        self.players = players
         
         self.current_player = 0
-        self.dealer = random.randint(0, 3)
+        self.dealer = random.randint(0, 3) if dealer is None else dealer
         self.target_score = target_score
+        self.recorder = None  # Optional records.RecordWriter that gets every finished round
         self.scores = {0: 0, 1: 0}  # Team scores
-        self.reset_round()
+        self.reset_round(hands)
     
-    def reset_round(self):
-        """Reset for a new round."""
-        self.deck.reset()
-        self.deck.shuffle()
-        hands = self.deck.deal()
+    def reset_round(self, hands=None):
+        """Reset for a new round, optionally with pre-dealt hands."""
+        if hands is None:
+            self.deck.reset()
+            self.deck.shuffle()
+            hands = self.deck.deal()
         
         for i, player in enumerate(self.players):
             player.set_hand(hands[i])
@@ -43,6 +50,12 @@ class TarneebGame:
         self.leading_suit = None
         self.trick_winner = None
         self.trick_starter = self.current_player
+        self.play_history = []  # (player index, card) for every card played this round
+        self.trick_winners = []  # Winning player index of every completed trick
+        # Public knowledge of the hidden hands: cards played and suits shown out of
+        # Hands dealt in mid-round hold only the cards still in play
+        self.knowledge = Knowledge([len(hand) for hand in hands],
+                                   sum(player.mask for player in self.players))
     
     def next_player(self):
         """Move to the next player."""
@@ -79,11 +92,7 @@ class TarneebGame:
                 # No one bid, force dealer to bid 7
                 self.highest_bid = 7
                 self.highest_bidder = self.dealer
-                # Simple AI chooses most common suit as trump
-                suit_counts = {}
-                for card in self.players[self.dealer].hand:
-                    suit_counts[card.suit] = suit_counts.get(card.suit, 0) + 1
-                self.trump_suit = max(suit_counts, key=suit_counts.get)
+                self.trump_suit = self.players[self.dealer].choose_trump(self)
             
             # End bidding phase
             self.bidding_phase = False
@@ -100,8 +109,7 @@ class TarneebGame:
         player = self.players[self.current_player]
         
         # Check if the card is valid to play
-        valid_indices = player.get_valid_cards(self.leading_suit)
-        if card_index not in valid_indices:
+        if not player.is_valid_card(card_index, self.leading_suit):
             return False
         
         # Play the card
@@ -115,6 +123,8 @@ class TarneebGame:
         
         # Add the card to the current trick
         self.current_trick[self.current_player] = card
+        self.play_history.append((self.current_player, card))
+        self.knowledge.play(self.current_player, card.id)
         
         # We'll move to the next player, but we won't complete the trick immediately
         # That will be handled by the GUI after a delay
@@ -129,13 +139,7 @@ class TarneebGame:
     def complete_trick(self):
         """Complete the current trick and determine the winner."""
         # Find the winning card
-        winning_card = None
-        winner = None
-        
-        for i, card in enumerate(self.current_trick):
-            if winning_card is None or card.beats(winning_card, self.leading_suit, self.trump_suit):
-                winning_card = card
-                winner = i
+        winner = tricktable.winning_index(self.current_trick, self.leading_suit, self.trump_suit)
         
         # Update tricks won
         team = self.players[winner].team
@@ -149,6 +153,8 @@ class TarneebGame:
         self.current_trick = [None, None, None, None]
         self.leading_suit = None
         self.trick_winner = winner
+        self.trick_winners.append(winner)
+        self.knowledge.complete_trick()
         
         # Check if round is over
         if all(len(player.hand) == 0 for player in self.players):
@@ -156,6 +162,9 @@ class TarneebGame:
     
     def score_round(self):
         """Score the round."""
+        if self.recorder is not None:
+            self.recorder.record_round(self)
+        
         bidding_team = self.players[self.highest_bidder].team
         bid = self.highest_bid
         
@@ -188,14 +197,10 @@ class TarneebGame:
             return False
         
         if self.bidding_phase:
-            bid, suit = player.ai_bid(self.highest_bid, self.bids)
+            bid, suit = player.choose_bid(self)
             self.place_bid(bid, suit)
         elif self.trick_phase:
-            card_index = player.ai_play(
-                [self.current_trick[i] for i in range(len(self.current_trick)) if i != self.current_player],
-                self.leading_suit,
-                self.trump_suit
-            )
+            card_index = player.choose_card(self)
             return self.play_card(card_index)
         
         return True
@@ -210,4 +215,8 @@ class TarneebGame:
             return 0
         elif self.scores[1] >= self.target_score:
             return 1
-        return None 
\ No newline at end of file
+        return None 
+
+
+# Timed by perf while profiling is enabled
+perf.register(TarneebGame, "ai_turn", "complete_trick", "score_round")
@@ -1,7 +1,12 @@
 import pygame
-import os
 import math
+from collections import OrderedDict
 from card import Card
+import fonts
+import atlas
+import perf
+from animation import Animator, ease_in_out_quad, ease_out_cubic
+from scheduler import Scheduler
 
 # Define colors
 GREEN = (16, 109, 16)
@@ -13,127 +18,168 @@ GOLD = (255, 215, 0)
 RED = (200, 0, 0)
 GRAY = (100, 100, 100)
 LIGHT_GRAY = (200, 200, 200)
+SHAPE_KEY = (255, 0, 255)  # Transparent color of cached shapes, never drawn
+
+# Pacing, in seconds
+AI_DELAY = 1.0          # Pause before an AI player moves
+TRICK_DELAY = 3.0       # How long a finished trick stays on the table
+MESSAGE_DURATION = 18.0 # How long messages are shown by default
+PERF_REFRESH = 0.5      # How often the performance overlay updates
+PLAY_DURATION = 0.3     # Flight of a played card from the hand to the table
+COLLECT_DURATION = 0.4  # Flight of a collected trick to its winner
+
+# Small offset to prevent card overlap in the trick
+TRICK_OFFSETS = [(0, 5), (-5, 0), (0, -5), (5, 0)]  # Bottom, Left, Top, Right
+
+# The layout is designed for this window size and scaled to the actual one
+BASE_SIZE = (800, 600)
+MIN_SCALE = 0.5
+BASE_CARD_SIZE = (80, 116)
+CARD_STEP = 4  # Card widths are multiples of this, so a window drag builds few card sets
+MAX_SHAPES = 256  # Cached rounded rectangles and overlays, over all window sizes
+
+
+def layout_scale(size):
+    """Scale of the layout for a window of ``size`` pixels."""
+    return max(MIN_SCALE, min(size[0] / BASE_SIZE[0], size[1] / BASE_SIZE[1]))
+
+
+def card_size(scale):
+    """Card sprite size at a layout scale, keeping the card's proportions."""
+    width = max(CARD_STEP, round(BASE_CARD_SIZE[0] * scale / CARD_STEP) * CARD_STEP)
+    return width, round(width * BASE_CARD_SIZE[1] / BASE_CARD_SIZE[0])
 
 class GUI:
-    def __init__(self, screen, game):
+    def __init__(self, screen, game, show_perf=False):
         self.screen = screen
         self.game = game
+        self.bid_selected = 0
+        self.trump_selected = None
+        
+        # Rounded rectangles and overlays rendered once per size, see draw_rounded_rect
+        self.shapes = OrderedDict()
+        self.last_states = {}  # Region states at the last draw, empty forces a full redraw
+        
+        self.message = ""
+        self.message_handle = None  # Scheduled removal of the message
+        
+        # Positions, sizes, fonts and card sprites for the window size
         self.width, self.height = screen.get_size()
-        self.font = pygame.font.SysFont('Arial', 32)
-        self.small_font = pygame.font.SysFont('Arial', 24)
-        self.tiny_font = pygame.font.SysFont('Arial', 16)
+        self.layout()
+        
+        # Timed work (AI pacing, trick display, messages) runs on wall-clock deadlines
+        self.scheduler = Scheduler()
+        self.ai_move_pending = False
+        self.trick_pending = False
+        
+        # Cards moving between the hands and the table, driven by the clock
+        self.animator = Animator()
+        
+        # Performance overlay (frame time, AI latency, event queue), toggled with F3 in main
+        self.show_perf = False
+        self.perf_handle = None
+        self.set_perf_overlay(show_perf)
         
-        self.card_images = {}
-        self.card_back = None
+    def layout(self):
+        """Compute everything that depends on the window size."""
+        self.scale = layout_scale((self.width, self.height))
+        self.font = fonts.get_font('Arial', self.px(32))
+        self.small_font = fonts.get_font('Arial', self.px(24))
+        self.tiny_font = fonts.get_font('Arial', self.px(16))
+        
+        self.card_width, self.card_height = card_size(self.scale)
         self.load_card_images()
         
-        self.bid_buttons = []
-        self.trump_buttons = []
-        self.bid_selected = 0
-        self.trump_selected = None
         self.create_bid_buttons()
         self.create_trump_buttons()
-        
         self.player_areas = self.create_player_areas()
-        self.card_width = 80
-        self.card_height = 116
-        
-        self.message = ""
-        self.message_timer = 0
+        self.regions = self.create_regions()
         
         # Areas where cards are played on table
         self.play_areas = [
-            (self.width // 2, self.height // 2 + 80),     # Bottom (human)
-            (self.width // 2 - 100, self.height // 2),    # Left
-            (self.width // 2, self.height // 2 - 80),     # Top
-            (self.width // 2 + 100, self.height // 2),    # Right
+            (self.width // 2, self.height // 2 + self.px(80)),     # Bottom (human)
+            (self.width // 2 - self.px(100), self.height // 2),    # Left
+            (self.width // 2, self.height // 2 - self.px(80)),     # Top
+            (self.width // 2 + self.px(100), self.height // 2),    # Right
         ]
-        
-        # Keep track of animations/state
-        self.waiting_time = 0
-        self.ai_thinking = False
-        self.trick_collection_time = 0
-        self.trick_complete_delay = 0
-        self.trick_winner_idx = None
-        
+    
+    def resize(self, screen):
+        """Lay the table out again for a resized or new display surface."""
+        self.screen = screen
+        if screen.get_size() == (self.width, self.height):
+            return
+        self.width, self.height = screen.get_size()
+        self.layout()
+        # Cards in flight were headed for the old positions
+        self.animator.clear()
+        self.invalidate()
+    
+    def px(self, n):
+        """A length of the 800x600 design in pixels of this window."""
+        return round(n * self.scale)
+    
+    def line(self, n):
+        """A line width of the design in pixels, never thinner than one (0 would fill)."""
+        return max(1, round(n * self.scale))
+    
     def load_card_images(self):
-        """Load card images."""
-        self.card_back = None
-        try:
-            # Try to load from assets folder
-            cards_path = os.path.join("assets", "cards")
-            for suit in Card.SUITS:
-                for rank in Card.RANKS:
-                    img_path = os.path.join(cards_path, f"{rank}_of_{suit}.png")
-                    if os.path.exists(img_path):
-                        img = pygame.image.load(img_path)
-                        img = pygame.transform.scale(img, (80, 116))
-                        self.card_images[(suit, rank)] = img
-            
-            # Load card back
-            card_back_path = os.path.join(cards_path, "card_back.png")
-            if os.path.exists(card_back_path):
-                self.card_back = pygame.image.load(card_back_path)
-                self.card_back = pygame.transform.scale(self.card_back, (80, 116))
-        except:
-            # If loading fails, create placeholder colored rectangles
-            print("Failed to load card images, using placeholder rectangles")
-            colors = {
-                "clubs": (0, 0, 0),       # Black
-                "diamonds": (255, 0, 0),  # Red
-                "hearts": (255, 0, 0),    # Red
-                "spades": (0, 0, 0)       # Black
-            }
-            
-            for suit in Card.SUITS:
-                for rank in Card.RANKS:
-                    # Create a surface for this card
-                    img = pygame.Surface((80, 116))
-                    img.fill(WHITE)  # White background
-                    
-                    # Draw a colored border
-                    pygame.draw.rect(img, colors[suit], pygame.Rect(0, 0, 80, 116), 2)
-                    
-                    # Draw the rank and suit
-                    font = pygame.font.SysFont('Arial', 20)
-                    text_color = colors[suit]
-                    rank_text = font.render(rank, True, text_color)
-                    suit_text = font.render(Card.SUIT_SYMBOLS[suit], True, text_color)
-                    
-                    img.blit(rank_text, (5, 5))
-                    img.blit(suit_text, (5, 30))
-                    img.blit(rank_text, (60, 90))
-                    img.blit(suit_text, (60, 65))
-                    
-                    self.card_images[(suit, rank)] = img
-        
-        # Always create card back if it wasn't loaded from file
-        if self.card_back is None:
-            # Create card back
-            self.card_back = pygame.Surface((80, 116))
-            self.card_back.fill((180, 0, 0))  # Red background
-            pygame.draw.rect(self.card_back, BLACK, pygame.Rect(5, 5, 70, 106), 2)
-            
-            # Create a pattern on the card back
-            for i in range(0, 80, 10):
-                for j in range(0, 116, 10):
-                    if (i + j) % 20 == 0:
-                        pygame.draw.rect(self.card_back, (150, 0, 0), pygame.Rect(i, j, 5, 5))
+        """Load card images (shared sprites from the card atlas, one set per card size)."""
+        self.card_images, self.card_back = atlas.load_cards((self.card_width, self.card_height))
     
     def create_player_areas(self):
         """Define areas where player info and cards are displayed."""
         center_x, center_y = self.width // 2, self.height // 2
+        px = self.px
         return [
-            pygame.Rect(center_x - 200, self.height - 150, 400, 150),  # Bottom (human)
-            pygame.Rect(0, center_y - 100, 150, 200),                  # Left
-            pygame.Rect(center_x - 200, 0, 400, 150),                  # Top
-            pygame.Rect(self.width - 150, center_y - 100, 150, 200),   # Right
+            pygame.Rect(center_x - px(200), self.height - px(150), px(400), px(150)),  # Bottom (human)
+            pygame.Rect(0, center_y - px(100), px(150), px(200)),                      # Left
+            pygame.Rect(center_x - px(200), 0, px(400), px(150)),                      # Top
+            pygame.Rect(self.width - px(150), center_y - px(100), px(150), px(200)),   # Right
         ]
     
+    def draw_rounded_rect(self, color, rect, width, radius):
+        """Draw a rounded rectangle (an outline when ``width`` is set) from a cached surface.
+        
+        pygame rasterizes rounded corners differently when the clip cuts
+        through them, so they are drawn once unclipped and blitted, which is
+        also cheaper than drawing them again every frame.
+        """
+        key = (rect.size, color, width, radius)
+        shape = self.cached_shape(key)
+        if shape is None:
+            # A colorkeyed RLE surface blits much faster than per-pixel alpha
+            shape = pygame.Surface(rect.size)
+            shape.fill(SHAPE_KEY)
+            shape.set_colorkey(SHAPE_KEY, pygame.RLEACCEL)
+            pygame.draw.rect(shape, color, shape.get_rect(), width, border_radius=radius)
+            self.cache_shape(key, shape)
+        self.screen.blit(shape, rect)
+    
+    def draw_overlay(self, color, rect):
+        """Blend a translucent ``color`` (with alpha) over ``rect`` from a cached surface."""
+        key = (rect.size, color)
+        overlay = self.cached_shape(key)
+        if overlay is None:
+            overlay = pygame.Surface(rect.size, pygame.SRCALPHA)
+            overlay.fill(color)
+            self.cache_shape(key, overlay)
+        self.screen.blit(overlay, rect)
+    
+    def cached_shape(self, key):
+        shape = self.shapes.get(key)
+        if shape is not None:
+            self.shapes.move_to_end(key)
+        return shape
+    
+    def cache_shape(self, key, shape):
+        self.shapes[key] = shape
+        if len(self.shapes) > MAX_SHAPES:
+            self.shapes.popitem(last=False)
+    
     def create_bid_buttons(self):
         """Create buttons for bidding."""
-        button_width = 70
-        button_height = 70
+        button_width = self.px(70)
+        button_height = self.px(70)
         start_x = (self.width - button_width * 3) // 2
         start_y = self.height // 2 - button_height * 2
         
@@ -151,10 +197,10 @@ class GUI:
     
     def create_trump_buttons(self):
         """Create buttons for selecting trump suit."""
-        button_width = 70
-        button_height = 70
+        button_width = self.px(70)
+        button_height = self.px(70)
         start_x = (self.width - button_width * 2) // 2
-        start_y = self.height // 2 + 20
+        start_y = self.height // 2 + self.px(20)
         
         suits = ["clubs", "diamonds", "hearts", "spades"]
         self.trump_buttons = []
@@ -165,8 +211,87 @@ class GUI:
             x = start_x + col * button_width
             y = start_y + row * button_height
             self.trump_buttons.append((suit, pygame.Rect(x, y, button_width, button_height)))
+        
+        # Confirms the selected bid and trump
+        self.confirm_rect = pygame.Rect(self.width // 2 - self.px(75), self.height // 2 + self.px(180),
+                                        self.px(150), self.px(40))
+    
+    def create_regions(self):
+        """Define the screen regions that are redrawn independently."""
+        center_x, center_y = self.width // 2, self.height // 2
+        px = self.px
+        regions = {
+            "scores": pygame.Rect(0, 0, self.width, px(160)),  # Scores, bid line and trump badge
+            # Trick cards and the bidding buttons / waiting text
+            "center": pygame.Rect(self.width // 6, center_y - px(190), self.width * 2 // 3, px(420)),
+            "message": pygame.Rect(0, self.height - px(80), self.width, px(60)),
+            "perf": pygame.Rect(self.width - px(195), px(60), px(190), px(70)),  # Performance overlay
+        }
+        for i, area in enumerate(self.player_areas):
+            regions[i] = area
+        return regions
+    
+    def region_states(self):
+        """Everything each region's drawing depends on, keyed like the regions."""
+        game = self.game
+        states = {
+            "scores": (game.scores[0], game.scores[1], game.trick_phase, game.tricks_won[0],
+                       game.tricks_won[1], game.highest_bid, game.highest_bidder, game.trump_suit),
+            "center": (game.trick_phase, game.bidding_phase, game.current_player, game.highest_bid,
+                       game.highest_bidder, self.bid_selected, self.trump_selected,
+                       tuple(card.id if card else None for card in game.current_trick)),
+            "message": self.message,
+            "perf": self.perf_lines() if self.show_perf else None,
+            # The human bidding overlay darkens the whole screen
+            "overlay": game.bidding_phase and game.current_player == 0,
+        }
+        for i, player in enumerate(game.players):
+            is_current = i == game.current_player
+            if i == 0:
+                # The human hand shows faces and highlights the playable cards
+                cards = tuple(card.id for card in player.hand)
+                highlight = game.leading_suit if is_current and game.trick_phase else False
+            else:
+                cards = len(player.hand)
+                highlight = None
+            states[i] = (cards, is_current, highlight, game.bidding_phase and game.bids[i])
+        return states
+    
+    def invalidate(self):
+        """Force the next draw to repaint the whole screen."""
+        self.last_states = {}
     
     def draw(self):
+        """Redraw the regions that changed since the last call.
+        
+        Returns the list of rectangles that were repainted, ready for
+        pygame.display.update(); it is empty when nothing changed.
+        """
+        states = self.region_states()
+        last = self.last_states
+        self.last_states = states
+        if not last or states["overlay"] != last["overlay"]:
+            self.animator.update()
+            dirty = [self.screen.get_rect()]
+        else:
+            dirty = [self.regions[key] for key in self.regions if states[key] != last[key]]
+            
+            # Cards in flight repaint where they were and where they are now,
+            # with room for the glow around cards landing in the trick
+            pad = 2 * self.line(3)
+            dirty += [rect.inflate(pad, pad) for rect in self.animator.update()]
+            if len(dirty) > 3:
+                # One clipped pass over the union is cheaper than many small ones
+                dirty = [dirty[0].unionall(dirty[1:])]
+        
+        # Layers overlap, so every dirty region is repainted bottom to top
+        for rect in dirty:
+            self.screen.set_clip(rect)
+            self.draw_scene()
+        self.screen.set_clip(None)
+        return dirty
+    
+    def draw_scene(self):
         """Draw the game screen."""
         # Draw background
         self.screen.fill(DARK_GREEN)
@@ -174,8 +299,8 @@ class GUI:
         # Draw card table (rounded rectangle)
         table_rect = pygame.Rect(self.width // 6, self.height // 6, 
                                 self.width * 2 // 3, self.height * 2 // 3)
-        pygame.draw.rect(self.screen, GREEN, table_rect, border_radius=50)
-        pygame.draw.rect(self.screen, DARKER_GREEN, table_rect, 5, border_radius=50)
+        self.draw_rounded_rect(GREEN, table_rect, 0, self.px(50))
+        self.draw_rounded_rect(DARKER_GREEN, table_rect, self.line(5), self.px(50))
         
         # Draw scores
         self.draw_scores()
@@ -196,6 +321,13 @@ class GUI:
         # Draw trump indicator if trump has been selected
         if self.game.trump_suit:
             self.draw_trump_indicator()
+        
+        # Draw the cards in flight above the table
+        self.animator.draw(self.screen)
+        
+        # Draw the performance overlay on top of everything
+        if self.show_perf:
+            self.draw_perf_overlay()
     
     def draw_scores(self):
         """Draw the score display."""
@@ -203,22 +335,22 @@ class GUI:
         team1_text = f"Team 1: {self.game.scores[0]}"
         team2_text = f"Team 2: {self.game.scores[1]}"
         
-        team1_surf = self.font.render(team1_text, True, WHITE)
-        team2_surf = self.font.render(team2_text, True, WHITE)
+        team1_surf = fonts.render(self.font, team1_text, WHITE)
+        team2_surf = fonts.render(self.font, team2_text, WHITE)
         
-        self.screen.blit(team1_surf, (20, 20))
-        self.screen.blit(team2_surf, (self.width - 20 - team2_surf.get_width(), 20))
+        self.screen.blit(team1_surf, (self.px(20), self.px(20)))
+        self.screen.blit(team2_surf, (self.width - self.px(20) - team2_surf.get_width(), self.px(20)))
         
         # Draw current trick count if in trick phase
         if self.game.trick_phase:
             tricks_text = f"Tricks - Team 1: {self.game.tricks_won[0]} | Team 2: {self.game.tricks_won[1]}"
-            tricks_surf = self.small_font.render(tricks_text, True, WHITE)
-            self.screen.blit(tricks_surf, (self.width // 2 - tricks_surf.get_width() // 2, 60))
+            tricks_surf = fonts.render(self.small_font, tricks_text, WHITE)
+            self.screen.blit(tricks_surf, (self.width // 2 - tricks_surf.get_width() // 2, self.px(60)))
             
             # Draw the bid information
             bid_text = f"Bid: {self.game.highest_bid} by {self.game.players[self.game.highest_bidder].name}"
-            bid_surf = self.small_font.render(bid_text, True, GOLD)
-            self.screen.blit(bid_surf, (self.width // 2 - bid_surf.get_width() // 2, 30))
+            bid_surf = fonts.render(self.small_font, bid_text, GOLD)
+            self.screen.blit(bid_surf, (self.width // 2 - bid_surf.get_width() // 2, self.px(30)))
     
     def draw_players(self):
         """Draw player areas and hands."""
@@ -227,36 +359,38 @@ class GUI:
             
             # Highlight current player
             if i == self.game.current_player:
-                pygame.draw.rect(self.screen, GOLD, area, 3, border_radius=10)
+                self.draw_rounded_rect(GOLD, area, self.line(3), self.px(10))
             else:
-                pygame.draw.rect(self.screen, WHITE, area, 1, border_radius=10)
+                self.draw_rounded_rect(WHITE, area, self.line(1), self.px(10))
             
             # Draw player name
-            name_surf = self.small_font.render(player.name, True, WHITE)
+            name_surf = fonts.render(self.small_font, player.name, WHITE)
+            margin = self.px(5)
             if i == 0:  # Bottom
-                self.screen.blit(name_surf, (area.centerx - name_surf.get_width() // 2, area.y + 5))
+                self.screen.blit(name_surf, (area.centerx - name_surf.get_width() // 2, area.y + margin))
                 self.draw_player_hand(player, area, True)
             elif i == 1:  # Left
-                self.screen.blit(name_surf, (area.x + 5, area.y + 5))
+                self.screen.blit(name_surf, (area.x + margin, area.y + margin))
                 self.draw_player_hand(player, area, False)
             elif i == 2:  # Top
-                self.screen.blit(name_surf, (area.centerx - name_surf.get_width() // 2, area.y + 5))
+                self.screen.blit(name_surf, (area.centerx - name_surf.get_width() // 2, area.y + margin))
                 self.draw_player_hand(player, area, False)
             elif i == 3:  # Right
-                self.screen.blit(name_surf, (area.x + 5, area.y + 5))
+                self.screen.blit(name_surf, (area.x + margin, area.y + margin))
                 self.draw_player_hand(player, area, False)
             
             # Draw bid if in bidding phase
             if self.game.bidding_phase and self.game.bids[i] > 0:
-                bid_surf = self.font.render(str(self.game.bids[i]), True, GOLD)
+                bid_surf = fonts.render(self.font, str(self.game.bids[i]), GOLD)
+                bid_y = area.y + self.px(35)
                 if i == 0:  # Bottom
-                    self.screen.blit(bid_surf, (area.centerx - bid_surf.get_width() // 2, area.y + 35))
+                    self.screen.blit(bid_surf, (area.centerx - bid_surf.get_width() // 2, bid_y))
                 elif i == 1:  # Left
-                    self.screen.blit(bid_surf, (area.x + 5, area.y + 35))
+                    self.screen.blit(bid_surf, (area.x + margin, bid_y))
                 elif i == 2:  # Top
-                    self.screen.blit(bid_surf, (area.centerx - bid_surf.get_width() // 2, area.y + 35))
+                    self.screen.blit(bid_surf, (area.centerx - bid_surf.get_width() // 2, bid_y))
                 elif i == 3:  # Right
-                    self.screen.blit(bid_surf, (area.x + 5, area.y + 35))
+                    self.screen.blit(bid_surf, (area.x + margin, bid_y))
     
     def draw_player_hand(self, player, area, is_human):
         """Draw a player's hand of cards."""
@@ -271,10 +405,16 @@ class GUI:
             spacing = min(card_width, (area.width - card_width) / max(1, len(hand) - 1))
             start_x = area.centerx - (spacing * (len(hand) - 1) + card_width) // 2
             
+            # Legal cards to highlight on the player's turn in the trick phase
+            if self.game.current_player == 0 and self.game.trick_phase:
+                valid_indices = player.get_valid_cards(self.game.leading_suit)
+            else:
+                valid_indices = ()
+            
             # Draw each card
             for i, card in enumerate(hand):
                 x = start_x + i * spacing
-                y = area.y + 30
+                y = area.y + self.px(30)
                 
                 # Draw card
                 if self.card_images.get((card.suit, card.rank)):
@@ -284,30 +424,28 @@ class GUI:
                     # Fallback if image not found
                     card_rect = pygame.Rect(x, y, card_width, self.card_height)
                     pygame.draw.rect(self.screen, WHITE, card_rect)
-                    pygame.draw.rect(self.screen, BLACK, card_rect, 2)
+                    pygame.draw.rect(self.screen, BLACK, card_rect, self.line(2))
                     
                     # Determine the color based on suit
                     text_color = RED if card.suit in ["hearts", "diamonds"] else BLACK
                     
                     # Render the card text
-                    text = self.small_font.render(str(card), True, text_color)
-                    self.screen.blit(text, (x + 5, y + 5))
+                    text = fonts.render(self.small_font, str(card), text_color)
+                    self.screen.blit(text, (x + self.px(5), y + self.px(5)))
                 
                 # If it's player's turn in trick phase, highlight valid cards
-                if is_human and self.game.current_player == 0 and self.game.trick_phase:
-                    valid_indices = player.get_valid_cards(self.game.leading_suit)
-                    if i in valid_indices:
-                        highlight_rect = pygame.Rect(x, y, card_width, self.card_height)
-                        pygame.draw.rect(self.screen, GOLD, highlight_rect, 3)
+                if i in valid_indices:
+                    highlight_rect = pygame.Rect(x, y, card_width, self.card_height)
+                    pygame.draw.rect(self.screen, GOLD, highlight_rect, self.line(3))
         else:  # AI players
             # Draw card backs
             if player.id == 1:  # Left
                 # Vertical arrangement
-                spacing = min(30, (area.height - self.card_height) / max(1, len(hand) - 1))
+                spacing = min(self.px(30), (area.height - self.card_height) / max(1, len(hand) - 1))
                 start_y = area.centery - (spacing * (len(hand) - 1) + self.card_height) // 2
                 
                 for i in range(len(hand)):
-                    x = area.x + 40
+                    x = area.x + self.px(40)
                     y = start_y + i * spacing
                     self.screen.blit(self.card_back, (x, y))
             
@@ -319,16 +457,16 @@ class GUI:
                 
                 for i in range(len(hand)):
                     x = start_x + i * spacing
-                    y = area.y + 30
+                    y = area.y + self.px(30)
                     self.screen.blit(self.card_back, (x, y))
             
             elif player.id == 3:  # Right
                 # Vertical arrangement
-                spacing = min(30, (area.height - self.card_height) / max(1, len(hand) - 1))
+                spacing = min(self.px(30), (area.height - self.card_height) / max(1, len(hand) - 1))
                 start_y = area.centery - (spacing * (len(hand) - 1) + self.card_height) // 2
                 
                 for i in range(len(hand)):
-                    x = area.right - 40 - self.card_width
+                    x = area.right - self.px(40) - self.card_width
                     y = start_y + i * spacing
                     self.screen.blit(self.card_back, (x, y))
     
@@ -339,26 +477,21 @@ class GUI:
         
         # Draw a hint circle in the center of the table
         center_x, center_y = self.width // 2, self.height // 2
-        pygame.draw.circle(self.screen, DARKER_GREEN, (center_x, center_y), 150, 2)
-        
-        # Small offset to prevent card overlap
-        offsets = [(0, 5), (-5, 0), (0, -5), (5, 0)]  # Bottom, Left, Top, Right
+        pygame.draw.circle(self.screen, DARKER_GREEN, (center_x, center_y), self.px(150), self.line(2))
         
         for i, card in enumerate(self.game.current_trick):
-            if card is None:
+            # Cards still flying in are drawn by the animator
+            if card is None or self.animator.is_moving(card.id):
                 continue
             
-            # Get position for this player's card
-            x, y = self.play_areas[i]
-            
-            # Apply the offset
-            x += offsets[i][0]
-            y += offsets[i][1]
+            # Get position for this player's card, with its offset applied
+            x, y = self.trick_position(i)
             
             # Highlight card with a glow effect
-            highlight_rect = pygame.Rect(x - self.card_width // 2 - 2, y - self.card_height // 2 - 2, 
-                                     self.card_width + 4, self.card_height + 4)
-            pygame.draw.rect(self.screen, GOLD, highlight_rect, border_radius=3)
+            glow = self.line(2)
+            highlight_rect = pygame.Rect(x - self.card_width // 2 - glow, y - self.card_height // 2 - glow, 
+                                     self.card_width + 2 * glow, self.card_height + 2 * glow)
+            self.draw_rounded_rect(GOLD, highlight_rect, 0, self.line(3))
             
             # Draw card
             if self.card_images.get((card.suit, card.rank)):
@@ -370,34 +503,50 @@ class GUI:
                 card_rect = pygame.Rect(x - self.card_width // 2, y - self.card_height // 2, 
                                       self.card_width, self.card_height)
                 pygame.draw.rect(self.screen, WHITE, card_rect)
-                pygame.draw.rect(self.screen, BLACK, card_rect, 2)
+                pygame.draw.rect(self.screen, BLACK, card_rect, self.line(2))
                 
                 # Determine the color based on suit
                 text_color = RED if card.suit in ["hearts", "diamonds"] else BLACK
                 
                 # Render the card text
-                text = self.small_font.render(str(card), True, text_color)
-                self.screen.blit(text, (x - self.card_width // 2 + 5, y - self.card_height // 2 + 5))
+                text = fonts.render(self.small_font, str(card), text_color)
+                self.screen.blit(text, (x - self.card_width // 2 + self.px(5),
+                                        y - self.card_height // 2 + self.px(5)))
+    
+    def trick_position(self, seat):
+        """Center of the card ``seat`` plays into the trick."""
+        x, y = self.play_areas[seat]
+        return x + self.px(TRICK_OFFSETS[seat][0]), y + self.px(TRICK_OFFSETS[seat][1])
+    
+    def animate_play(self, seat, card, start=None):
+        """Fly a card just played by ``seat`` from ``start`` (top-left) to its place in the trick."""
+        img = self.card_images.get((card.suit, card.rank))
+        if img is None:
+            return
+        if start is None:
+            # AI hands are face down, so the card leaves from the middle of the hand
+            area = self.player_areas[seat]
+            start = (area.centerx - self.card_width // 2, area.centery - self.card_height // 2)
+        end = img.get_rect(center=self.trick_position(seat)).topleft
+        self.animator.add(img, start, end, PLAY_DURATION, ease_out_cubic, key=card.id)
     
     def draw_bidding_ui(self):
         """Draw the bidding UI when in bidding phase."""
         # Only show bidding UI if it's the human player's turn
         if self.game.current_player != 0:
             waiting_text = f"Waiting for {self.game.players[self.game.current_player].name} to bid..."
-            waiting_surf = self.font.render(waiting_text, True, WHITE)
+            waiting_surf = fonts.render(self.font, waiting_text, WHITE)
             self.screen.blit(waiting_surf, (self.width // 2 - waiting_surf.get_width() // 2, 
                                          self.height // 2 - waiting_surf.get_height() // 2))
             return
         
         # Draw semi-transparent overlay
-        overlay = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 150))  # Black with 150 alpha (semi-transparent)
-        self.screen.blit(overlay, (0, 0))
+        self.draw_overlay((0, 0, 0, 150), self.screen.get_rect())  # Black with 150 alpha (semi-transparent)
         
         # Draw bid selection UI
-        title_surf = self.font.render("Choose your bid", True, WHITE)
+        title_surf = fonts.render(self.font, "Choose your bid", WHITE)
         self.screen.blit(title_surf, (self.width // 2 - title_surf.get_width() // 2, 
-                                    self.height // 2 - 150))
+                                    self.height // 2 - self.px(150)))
         
         # Draw bid buttons
         for bid, rect in self.bid_buttons:
@@ -411,27 +560,27 @@ class GUI:
             if bid != 0 and bid <= self.game.highest_bid:
                 color = RED
             
-            pygame.draw.rect(self.screen, color, rect, border_radius=10)
-            pygame.draw.rect(self.screen, BLACK, rect, 2, border_radius=10)
+            self.draw_rounded_rect(color, rect, 0, self.px(10))
+            self.draw_rounded_rect(BLACK, rect, self.line(2), self.px(10))
             
             # Draw bid value
             text = str(bid) if bid > 0 else "Pass"
-            text_surf = self.font.render(text, True, BLACK)
+            text_surf = fonts.render(self.font, text, BLACK)
             self.screen.blit(text_surf, (rect.centerx - text_surf.get_width() // 2, 
                                        rect.centery - text_surf.get_height() // 2))
         
         # Draw highest bid
         if self.game.highest_bid > 0:
             highest_text = f"Highest bid: {self.game.highest_bid} by {self.game.players[self.game.highest_bidder].name}"
-            highest_surf = self.small_font.render(highest_text, True, WHITE)
+            highest_surf = fonts.render(self.small_font, highest_text, WHITE)
             self.screen.blit(highest_surf, (self.width // 2 - highest_surf.get_width() // 2, 
-                                         self.height // 2 - 180))
+                                         self.height // 2 - self.px(180)))
         
         # If a bid is selected and it's higher than current highest bid, show trump selection
         if self.bid_selected > 0 and self.bid_selected > self.game.highest_bid:
-            trump_title = self.font.render("Choose Trump Suit", True, WHITE)
+            trump_title = fonts.render(self.font, "Choose Trump Suit", WHITE)
             self.screen.blit(trump_title, (self.width // 2 - trump_title.get_width() // 2, 
-                                        self.height // 2 - 10))
+                                        self.height // 2 - self.px(10)))
             
             # Draw trump buttons
             for suit, rect in self.trump_buttons:
@@ -441,23 +590,23 @@ class GUI:
                 else:
                     color = WHITE
                 
-                pygame.draw.rect(self.screen, color, rect, border_radius=10)
-                pygame.draw.rect(self.screen, BLACK, rect, 2, border_radius=10)
+                self.draw_rounded_rect(color, rect, 0, self.px(10))
+                self.draw_rounded_rect(BLACK, rect, self.line(2), self.px(10))
                 
                 # Draw suit symbol
                 symbol = Card.SUIT_SYMBOLS[suit]
                 symbol_color = RED if suit in ["hearts", "diamonds"] else BLACK
-                symbol_surf = self.font.render(symbol, True, symbol_color)
+                symbol_surf = fonts.render(self.font, symbol, symbol_color)
                 self.screen.blit(symbol_surf, (rect.centerx - symbol_surf.get_width() // 2, 
                                             rect.centery - symbol_surf.get_height() // 2))
             
             # Draw confirm button if both bid and trump are selected
             if self.trump_selected is not None:
-                confirm_rect = pygame.Rect(self.width // 2 - 75, self.height // 2 + 180, 150, 40)
-                pygame.draw.rect(self.screen, GREEN, confirm_rect, border_radius=10)
-                pygame.draw.rect(self.screen, BLACK, confirm_rect, 2, border_radius=10)
+                confirm_rect = self.confirm_rect
+                self.draw_rounded_rect(GREEN, confirm_rect, 0, self.px(10))
+                self.draw_rounded_rect(BLACK, confirm_rect, self.line(2), self.px(10))
                 
-                confirm_text = self.font.render("Confirm", True, WHITE)
+                confirm_text = fonts.render(self.font, "Confirm", WHITE)
                 self.screen.blit(confirm_text, (confirm_rect.centerx - confirm_text.get_width() // 2, 
                                               confirm_rect.centery - confirm_text.get_height() // 2))
     
@@ -467,32 +616,67 @@ class GUI:
             return
         
         # Draw a badge showing the trump suit
-        trump_rect = pygame.Rect(20, 70, 60, 60)
-        pygame.draw.rect(self.screen, WHITE, trump_rect, border_radius=30)
+        trump_rect = pygame.Rect(self.px(20), self.px(70), self.px(60), self.px(60))
+        self.draw_rounded_rect(WHITE, trump_rect, 0, self.px(30))
         
         # Draw the suit symbol
         symbol = Card.SUIT_SYMBOLS[self.game.trump_suit]
         symbol_color = RED if self.game.trump_suit in ["hearts", "diamonds"] else BLACK
-        symbol_surf = self.font.render(symbol, True, symbol_color)
+        symbol_surf = fonts.render(self.font, symbol, symbol_color)
         self.screen.blit(symbol_surf, (trump_rect.centerx - symbol_surf.get_width() // 2, 
                                       trump_rect.centery - symbol_surf.get_height() // 2))
         
         # Draw "Trump" text
-        trump_text = self.tiny_font.render("Trump", True, BLACK)
+        trump_text = fonts.render(self.tiny_font, "Trump", BLACK)
         self.screen.blit(trump_text, (trump_rect.centerx - trump_text.get_width() // 2, 
-                                     trump_rect.bottom + 5))
+                                     trump_rect.bottom + self.px(5)))
     
     def draw_message(self):
         """Draw message to player."""
-        if self.message and self.message_timer > 0:
+        if self.message:
             # Create a semi-transparent background
-            msg_surf = self.font.render(self.message, True, WHITE)
-            bg_rect = msg_surf.get_rect(center=(self.width // 2, self.height - 50))
-            bg_rect.inflate_ip(20, 10)
+            msg_surf = fonts.render(self.font, self.message, WHITE)
+            bg_rect = msg_surf.get_rect(center=(self.width // 2, self.height - self.px(50)))
+            bg_rect.inflate_ip(self.px(20), self.px(10))
             
             # Draw background and text
             pygame.draw.rect(self.screen, (0, 0, 0, 150), bg_rect)
-            self.screen.blit(msg_surf, msg_surf.get_rect(center=(self.width // 2, self.height - 50)))
+            self.screen.blit(msg_surf, msg_surf.get_rect(center=(self.width // 2, self.height - self.px(50))))
+    
+    def perf_lines(self):
+        """Text of the performance overlay."""
+        frame = perf.histograms.get("frame")
+        ai = perf.histograms.get("TarneebGame.ai_turn")
+        events, events_max = perf.gauges.get("event_queue", (0, 0))
+        lines = []
+        for label, histogram in (("Frame", frame), ("AI", ai)):
+            if histogram is None or not histogram.count:
+                lines.append(f"{label}: -")
+            else:
+                lines.append(f"{label}: {histogram.last * 1000:.1f} ms (p95 {histogram.percentile(95) * 1000:.1f})")
+        lines.append(f"Events: {events} (max {events_max})")
+        return tuple(lines)
+    
+    def draw_perf_overlay(self):
+        """Draw the performance overlay."""
+        rect = self.regions["perf"]
+        self.draw_overlay((0, 0, 0, 160), rect)
+        for i, line in enumerate(self.last_states.get("perf") or self.perf_lines()):
+            text = fonts.render(self.tiny_font, line, WHITE)
+            self.screen.blit(text, (rect.x + self.px(8), rect.y + self.px(5 + i * 20)))
+    
+    def set_perf_overlay(self, show):
+        """Show or hide the performance overlay."""
+        self.show_perf = show
+        if show and self.perf_handle is None:
+            self.perf_handle = self.scheduler.call_later(PERF_REFRESH, self.refresh_perf)
+        elif not show:
+            self.scheduler.cancel(self.perf_handle)
+            self.perf_handle = None
+    
+    def refresh_perf(self):
+        """Wake the main loop regularly so the overlay stays live."""
+        self.perf_handle = self.scheduler.call_later(PERF_REFRESH, self.refresh_perf)
     
     def handle_event(self, event):
         """Handle pygame events."""
@@ -500,42 +684,66 @@ class GUI:
             # Handle mouse clicks
             pos = pygame.mouse.get_pos()
             
-            # Human player's turn
-            if self.game.current_player == 0:
+            # Human player's turn, unless a finished trick is still on the table
+            if self.game.current_player == 0 and not self.trick_pending:
                 if self.game.bidding_phase:
                     self.handle_bidding_click(pos)
                 elif self.game.trick_phase:
                     self.handle_card_click(pos)
         
-        # Update timers
-        if event.type == pygame.USEREVENT:
-            if self.message_timer > 0:
-                self.message_timer -= 1
-            
-            # Handle AI turns - but don't run AI if we're in a delay
-            if self.game.current_player != 0 and not self.ai_thinking and self.trick_complete_delay == 0:
-                self.waiting_time += 1
-                if self.waiting_time >= 10:  # Wait a bit before AI makes its move
-                    result = self.game.ai_turn()
-                    self.waiting_time = 0
-                    
-                    # Check if trick is complete after AI plays
-                    if result == "trick_complete":
-                        self.trick_complete_delay = 30  # Wait for about 3 seconds before completing the trick
-            
-            # Handle trick completion delay
-            if self.trick_complete_delay > 0:
-                self.trick_complete_delay -= 1
-                if self.trick_complete_delay == 0:
-                    # Now complete the trick
-                    self.game.complete_trick()
-            
-            # Handle trick collection
-            if self.trick_collection_time > 0:
-                self.trick_collection_time -= 1
-                if self.trick_collection_time == 0 and self.trick_winner_idx is not None:
-                    # Resume game after trick collection animation
-                    self.trick_winner_idx = None
+    
+    def update(self):
+        """Run due timers and schedule the next AI move when one is needed."""
+        self.scheduler.run_due()
+        
+        game = self.game
+        waiting_for_ai = game.current_player != 0 and (game.bidding_phase or game.trick_phase)
+        if waiting_for_ai and not self.ai_move_pending and not self.trick_pending:
+            # Wait a bit before AI makes its move
+            self.ai_move_pending = True
+            self.scheduler.call_later(AI_DELAY, self.ai_move)
+    
+    def ai_move(self):
+        """Let the current AI player act."""
+        self.ai_move_pending = False
+        seat = self.game.current_player
+        played = len(self.game.play_history)
+        result = self.game.ai_turn()
+        if len(self.game.play_history) > played:
+            self.animate_play(seat, self.game.play_history[-1][1])
+        if result == "trick_complete":
+            self.schedule_trick_completion()
+    
+    def schedule_trick_completion(self):
+        """Leave the full trick on the table for a while before collecting it."""
+        self.trick_pending = True
+        self.scheduler.call_later(TRICK_DELAY, self.finish_trick)
+    
+    def finish_trick(self):
+        """Collect the trick once its display delay is over."""
+        self.trick_pending = False
+        trick = [(card, self.trick_position(i)) for i, card in enumerate(self.game.current_trick) if card]
+        # Keep this round's list, the last trick starts a new round that replaces it
+        winners = self.game.trick_winners
+        self.game.complete_trick()
+        
+        # Sweep the cards over to the player who won them
+        if winners:
+            target = self.player_areas[winners[-1]].center
+            for card, position in trick:
+                img = self.card_images.get((card.suit, card.rank))
+                if img is not None:
+                    self.animator.add(img, img.get_rect(center=position).topleft,
+                                      img.get_rect(center=target).topleft,
+                                      COLLECT_DURATION, ease_in_out_quad)
+    
+    def timeout_ms(self):
+        """How long the main loop may wait for input: until the next timer or animation frame."""
+        timeout = self.scheduler.timeout_ms()
+        frame = self.animator.timeout_ms()
+        if frame is not None:
+            timeout = frame if timeout is None else min(timeout, frame)
+        return timeout
     
     def handle_bidding_click(self, pos):
         """Handle clicks during bidding phase."""
@@ -569,8 +777,7 @@ class GUI:
             
             # Check confirm button
             if self.trump_selected is not None:
-                confirm_rect = pygame.Rect(self.width // 2 - 75, self.height // 2 + 180, 150, 40)
-                if confirm_rect.collidepoint(pos):
+                if self.confirm_rect.collidepoint(pos):
                     # Place bid
                     self.game.place_bid(self.bid_selected, self.trump_selected)
                     self.bid_selected = 0
@@ -599,29 +806,42 @@ class GUI:
         # This helps when cards overlap slightly due to tight spacing
         for i in range(len(hand) - 1, -1, -1):
             x = start_x + i * spacing
-            y = area.y + 30
+            y = area.y + self.px(30)
             
             # Define hitbox - slightly narrower on the sides to prevent overlap issues
             # Keep left edge accurate but reduce right edge width for overlapped cards
-            edge_margin = 15 if i < len(hand) - 1 else 0  # Reduce width except for rightmost card
+            edge_margin = self.px(15) if i < len(hand) - 1 else 0  # Reduce width except for rightmost card
             card_rect = pygame.Rect(x, y, card_width - edge_margin, self.card_height)
             
             if card_rect.collidepoint(pos):
                 # Try to play this card
-                valid_indices = player.get_valid_cards(self.game.leading_suit)
-                if i in valid_indices:
+                if player.is_valid_card(i, self.game.leading_suit):
+                    card = hand[i]
                     result = self.game.play_card(i)
+                    self.animate_play(0, card, (x, y))
                     # Check if trick is complete
                     if result == "trick_complete":
-                        self.trick_complete_delay = 30  # About 3 seconds
+                        self.schedule_trick_completion()
                 else:
                     # Card is not valid, show message
                     if self.game.leading_suit:
                         self.show_message(f"You must follow the leading suit ({self.game.leading_suit})")
                 return
     
-    def show_message(self, msg, duration=180):
-        """Display a message to the player."""
+    def show_message(self, msg, duration=MESSAGE_DURATION):
+        """Display a message to the player for ``duration`` seconds."""
         self.message = msg
+        self.scheduler.cancel(self.message_handle)
+        self.message_handle = None
         # If duration is 0, message stays until explicitly cleared
-        self.message_timer = duration if duration > 0 else float('inf') 
\ No newline at end of file
+        if duration > 0:
+            self.message_handle = self.scheduler.call_later(duration, self.clear_message)
+    
+    def clear_message(self):
+        """Remove the current message."""
+        self.message = ""
+        self.message_handle = None
+
+
+# Timed by perf while profiling is enabled
+perf.register(GUI, "draw", "load_card_images", *[name for name in vars(GUI) if name.startswith("draw_")])
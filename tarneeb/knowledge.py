@@ -0,0 +1,202 @@
+"""What the table knows about the hidden hands, and deals consistent with it.
+
+``Knowledge`` follows a round from the public events alone: ``TarneebGame``
+reports every card played and every completed trick. It keeps bitboards of
+
+  * ``unseen``: cards not played yet,
+  * ``cannot[seat]``: cards a seat cannot hold, because it failed to follow
+    a suit that was led,
+  * ``known[seat]``: cards known to be in a seat's hand. Bids in Tarneeb
+    name a number and a trump suit but show no cards, so the game reveals
+    nothing here; ``reveal`` records cards learnt some other way.
+
+Every update is a handful of integer operations.
+
+``sampler(observer, hand)`` fixes the observer's own hand and builds a
+``DealSampler`` for the cards it cannot see. Cards are grouped by the set of
+seats that may hold them, and every way of splitting the groups between the
+seats is counted (multinomials) so a split can be drawn with the right
+probability; the cards of each group are then shuffled into the split. That
+gives every consistent deal the same probability, unlike dealing card by
+card. ``deal`` draws one deal with ``random.Random``, ``deals`` draws a batch
+of bitboards with NumPy, at several hundred thousand deals per second.
+"""
+import math
+import random
+
+import numpy as np
+
+from bitboard import FULL_DECK, SUIT_MASKS, iter_ids, popcount
+from dealer import make_rng
+
+
+class Knowledge:
+    def __init__(self, sizes=(13, 13, 13, 13), unseen=FULL_DECK):
+        self.reset(sizes, unseen)
+
+    def reset(self, sizes=(13, 13, 13, 13), unseen=FULL_DECK):
+        """Start a new round with ``sizes`` cards in every hand and ``unseen`` still in play."""
+        self.unseen = unseen
+        self.cannot = [0, 0, 0, 0]
+        self.known = [0, 0, 0, 0]
+        self.sizes = list(sizes)  # Cards left in every hand
+        self.lead = -1  # Suit index led to the current trick
+
+    def copy(self):
+        knowledge = Knowledge.__new__(Knowledge)
+        knowledge.unseen = self.unseen
+        knowledge.cannot = list(self.cannot)
+        knowledge.known = list(self.known)
+        knowledge.sizes = list(self.sizes)
+        knowledge.lead = self.lead
+        return knowledge
+
+    def play(self, seat, card_id):
+        """``seat`` played ``card_id``."""
+        bit = 1 << card_id
+        self.unseen &= ~bit
+        self.known[seat] &= ~bit
+        self.sizes[seat] -= 1
+        suit = card_id // 13
+        if self.lead < 0:
+            self.lead = suit
+        elif suit != self.lead:
+            # Shown out of the led suit
+            self.cannot[seat] |= SUIT_MASKS[self.lead]
+
+    def complete_trick(self):
+        self.lead = -1
+
+    def reveal(self, seat, mask):
+        """The unseen cards of ``mask`` are known to be in ``seat``'s hand."""
+        mask &= self.unseen
+        self.known[seat] |= mask
+        for other in range(4):
+            if other != seat:
+                self.cannot[other] |= mask
+
+    def voids(self, seat):
+        """Suit indices ``seat`` has shown out of."""
+        return [suit for suit in range(4) if self.cannot[seat] & SUIT_MASKS[suit] == SUIT_MASKS[suit]]
+
+    def sampler(self, observer=None, hand=0):
+        """``DealSampler`` for the cards ``observer`` (holding ``hand``) cannot see.
+
+        With ``observer`` None every unseen card not in ``known`` is dealt.
+        """
+        fixed = list(self.known)
+        room = [size - popcount(known) for size, known in zip(self.sizes, self.known)]
+        hidden = self.unseen
+        for known in self.known:
+            hidden &= ~known
+        if observer is not None:
+            fixed[observer] = hand
+            room[observer] = 0
+            hidden &= ~hand
+
+        groups = {}  # Seats that may hold a card -> cards
+        for card_id in iter_ids(hidden):
+            seats = tuple(seat for seat in range(4) if room[seat] and not self.cannot[seat] >> card_id & 1)
+            groups.setdefault(seats, []).append(card_id)
+        return DealSampler(fixed, groups, room)
+
+
+class DealSampler:
+    """Uniformly random deals of grouped cards into hands with fixed room.
+
+    ``fixed`` are four bitboards every deal starts from, ``groups`` maps a
+    tuple of seats to the card ids only those seats may hold and ``room``
+    is the number of cards still to deal to every seat. ``count`` is the
+    number of consistent deals.
+    """
+
+    def __init__(self, fixed, groups, room):
+        self.fixed = fixed
+        # The last group is the one whose split is left over, so put the freest one there
+        self.groups = sorted(groups.items(), key=lambda item: (len(item[0]), len(item[1])))
+        self.plans = []  # Cards of every group given to each of its seats
+        weights = []
+        self._enumerate(0, list(room), [], 1, weights)
+        if not self.plans:
+            raise ValueError("no deal is consistent with what is known")
+        self.count = sum(weights)
+        self.cum_weights = []
+        total = 0
+        for weight in weights:
+            total += weight
+            self.cum_weights.append(total)
+        self.probabilities = np.array([weight / self.count for weight in weights])
+        self._arrays = None
+
+    def _enumerate(self, index, room, plan, weight, weights):
+        if index == len(self.groups):
+            if not any(room):
+                self.plans.append(tuple(plan))
+                weights.append(weight)
+            return
+        seats, cards = self.groups[index]
+        if index == len(self.groups) - 1:
+            # Whatever room is left must be filled by the last group
+            splits = [tuple(room[seat] for seat in seats)] if sum(room[seat] for seat in seats) == len(cards) else []
+        else:
+            splits = _splits(len(cards), [room[seat] for seat in seats])
+        for split in splits:
+            for seat, count in zip(seats, split):
+                room[seat] -= count
+            ways = math.factorial(len(cards))
+            for count in split:
+                ways //= math.factorial(count)
+            plan.append(split)
+            self._enumerate(index + 1, room, plan, weight * ways, weights)
+            plan.pop()
+            for seat, count in zip(seats, split):
+                room[seat] += count
+
+    def deal(self, rng=random):
+        """One deal as four bitboards, drawn with a ``random.Random``."""
+        plan = self.plans[0] if len(self.plans) == 1 else rng.choices(self.plans, cum_weights=self.cum_weights)[0]
+        hands = list(self.fixed)
+        for (seats, cards), split in zip(self.groups, plan):
+            if len(seats) > 1:
+                cards = rng.sample(cards, len(cards))
+            start = 0
+            for seat, count in zip(seats, split):
+                for card_id in cards[start:start + count]:
+                    hands[seat] |= 1 << card_id
+                start += count
+        return hands
+
+    def deals(self, n, rng=None):
+        """``n`` deals as an ``(n, 4)`` uint64 array of bitboards (see ``dealer``)."""
+        rng = make_rng(rng)
+        if self._arrays is None:
+            self._arrays = [(seats, np.left_shift(np.uint64(1), np.array(cards, dtype=np.uint64)),
+                             # Where each seat's cards end in the shuffled group, by plan
+                             np.cumsum([plan[g] for plan in self.plans], axis=1)[:, :-1])
+                            for g, (seats, cards) in enumerate(self.groups)]
+        hands = np.tile(np.array(self.fixed, dtype=np.uint64), (n, 1))
+        plans = rng.choice(len(self.plans), size=n, p=self.probabilities) if len(self.plans) > 1 else None
+        for seats, bits, ends in self._arrays:
+            if len(seats) == 1:
+                hands[:, seats[0]] |= np.bitwise_or.reduce(bits)
+                continue
+            shuffled = rng.permuted(np.broadcast_to(bits, (n, len(bits))), axis=1)
+            bounds = ends[plans] if plans is not None else np.broadcast_to(ends[0], (n, ends.shape[1]))
+            # Index into ``seats`` of every shuffled position
+            owner = (np.arange(len(bits))[None, :, None] >= bounds[:, None, :]).sum(axis=2)
+            for i, seat in enumerate(seats):
+                hands[:, seat] |= np.where(owner == i, shuffled, np.uint64(0)).sum(axis=1, dtype=np.uint64)
+        return hands
+
+
+def _splits(total, limits):
+    """Every way to split ``total`` cards between seats with room ``limits``."""
+    if not limits:
+        return [()] if total == 0 else []
+    if len(limits) == 1:
+        return [(total,)] if total <= limits[0] else []
+    splits = []
+    for count in range(min(total, limits[0]) + 1):
+        for rest in _splits(total - count, limits[1:]):
+            splits.append((count,) + rest)
+    return splits
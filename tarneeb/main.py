@@ -1,44 +1,56 @@
+import argparse
 import pygame
+import os
 import sys
+import time
 from game import TarneebGame
-from gui import GUI
+from gui import GUI, layout_scale
+import fonts
+import perf
+
+# Set to a file name to profile the whole session and write the timings there on exit
+PROFILE_PATH = os.environ.get("TARNEEB_PROFILE")
 
 def draw_start_screen(screen):
     """Draw the start screen with a start button."""
     width, height = screen.get_size()
+    scale = layout_scale((width, height))
+    
+    def px(n):
+        return round(n * scale)
     
     # Fill background
     screen.fill((0, 77, 0))  # Dark green
     
     # Draw title
-    font_title = pygame.font.SysFont('Arial', 64, bold=True)
-    title_text = font_title.render("TARNEEB", True, (255, 215, 0))  # Gold text
+    font_title = fonts.get_font('Arial', px(64), bold=True)
+    title_text = fonts.render(font_title, "TARNEEB", (255, 215, 0))  # Gold text
     screen.blit(title_text, (width//2 - title_text.get_width()//2, height//4))
     
     # Draw subtitle
-    font_subtitle = pygame.font.SysFont('Arial', 24)
-    subtitle_text = font_subtitle.render("The Classic Middle Eastern Card Game", True, (255, 255, 255))
-    screen.blit(subtitle_text, (width//2 - subtitle_text.get_width()//2, height//4 + 80))
+    font_subtitle = fonts.get_font('Arial', px(24))
+    subtitle_text = fonts.render(font_subtitle, "The Classic Middle Eastern Card Game", (255, 255, 255))
+    screen.blit(subtitle_text, (width//2 - subtitle_text.get_width()//2, height//4 + px(80)))
     
     # Draw start button
-    button_width, button_height = 200, 60
-    button_rect = pygame.Rect(width//2 - button_width//2, height//2 + 50, button_width, button_height)
-    pygame.draw.rect(screen, (16, 109, 16), button_rect, border_radius=15)  # Green button
-    pygame.draw.rect(screen, (255, 215, 0), button_rect, 3, border_radius=15)  # Gold border
+    button_width, button_height = px(200), px(60)
+    button_rect = pygame.Rect(width//2 - button_width//2, height//2 + px(50), button_width, button_height)
+    pygame.draw.rect(screen, (16, 109, 16), button_rect, border_radius=px(15))  # Green button
+    pygame.draw.rect(screen, (255, 215, 0), button_rect, max(1, px(3)), border_radius=px(15))  # Gold border
     
     # Draw button text
-    font_button = pygame.font.SysFont('Arial', 32, bold=True)
-    button_text = font_button.render("START", True, (255, 255, 255))
+    font_button = fonts.get_font('Arial', px(32), bold=True)
+    button_text = fonts.render(font_button, "START", (255, 255, 255))
     screen.blit(button_text, (button_rect.centerx - button_text.get_width()//2, 
                              button_rect.centery - button_text.get_height()//2))
     
     # Draw instruction
-    font_instr = pygame.font.SysFont('Arial', 18)
-    instr_text = font_instr.render("Click START to begin the game", True, (200, 200, 200))
-    screen.blit(instr_text, (width//2 - instr_text.get_width()//2, height//2 + 130))
+    font_instr = fonts.get_font('Arial', px(18))
+    instr_text = fonts.render(font_instr, "Click START to begin the game", (200, 200, 200))
+    screen.blit(instr_text, (width//2 - instr_text.get_width()//2, height//2 + px(130)))
     
     # Draw game info
-    font_info = pygame.font.SysFont('Arial', 16)
+    font_info = fonts.get_font('Arial', px(16))
     info_texts = [
         "• 4 players (2 teams of 2)",
         "• First team to 31 points wins",
@@ -47,22 +59,34 @@ def draw_start_screen(screen):
     ]
     
     for i, text in enumerate(info_texts):
-        info_surf = font_info.render(text, True, (220, 220, 220))
-        screen.blit(info_surf, (width//2 - 100, height//2 + 170 + i*25))
+        info_surf = fonts.render(font_info, text, (220, 220, 220))
+        screen.blit(info_surf, (width//2 - px(100), height//2 + px(170 + i*25)))
     
     return button_rect
 
+def set_display(fullscreen, window_size):
+    """Open the game window, or go fullscreen at the desktop resolution."""
+    if fullscreen:
+        return pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+    return pygame.display.set_mode(window_size, pygame.RESIZABLE)
+
 def main():
+    parser = argparse.ArgumentParser(description="Play Tarneeb.")
+    parser.add_argument("--fullscreen", action="store_true", help="start fullscreen (F11 toggles)")
+    args = parser.parse_args()
+    
     pygame.init()
     pygame.display.set_caption("Tarneeb")
     
-    # Set up screen
+    # Set up screen; the window can be resized and F11 switches to fullscreen
     screen_width = 800
     screen_height = 600
     if pygame.display.get_desktop_sizes()[0][1] >= 800:
         screen_height = 800
     
-    screen = pygame.display.set_mode((screen_width, screen_height))
+    window_size = (screen_width, screen_height)  # Size to return to when leaving fullscreen
+    fullscreen = args.fullscreen
+    screen = set_display(fullscreen, window_size)
     
     # Start screen state
     in_start_screen = True
@@ -73,17 +97,65 @@ def main():
     gui = None
     game_over = False
     
-    # Set up a timer for AI thinking/animations
-    pygame.time.set_timer(pygame.USEREVENT, 100)  # Fire every 100ms
+    # Only changed regions are pushed to the display; this forces a full repaint
+    redraw = True
+    
+    # F3 shows the performance overlay, which turns the timing hooks on
+    show_perf = False
+    if PROFILE_PATH:
+        perf.enable()
     
     # Game loop
-    clock = pygame.time.Clock()
     running = True
     
     while running:
-        for event in pygame.event.get():
+        # Sleep until there is input, the next timer or the next animation frame, unless a repaint is pending
+        timeout = None
+        if redraw:
+            timeout = 0
+        elif gui is not None and not game_over:
+            timeout = gui.timeout_ms()
+        if timeout is None:
+            events = [pygame.event.wait()]
+        elif timeout > 0:
+            events = [pygame.event.wait(timeout)]
+        else:
+            events = []
+        events += pygame.event.get()
+        frame_start = time.perf_counter()
+        if perf.is_enabled():
+            perf.gauge("event_queue", len(events))
+        
+        for event in events:
             if event.type == pygame.QUIT:
                 running = False
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                show_perf = not show_perf
+                if show_perf:
+                    perf.enable()
+                elif not PROFILE_PATH:
+                    perf.disable()
+                if gui is not None:
+                    gui.set_perf_overlay(show_perf)
+                continue
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F11:
+                fullscreen = not fullscreen
+                screen = set_display(fullscreen, window_size)
+                if gui is not None:
+                    gui.resize(screen)
+                redraw = True
+                continue
+            elif event.type == pygame.VIDEORESIZE:
+                # The display surface already has the new size, lay the table out for it
+                if not fullscreen:
+                    window_size = event.size
+                screen = pygame.display.get_surface()
+                if gui is not None:
+                    gui.resize(screen)
+                redraw = True
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                # The window contents were lost, repaint everything
+                redraw = True
             
             # Handle start screen
             if in_start_screen:
@@ -91,7 +163,7 @@ def main():
                     if start_button_rect and start_button_rect.collidepoint(event.pos):
                         # Start the game
                         game = TarneebGame()
-                        gui = GUI(screen, game)
+                        gui = GUI(screen, game, show_perf)
                         in_start_screen = False
             # Handle game or game over state
             elif game is not None:
@@ -101,46 +173,64 @@ def main():
                 elif event.type == pygame.MOUSEBUTTONDOWN or event.type == pygame.KEYDOWN:
                     # Start a new game if game is over and player clicks or presses a key
                     game = TarneebGame()
-                    gui = GUI(screen, game)
+                    gui = GUI(screen, game, show_perf)
                     game_over = False
         
+        # Run timed work (AI moves, trick delays, messages) that is due
+        if gui is not None and not game_over:
+            gui.update()
+        
         # Draw the appropriate screen
         if in_start_screen:
-            start_button_rect = draw_start_screen(screen)
+            if redraw:
+                start_button_rect = draw_start_screen(screen)
+                pygame.display.flip()
+                redraw = False
         else:
             # Check if game is over
             if game.is_over() and not game_over:
                 game_over = True
+                redraw = True
                 winner = game.winner()
                 gui.show_message(f"Game Over! Team {winner+1} wins with {game.scores[winner]} points!", 0)
             
-            gui.draw()
+            if redraw:
+                gui.invalidate()
             
-            # Draw game over screen if needed
-            if game_over:
-                overlay = pygame.Surface((screen_width, screen_height), pygame.SRCALPHA)
-                overlay.fill((0, 0, 0, 150))  # Semi-transparent black overlay
-                screen.blit(overlay, (0, 0))
+            if not game_over:
+                pygame.display.update(gui.draw())
+            elif redraw:
+                # The game over screen doesn't change, so draw it once
+                gui.draw()
+                
+                width, height = screen.get_size()
+                gui.draw_overlay((0, 0, 0, 150), screen.get_rect())  # Semi-transparent black overlay
                 
                 # Draw game over message
-                font = pygame.font.SysFont('Arial', 48)
+                font = fonts.get_font('Arial', gui.px(48))
                 winner = game.winner()
-                text = font.render(f"Game Over! Team {winner+1} wins!", True, (255, 215, 0))
-                screen.blit(text, (screen_width//2 - text.get_width()//2, screen_height//2 - 50))
+                text = fonts.render(font, f"Game Over! Team {winner+1} wins!", (255, 215, 0))
+                screen.blit(text, (width//2 - text.get_width()//2, height//2 - gui.px(50)))
                 
                 # Draw scores
-                score_font = pygame.font.SysFont('Arial', 32)
-                score_text = score_font.render(f"Team 1: {game.scores[0]} | Team 2: {game.scores[1]}", True, (255, 255, 255))
-                screen.blit(score_text, (screen_width//2 - score_text.get_width()//2, screen_height//2 + 20))
+                score_font = fonts.get_font('Arial', gui.px(32))
+                score_text = fonts.render(score_font, f"Team 1: {game.scores[0]} | Team 2: {game.scores[1]}", (255, 255, 255))
+                screen.blit(score_text, (width//2 - score_text.get_width()//2, height//2 + gui.px(20)))
                 
                 # Draw restart instructions
-                restart_font = pygame.font.SysFont('Arial', 24)
-                restart_text = restart_font.render("Click or press any key to play again", True, (200, 200, 200))
-                screen.blit(restart_text, (screen_width//2 - restart_text.get_width()//2, screen_height//2 + 80))
+                restart_font = fonts.get_font('Arial', gui.px(24))
+                restart_text = fonts.render(restart_font, "Click or press any key to play again", (200, 200, 200))
+                screen.blit(restart_text, (width//2 - restart_text.get_width()//2, height//2 + gui.px(80)))
+                
+                pygame.display.flip()
+            redraw = False
         
-        pygame.display.flip()
-        clock.tick(60)
+        if perf.is_enabled():
+            perf.record("frame", time.perf_counter() - frame_start)
+
     
+    if PROFILE_PATH:
+        perf.dump(PROFILE_PATH)
     pygame.quit()
     sys.exit()
 
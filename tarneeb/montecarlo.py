@@ -0,0 +1,210 @@
+"""Monte Carlo sampling AI.
+
+For every decision the player deals the cards it cannot see to the other
+three seats, uniformly among the deals consistent with what has been
+observed (hand sizes, played cards and suits a seat has shown out of, as
+tracked by ``knowledge``), scores every legal card on each sampled deal and
+plays the card with the best average. Late in a round the samples are
+scored exactly with the double-dummy solver, earlier with fast heuristic
+playouts on bitboards. Sampling runs in worker processes for a fixed time
+budget per move.
+"""
+import os
+import random
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import bitboard
+from bitboard import SUIT_MASK
+from card import Card
+from player import Player
+from solver import DoubleDummySolver
+from strategy import HeuristicStrategy
+
+
+def observe(game, seat):
+    """Collect everything ``seat`` knows about the round as plain data."""
+    trick = []
+    for i in range(4):
+        card = game.current_trick[(game.trick_starter + i) % 4]
+        if card is None:
+            break
+        trick.append(card.id)
+
+    return {
+        "seat": seat,
+        "hand": game.players[seat].mask,
+        # Cards played, suits shown out of and hand sizes (see knowledge)
+        "knowledge": game.knowledge.copy(),
+        "sizes": [len(player.hand) for player in game.players],
+        "trick": tuple(trick),
+        "leader": game.trick_starter,
+        "trump": game.trump_suit,
+    }
+
+
+def _winner(trick, leader, lead, trump):
+    """Seat and card id currently winning a trick of card ids."""
+    win_id, win_seat = trick[0], leader
+    for i, card_id in enumerate(trick[1:], 1):
+        if bitboard.beating_mask(1 << card_id, win_id, lead, trump):
+            win_id, win_seat = card_id, (leader + i) % 4
+    return win_id, win_seat
+
+
+def _heuristic_card(hand, trick, leader, lead, trump):
+    """Card id chosen by the fast playout policy."""
+    if not trick:
+        trump_mask = SUIT_MASK[trump] if trump is not None else 0
+        side = hand & ~trump_mask
+        if side:
+            return bitboard.highest(bitboard.highest_rank_cards(side))
+        return bitboard.lowest(hand)
+
+    legal = bitboard.legal_mask(hand, lead)
+    seat = (leader + len(trick)) % 4
+    win_id, win_seat = _winner(trick, leader, lead, trump)
+    if win_seat % 2 != seat % 2:
+        winners = bitboard.beating_mask(legal, win_id, lead, trump)
+        if winners:
+            return bitboard.lowest(bitboard.lowest_rank_cards(winners))
+    return bitboard.lowest(bitboard.lowest_rank_cards(legal))
+
+
+def playout(hands, leader, trick, trump):
+    """Play the round out with the playout policy; returns tricks per team."""
+    hands = list(hands)
+    trick = list(trick)
+    tricks = [0, 0]
+    while True:
+        lead = Card.SUITS[trick[0] // 13] if trick else None
+        while len(trick) < 4:
+            seat = (leader + len(trick)) % 4
+            card_id = _heuristic_card(hands[seat], trick, leader, lead, trump)
+            hands[seat] &= ~(1 << card_id)
+            trick.append(card_id)
+            if lead is None:
+                lead = Card.SUITS[card_id // 13]
+        _, winner = _winner(trick, leader, lead, trump)
+        tricks[winner % 2] += 1
+        if not hands[0]:
+            return tricks
+        leader = winner
+        trick = []
+
+
+def evaluate(state, budget, seed, max_samples=None, exact_cards=5):
+    """Score every legal card over sampled deals for ``budget`` seconds.
+
+    Returns ``({card_id: total tricks for the mover's team}, samples)``.
+    """
+    deadline = time.monotonic() + budget
+    rng = random.Random(seed)
+    seat = state["seat"]
+    trick = state["trick"]
+    leader = state["leader"]
+    trump = state["trump"]
+    lead = Card.SUITS[trick[0] // 13] if trick else None
+    legal = bitboard.legal_mask(state["hand"], lead)
+    candidates = list(bitboard.iter_ids(legal))
+    totals = dict.fromkeys(candidates, 0)
+    exact = state["sizes"][seat] <= exact_cards
+    solver = DoubleDummySolver(trump) if exact else None
+    try:
+        sampler = state["knowledge"].sampler(seat, state["hand"])
+    except ValueError:
+        return totals, 0
+
+    samples = 0
+    while samples == 0 or time.monotonic() < deadline:
+        if max_samples is not None and samples >= max_samples:
+            break
+        hands = sampler.deal(rng)
+        if exact:
+            values = solver.solve_moves(hands, leader, trick)
+            for card_id in candidates:
+                totals[card_id] += values[card_id]
+        else:
+            for card_id in candidates:
+                after = list(hands)
+                after[seat] &= ~(1 << card_id)
+                tricks = playout(after, leader, trick + (card_id,), trump)
+                totals[card_id] += tricks[seat % 2]
+        samples += 1
+    return totals, samples
+
+
+class MonteCarloStrategy(HeuristicStrategy):
+    """Picks cards by sampling the hidden hands; bids like the heuristic AI.
+
+    ``time_budget`` is the wall-clock seconds spent per card and ``workers``
+    the number of sampling processes (1 samples in this process).
+    """
+
+    name = "montecarlo"
+    blocking = True
+
+    def __init__(self, time_budget=0.5, workers=None, exact_cards=5, max_samples=None, seed=None):
+        self.time_budget = time_budget
+        self.workers = workers or os.cpu_count() or 1
+        self.exact_cards = exact_cards
+        self.max_samples = max_samples
+        self._pool = None
+        self._pool_lock = threading.Lock()  # The server calls play from several threads
+        self._rng = random.Random(seed)
+
+    def play(self, player, game):
+        """Choose the card with the best average result over sampled deals."""
+        valid = player.valid_mask(game.leading_suit)
+        if not valid & (valid - 1):
+            # Only one legal card, nothing to think about
+            return player.index_of(valid)
+
+        state = observe(game, player.id)
+        # Leave a little of the budget for collecting the results
+        budget = max(self.time_budget * 0.9, 0.001)
+        per_worker = None
+        if self.max_samples is not None:
+            per_worker = max(1, self.max_samples // self.workers)
+
+        if self.workers == 1:
+            results = [evaluate(state, budget, self._rng.getrandbits(64), per_worker,
+                                self.exact_cards)]
+        else:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            futures = [self._pool.submit(evaluate, state, budget, self._rng.getrandbits(64),
+                                         per_worker, self.exact_cards)
+                       for _ in range(self.workers)]
+            results = [future.result() for future in futures]
+
+        totals = {}
+        samples = 0
+        for worker_totals, worker_samples in results:
+            samples += worker_samples
+            for card_id, value in worker_totals.items():
+                totals[card_id] = totals.get(card_id, 0) + value
+
+        if samples == 0:
+            return super().play(player, game)
+        best = max(totals, key=totals.get)
+        return player.index_of(1 << best)
+
+    def close(self):
+        """Shut down the sampling processes."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+class MonteCarloPlayer(Player):
+    """AI seat using ``MonteCarloStrategy``; keyword arguments configure the strategy."""
+
+    def __init__(self, name, player_id, **options):
+        super().__init__(name, player_id, MonteCarloStrategy(**options))
+
+    def close(self):
+        """Shut down the sampling processes."""
+        self.strategy.close()
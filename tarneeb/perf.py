@@ -0,0 +1,148 @@
+"""Opt-in timing of the engine and renderer hot paths.
+
+Modules list the functions worth timing with ``register(owner, *names)``;
+nothing is wrapped until ``enable()`` swaps in timing wrappers, and
+``disable()`` puts the original functions back, so the hooks cost nothing
+while they are off. Durations go into log-scale histograms keyed
+``"Owner.name"``; ``record`` adds other durations (such as whole frames) and
+``gauge`` tracks plain values (such as the event-queue depth).
+``summary()`` gives counts and percentiles and ``dump(path)`` writes them as
+JSON.
+"""
+import functools
+import json
+import math
+import time
+
+# Histogram resolution: buckets per doubling of the duration (about 19% wide)
+BUCKETS_PER_OCTAVE = 4
+# Bucket 0 holds everything up to 1 microsecond, the last one 2^30 us (18 minutes) and up
+NUM_BUCKETS = 30 * BUCKETS_PER_OCTAVE + 1
+
+_registered = []  # (owner, attribute name)
+_originals = {}  # (owner, attribute name) -> unwrapped function while enabled
+histograms = {}
+gauges = {}
+
+
+class Histogram:
+    """Log-bucketed distribution of durations in seconds."""
+
+    def __init__(self):
+        self.buckets = [0] * NUM_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def add(self, seconds):
+        micros = seconds * 1e6
+        index = int(math.log2(micros) * BUCKETS_PER_OCTAVE) + 1 if micros > 1 else 0
+        self.buckets[min(index, NUM_BUCKETS - 1)] += 1
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, p):
+        """Upper bound in seconds of the bucket holding the ``p``-th percentile."""
+        if not self.count:
+            return 0.0
+        rank = p / 100 * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank and count:
+                bound = 2 ** (index / BUCKETS_PER_OCTAVE) / 1e6
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self):
+        ms = 1000
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * ms, 4) if self.count else 0.0,
+            "p50_ms": round(self.percentile(50) * ms, 4),
+            "p90_ms": round(self.percentile(90) * ms, 4),
+            "p99_ms": round(self.percentile(99) * ms, 4),
+            "max_ms": round(self.max * ms, 4),
+            "total_ms": round(self.total * ms, 3),
+        }
+
+
+def register(owner, *names):
+    """Mark functions of a class or module to be timed while profiling is enabled."""
+    for name in names:
+        if (owner, name) not in _registered:
+            _registered.append((owner, name))
+            if _originals:
+                _wrap(owner, name)
+
+
+def _wrap(owner, name):
+    func = getattr(owner, name)
+    key = f"{owner.__name__}.{name}"
+
+    @functools.wraps(func)
+    def timed(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            record(key, time.perf_counter() - start)
+
+    _originals[(owner, name)] = func
+    setattr(owner, name, timed)
+
+
+def enable():
+    """Start timing every registered function."""
+    if _originals:
+        return
+    for owner, name in _registered:
+        _wrap(owner, name)
+
+
+def disable():
+    """Stop timing; the original functions are restored and the data is kept."""
+    for (owner, name), func in _originals.items():
+        setattr(owner, name, func)
+    _originals.clear()
+
+
+def is_enabled():
+    return bool(_originals)
+
+
+def record(name, seconds):
+    """Add a duration to the histogram ``name``."""
+    histogram = histograms.get(name)
+    if histogram is None:
+        histogram = histograms[name] = Histogram()
+    histogram.add(seconds)
+
+
+def gauge(name, value):
+    """Track the latest and largest value of ``name``."""
+    last, peak = gauges.get(name, (0, value))
+    gauges[name] = (value, max(peak, value))
+
+
+def reset():
+    histograms.clear()
+    gauges.clear()
+
+
+def summary():
+    """Percentiles of every histogram and the gauges, as plain data."""
+    return {
+        "timings": {name: histograms[name].summary() for name in sorted(histograms)},
+        "gauges": {name: {"last": last, "max": peak} for name, (last, peak) in sorted(gauges.items())},
+    }
+
+
+def dump(path):
+    """Write ``summary()`` to ``path`` as JSON."""
+    with open(path, "w") as f:
+        json.dump(summary(), f, indent=2)
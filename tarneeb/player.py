@@ -1,42 +1,121 @@
 import random
+import bidtable
+import bitboard
+import tricktable
+from bitboard import SUIT_MASK
+from card import Card
+from strategy import HeuristicStrategy
+
+# Minimum simulated success rate for bidding from the bid-equity table
+BID_CONFIDENCE = 0.6
+
+# Shared by every player without a strategy of its own; it keeps no state
+DEFAULT_STRATEGY = HeuristicStrategy()
 
 class Player:
-    def __init__(self, name, player_id):
+    def __init__(self, name, player_id, strategy=None):
         self.name = name
         self.id = player_id
-        self.hand = []
+        # Decision making for AI turns (see strategy.py), the built-in heuristics by default
+        self.strategy = strategy if strategy is not None else DEFAULT_STRATEGY
+        self.set_hand([])
         self.team = player_id % 2  # Players 0,2 are team 0, Players 1,3 are team 1
         self.ai = True  # By default, all players are AI
     
     def set_hand(self, cards):
         self.hand = cards
+        self.mask = bitboard.hand_mask(cards)  # Bitboard of the hand, kept in sync with self.hand
+        # Number of cards and hand indices of each suit, updated as cards are played
+        self.suit_counts = dict.fromkeys(Card.SUITS, 0)
+        self.suit_positions = {suit: [] for suit in Card.SUITS}
+        for i, card in enumerate(cards):
+            self.suit_counts[card.suit] += 1
+            self.suit_positions[card.suit].append(i)
+        # Valid card indices by leading suit, cleared whenever the hand changes
+        self._valid_cache = {}
         
     def has_suit(self, suit):
         """Check if player has any cards of the given suit."""
-        return any(card.suit == suit for card in self.hand)
+        return self.suit_counts[suit] > 0
     
     def play_card(self, card_index):
         """Play a card from hand by index."""
         if 0 <= card_index < len(self.hand):
-            return self.hand.pop(card_index)
+            card = self.hand.pop(card_index)
+            self.mask &= ~card.bit
+            self.suit_counts[card.suit] -= 1
+            self.suit_positions[card.suit].remove(card_index)
+            # Cards after the played one move down one place
+            for positions in self.suit_positions.values():
+                for j, position in enumerate(positions):
+                    if position > card_index:
+                        positions[j] = position - 1
+            self._valid_cache = {}
+            return card
         return None
     
     def get_valid_cards(self, leading_suit=None):
-        """Get indices of valid cards that can be played."""
-        if leading_suit is None or not self.has_suit(leading_suit):
-            # No leading suit or doesn't have the suit, can play any card
-            return list(range(len(self.hand)))
-        
-        # Must follow suit if possible
-        return [i for i, card in enumerate(self.hand) if card.suit == leading_suit]
+        """Get indices of valid cards that can be played.
+        
+        The result is cached per leading suit until the hand changes, so it is
+        a shared tuple that callers must not modify.
+        """
+        valid = self._valid_cache.get(leading_suit)
+        if valid is None:
+            if leading_suit is None or not self.suit_counts[leading_suit]:
+                # No leading suit or doesn't have the suit, can play any card
+                valid = tuple(range(len(self.hand)))
+            else:
+                # Must follow suit if possible
+                valid = tuple(self.suit_positions[leading_suit])
+            self._valid_cache[leading_suit] = valid
+        return valid
+    
+    def is_valid_card(self, card_index, leading_suit=None):
+        """Check if the card at ``card_index`` may be played to the leading suit."""
+        if not 0 <= card_index < len(self.hand):
+            return False
+        return (leading_suit is None or not self.suit_counts[leading_suit]
+                or self.hand[card_index].suit == leading_suit)
+    
+    def valid_mask(self, leading_suit=None):
+        """Get the bitboard of valid cards that can be played."""
+        return bitboard.legal_mask(self.mask, leading_suit)
+    
+    def index_of(self, mask):
+        """Get the hand index of the first card that is in the given bitboard."""
+        for i, card in enumerate(self.hand):
+            if card.bit & mask:
+                return i
+        return -1
+    
+    def choose_bid(self, game):
+        """Choose a bid and trump suit for the current game state."""
+        return self.strategy.bid(self, game)
+    
+    def choose_trump(self, game):
+        """Choose a trump suit when forced to bid."""
+        return self.strategy.choose_trump(self, game)
+    
+    def choose_card(self, game):
+        """Choose the index of the card to play for the current game state."""
+        return self.strategy.play(self, game)
     
     def ai_bid(self, current_highest_bid, bids):
         """AI bidding strategy."""
+        # Use the simulated success rates when the bid-equity table covers this hand
+        best_suit, row = bidtable.best_trump(self.mask)
+        if row is not None:
+            bid = max(current_highest_bid + 1, 7)
+            if bid <= 13 and bidtable.success_rate(row, bid) >= BID_CONFIDENCE:
+                return bid, best_suit
+            return 0, None
+        
         # Count high cards (A, K, Q) and trump potential
-        high_cards = sum(1 for card in self.hand if card.rank in ["A", "K", "Q"])
+        high_cards = bitboard.popcount(self.mask & bitboard.HONOR_MASK)
         
         # Count cards by suit
-        suit_counts = {suit: sum(1 for card in self.hand if card.suit == suit) 
+        suit_counts = {suit: bitboard.popcount(self.mask & SUIT_MASK[suit]) 
                       for suit in ["clubs", "diamonds", "hearts", "spades"]}
         
         # Find most numerous suit for potential trump
@@ -67,28 +146,41 @@ class Player:
         # Return bid and chosen trump suit
         return bid, best_suit
     
+    def ai_trump(self):
+        """AI trump choice when forced to bid."""
+        best_suit, row = bidtable.best_trump(self.mask)
+        if row is not None:
+            return best_suit
+        
+        # Simple AI chooses most common suit as trump
+        suit_counts = {}
+        for card in self.hand:
+            suit_counts[card.suit] = suit_counts.get(card.suit, 0) + 1
+        return max(suit_counts, key=suit_counts.get)
+    
     def ai_play(self, trick, leading_suit, trump_suit):
         """AI card playing strategy."""
-        valid_indices = self.get_valid_cards(leading_suit)
+        valid = bitboard.legal_mask(self.mask, leading_suit)
         
-        if not valid_indices:
+        if not valid:
             return 0  # Shouldn't happen, but just in case
         
+        # Rank ties between suits go to the card that comes first in the hand,
+        # as with max()/min() over hand indices
+        
         # If we're the first to play in the trick
         if not trick:
             # Play highest non-trump card if possible
-            non_trump_cards = [i for i in valid_indices if self.hand[i].suit != trump_suit]
+            trump_mask = SUIT_MASK[trump_suit] if trump_suit is not None else 0
+            non_trump_cards = valid & ~trump_mask
             if non_trump_cards:
-                return max(non_trump_cards, key=lambda i: self.hand[i].value)
+                return self.index_of(bitboard.highest_rank_cards(non_trump_cards))
             # Otherwise play lowest trump
-            return min(valid_indices, key=lambda i: self.hand[i].value)
+            return self.index_of(bitboard.lowest_rank_cards(valid))
         
         # Get the highest card played so far
-        highest_card = None
-        for card in trick:
-            if card is not None:
-                if highest_card is None or card.beats(highest_card, leading_suit, trump_suit):
-                    highest_card = card
+        winner = tricktable.winning_index(trick, leading_suit, trump_suit)
+        highest_card = trick[winner] if winner >= 0 else None
         
         # Check if partner is winning
         partner_winning = False
@@ -98,20 +190,18 @@ class Player:
         
         if partner_winning:
             # Partner is winning, play the lowest valid card
-            return min(valid_indices, key=lambda i: self.hand[i].value)
+            return self.index_of(bitboard.lowest_rank_cards(valid))
         
         # Try to win the trick
-        winning_cards = []
-        for i in valid_indices:
-            if self.hand[i].beats(highest_card, leading_suit, trump_suit):
-                winning_cards.append(i)
+        highest_id = highest_card.id if highest_card is not None else -1
+        winning_cards = bitboard.beating_mask(valid, highest_id, leading_suit, trump_suit)
         
         if winning_cards:
             # Play the lowest winning card
-            return min(winning_cards, key=lambda i: self.hand[i].value)
+            return self.index_of(bitboard.lowest_rank_cards(winning_cards))
         
         # Can't win, play the lowest card
-        return min(valid_indices, key=lambda i: self.hand[i].value)
+        return self.index_of(bitboard.lowest_rank_cards(valid))
     
     def __str__(self):
         return f"Player {self.id}: {self.name}" 
\ No newline at end of file
@@ -0,0 +1,226 @@
+"""Compact binary game records.
+
+Every finished round is stored as one fixed-width 64-byte record, so a file
+is a 16-byte header followed by an array of records that can be memory-mapped
+and indexed directly. Fields are bit-packed:
+
+    deal     13 bytes  seat holding each card id, 2 bits per card
+    meta      1 byte   dealer (bits 0-1), bidder (2-3), trump suit (4-5),
+                       forced dealer bid (6)
+    bids      2 bytes  bid of each seat in seat order, 4 bits each (0 = pass)
+    plays    39 bytes  the 52 card ids in play order, 6 bits each
+    winners   4 bytes  seat that won each of the 13 tricks, 2 bits each
+    reserved  5 bytes  zero
+
+The first trick is led by the seat after the dealer and each later trick by
+the previous winner, so the seat of every play follows from the record.
+Multi-byte bit fields are little-endian.
+"""
+import os
+
+import numpy as np
+
+from card import Card
+
+MAGIC = b"TARNREC1"
+HEADER_SIZE = 16
+RECORD_DTYPE = np.dtype([
+    ("deal", "u1", 13),
+    ("meta", "u1"),
+    ("bids", "u1", 2),
+    ("plays", "u1", 39),
+    ("winners", "u1", 4),
+    ("reserved", "u1", 5),
+])
+RECORD_SIZE = RECORD_DTYPE.itemsize  # 64
+
+
+def _header():
+    return MAGIC + RECORD_SIZE.to_bytes(4, "little") + bytes(HEADER_SIZE - len(MAGIC) - 4)
+
+
+def _check_header(header, path):
+    if len(header) < HEADER_SIZE or header[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a Tarneeb record file")
+    if int.from_bytes(header[len(MAGIC):len(MAGIC) + 4], "little") != RECORD_SIZE:
+        raise ValueError(f"{path} uses an unsupported record size")
+
+
+def _pack_bits(values, width, size):
+    """Pack small integers ``width`` bits apart into ``size`` little-endian bytes."""
+    packed = 0
+    for i, value in enumerate(values):
+        packed |= value << (width * i)
+    return np.frombuffer(packed.to_bytes(size, "little"), dtype=np.uint8)
+
+
+def _unpack_bits(data, width, count):
+    """Inverse of ``_pack_bits`` for a batch: ``(n, bytes)`` to ``(n, count)``."""
+    bits = np.unpackbits(data, axis=-1, bitorder="little")[..., :width * count]
+    bits = bits.reshape(bits.shape[:-1] + (count, width))
+    return (bits << np.arange(width, dtype=np.uint8)).sum(axis=-1, dtype=np.uint8)
+
+
+def encode_round(game):
+    """Build the record of the round ``game`` just finished playing.
+
+    Must be called before the round is scored, while ``play_history`` and
+    ``trick_winners`` still describe it.
+    """
+    owners = [0] * 52
+    plays = []
+    for seat, card in game.play_history:
+        owners[card.id] = seat
+        plays.append(card.id)
+    forced = game.bids.count(0) == 4
+
+    record = np.zeros((), dtype=RECORD_DTYPE)
+    record["deal"] = _pack_bits(owners, 2, 13)
+    record["meta"] = (game.dealer | game.highest_bidder << 2
+                      | Card.SUIT_INDEX[game.trump_suit] << 4 | forced << 6)
+    record["bids"] = _pack_bits(game.bids, 4, 2)
+    record["plays"] = _pack_bits(plays, 6, 39)
+    record["winners"] = _pack_bits(game.trick_winners, 2, 4)
+    return record
+
+
+def decode_round(record):
+    """Turn one record into a dictionary of plain Python values."""
+    meta = int(record["meta"])
+    dealer = meta & 3
+    bidder = meta >> 2 & 3
+    forced = bool(meta >> 6 & 1)
+    owners = _unpack_bits(record["deal"], 2, 52).tolist()
+    bids = _unpack_bits(record["bids"], 4, 4).tolist()
+    cards = _unpack_bits(record["plays"], 6, 52).tolist()
+    winners = _unpack_bits(record["winners"], 2, 13).tolist()
+
+    plays = []
+    leader = (dealer + 1) % 4
+    for trick in range(13):
+        for i in range(4):
+            plays.append(((leader + i) % 4, cards[trick * 4 + i]))
+        leader = winners[trick]
+
+    return {
+        "dealer": dealer,
+        "bids": bids,
+        "bidder": bidder,
+        "bid": 7 if forced else bids[bidder],
+        "forced": forced,
+        "trump": Card.SUITS[meta >> 4 & 3],
+        "deal": [[card_id for card_id in range(52) if owners[card_id] == seat] for seat in range(4)],
+        "plays": plays,
+        "winners": winners,
+    }
+
+
+class RecordWriter:
+    """Append-only writer that buffers records and writes them in blocks.
+
+    Attach it to a game with ``game.recorder = writer`` and every round is
+    recorded when it is scored. A partial record left at the end of an
+    existing file (e.g. by a crash) is dropped before appending. With
+    ``truncate`` an existing file is replaced instead.
+    """
+
+    def __init__(self, path, buffer_size=4096, truncate=False):
+        self.path = path
+        self._buffer = np.zeros(buffer_size, dtype=RECORD_DTYPE)
+        self._count = 0
+        self.written = 0
+
+        if not truncate and os.path.exists(path) and os.path.getsize(path) > 0:
+            self._file = open(path, "r+b")
+            _check_header(self._file.read(HEADER_SIZE), path)
+            records = (os.path.getsize(path) - HEADER_SIZE) // RECORD_SIZE
+            self._file.truncate(HEADER_SIZE + records * RECORD_SIZE)
+            self._file.seek(0, os.SEEK_END)
+        else:
+            self._file = open(path, "wb")
+            self._file.write(_header())
+
+    def write(self, record):
+        """Append one encoded record."""
+        self._buffer[self._count] = record
+        self._count += 1
+        self.written += 1
+        if self._count == len(self._buffer):
+            self.flush()
+
+    def record_round(self, game):
+        """Engine hook: append the round ``game`` just finished."""
+        self.write(encode_round(game))
+
+    def append_file(self, path):
+        """Append every complete record of another record file without decoding it."""
+        self.flush()
+        with open(path, "rb") as f:
+            _check_header(f.read(HEADER_SIZE), path)
+            records = (os.path.getsize(path) - HEADER_SIZE) // RECORD_SIZE
+            remaining = records * RECORD_SIZE
+            while remaining:
+                block = f.read(min(remaining, 1 << 20))
+                self._file.write(block)
+                remaining -= len(block)
+        self.written += records
+
+    def flush(self):
+        """Write buffered records to the file."""
+        if self._count:
+            self._file.write(self._buffer[:self._count].tobytes())
+            self._count = 0
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class RecordReader:
+    """Memory-mapped view of a record file; nothing is read until it is used.
+
+    ``reader.records`` is the raw structured array. Indexing and iterating
+    decode single rounds, and ``deals``/``plays``/``winners`` decode slices
+    in bulk as NumPy arrays.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            _check_header(f.read(HEADER_SIZE), path)
+        count = (os.path.getsize(path) - HEADER_SIZE) // RECORD_SIZE
+        if count:
+            self.records = np.memmap(path, dtype=RECORD_DTYPE, mode="r",
+                                     offset=HEADER_SIZE, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=RECORD_DTYPE)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, index):
+        return decode_round(self.records[index])
+
+    def __iter__(self):
+        for record in self.records:
+            yield decode_round(record)
+
+    def deals(self, start=0, stop=None):
+        """Seat holding each card id, as an ``(n, 52)`` array."""
+        return _unpack_bits(self.records["deal"][start:stop], 2, 52)
+
+    def plays(self, start=0, stop=None):
+        """Card ids in play order, as an ``(n, 52)`` array."""
+        return _unpack_bits(self.records["plays"][start:stop], 6, 52)
+
+    def winners(self, start=0, stop=None):
+        """Seat that won each trick, as an ``(n, 13)`` array."""
+        return _unpack_bits(self.records["winners"][start:stop], 2, 13)
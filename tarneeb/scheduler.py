@@ -0,0 +1,55 @@
+"""Wall-clock deadline scheduler for the GUI's timed work.
+
+Callbacks are queued with a delay in seconds and run by ``run_due`` once
+their deadline has passed. ``timeout_ms`` tells the main loop how long it
+may block waiting for input before the next callback is due.
+"""
+import heapq
+import itertools
+import math
+import time
+
+
+class Scheduler:
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._queue = []  # (deadline, handle, callback, args) heap
+        self._handles = itertools.count()
+        self._cancelled = set()
+
+    def call_later(self, delay, callback, *args):
+        """Run ``callback(*args)`` after ``delay`` seconds; returns a handle for ``cancel``."""
+        handle = next(self._handles)
+        heapq.heappush(self._queue, (self.clock() + delay, handle, callback, args))
+        return handle
+
+    def cancel(self, handle):
+        """Drop a scheduled callback (ignores None and callbacks that already ran)."""
+        if handle is not None and any(entry[1] == handle for entry in self._queue):
+            self._cancelled.add(handle)
+
+    def run_due(self):
+        """Run every callback whose deadline has passed; returns how many ran."""
+        now = self.clock()
+        ran = 0
+        while self._queue and self._queue[0][0] <= now:
+            _, handle, callback, args = heapq.heappop(self._queue)
+            if handle in self._cancelled:
+                self._cancelled.discard(handle)
+                continue
+            callback(*args)
+            ran += 1
+        return ran
+
+    def timeout_ms(self):
+        """Milliseconds until the next callback is due, or None if nothing is scheduled."""
+        while self._queue and self._queue[0][1] in self._cancelled:
+            self._cancelled.discard(heapq.heappop(self._queue)[1])
+        if not self._queue:
+            return None
+        return max(0, math.ceil((self._queue[0][0] - self.clock()) * 1000))
+
+    def clear(self):
+        """Drop every scheduled callback."""
+        self._queue.clear()
+        self._cancelled.clear()
@@ -0,0 +1,451 @@
+"""Asyncio server that hosts many Tarneeb tables in one process.
+
+Run from the repository root with ``python -m tarneeb.server`` or from the
+``tarneeb`` folder with ``python server.py``. No pygame is needed.
+
+The protocol is one JSON object per line in both directions. Client
+messages (``op``):
+
+    {"op": "join", "name": "Ann"}
+        Sit at a new table. Optional: "humans" (1-4 human seats, filled in
+        the order 0, 2, 1, 3), "strategy" (name of one of the strategies
+        the server was started with, see --strategy, for the AI seats) and
+        "target_score".
+    {"op": "join", "table": 12}
+        Take a free human seat at an existing table.
+    {"op": "bid", "bid": 8, "suit": "hearts"}   bid 0 passes
+    {"op": "play", "card": 37}                  card id (suit * 13 + rank)
+    {"op": "state"}                             resend the table state
+    {"op": "stats"}                             server and per-table latency
+    {"op": "leave"}
+
+Server messages (``type``): "joined" (table and seat), "state" (everything
+the seat may see, plus the legal card ids on its turn), "game_over",
+"stats" and "error".
+
+Tables cost no CPU while they wait for a human: a table only runs a task
+while AI seats have moves to make. Quick strategies decide inline; blocking
+ones (``Strategy.blocking``, e.g. Monte Carlo) run in a thread pool so a slow
+decision never stalls the event loop. Every table keeps latency
+statistics for handling human moves and for AI decisions.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from card import Card
+from game import TarneebGame
+from player import Player
+from strategy import make_strategy, parse_spec
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 7531
+MAX_LINE = 4096  # Longest accepted client message in bytes
+
+# Seats handed to human players, partners first
+HUMAN_SEATS = (0, 2, 1, 3)
+
+
+class LatencyStats:
+    """Count, mean and maximum of a series of durations."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def merge(self, other):
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class Table:
+    """One game and the connections sitting at its human seats."""
+
+    def __init__(self, table_id, strategy, humans=1, target_score=31):
+        self.id = table_id
+        players = [Player(f"AI-{seat}", seat, strategy) for seat in range(4)]
+        self.human_seats = HUMAN_SEATS[:humans]
+        for seat in self.human_seats:
+            players[seat].ai = False
+            players[seat].name = f"Seat {seat}"
+        self.game = TarneebGame(target_score, players)
+        self.clients = [None] * 4  # Connection at each human seat
+        self.runner = None  # Task playing the AI seats, only while they have moves
+        self.response = LatencyStats()  # Human move received -> state sent
+        self.ai = LatencyStats()  # AI decision, including any executor round trip
+        self.created = time.monotonic()
+
+    def free_seat(self):
+        for seat in self.human_seats:
+            if self.clients[seat] is None:
+                return seat
+        return None
+
+    def connected(self):
+        return [conn for conn in self.clients if conn is not None]
+
+    def view(self, seat):
+        """Everything ``seat`` may see, as a protocol message."""
+        game = self.game
+        player = game.players[seat]
+        your_turn = game.current_player == seat and not game.is_over()
+        message = {
+            "type": "state",
+            "table": self.id,
+            "seat": seat,
+            "names": [p.name for p in game.players],
+            "hand": [card.id for card in player.hand],
+            "hand_sizes": [len(p.hand) for p in game.players],
+            "dealer": game.dealer,
+            "phase": "bidding" if game.bidding_phase else "playing" if game.trick_phase else "over",
+            "current_player": game.current_player,
+            "bids": game.bids,
+            "highest_bid": game.highest_bid,
+            "highest_bidder": game.highest_bidder,
+            "trump": game.trump_suit,
+            "trick": [card.id if card is not None else None for card in game.current_trick],
+            "trick_starter": game.trick_starter,
+            "leading_suit": game.leading_suit,
+            "trick_winner": game.trick_winner,
+            "tricks_won": [game.tricks_won[0], game.tricks_won[1]],
+            "scores": [game.scores[0], game.scores[1]],
+            "your_turn": your_turn,
+        }
+        if your_turn and game.trick_phase and None in game.current_trick:
+            message["legal"] = [player.hand[i].id for i in player.get_valid_cards(game.leading_suit)]
+        return message
+
+    def stats(self):
+        return {
+            "table": self.id,
+            "humans": sum(conn is not None for conn in self.clients),
+            "scores": [self.game.scores[0], self.game.scores[1]],
+            "response": self.response.summary(),
+            "ai": self.ai.summary(),
+        }
+
+
+class Connection:
+    """One client socket; messages are written as JSON lines."""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.name = "Player"
+        self.table = None
+        self.seat = None
+
+    def send(self, message):
+        if not self.writer.is_closing():
+            self.writer.write(json.dumps(message, separators=(",", ":")).encode() + b"\n")
+
+
+def decide(player, game):
+    """Ask an AI seat for its move; blocking strategies run it in the executor."""
+    if game.bidding_phase:
+        return "bid", player.choose_bid(game)
+    return "play", player.choose_card(game)
+
+
+class Server:
+    """Tables and connections of one server.
+
+    ``strategies`` are the specs of the AI strategies clients may pick by
+    name, the first being the default. Each is built once here and shared
+    by every table, so clients never choose arguments such as file paths or
+    worker counts.
+    """
+
+    def __init__(self, executor=None, ai_delay=0.0, trick_delay=0.0, strategies=("heuristic",)):
+        self.executor = executor or ThreadPoolExecutor(max_workers=4)
+        self.ai_delay = ai_delay  # Pause before each AI move, for human players
+        self.trick_delay = trick_delay  # Pause showing a full trick before it is collected
+        self.tables = {}
+        self.connections = set()
+        self.strategies = {}  # Strategy name -> the one shared strategy object
+        for spec in strategies:
+            name = parse_spec(spec)[0]
+            if name in self.strategies:
+                raise ValueError(f"strategy {name!r} given twice")
+            self.strategies[name] = make_strategy(spec)
+        self.default_strategy = next(iter(self.strategies))
+        self._table_ids = itertools.count(1)
+
+    def strategy(self, name):
+        strategy = self.strategies.get(name)
+        if strategy is None:
+            raise ValueError(f"unknown strategy {name!r}, expected one of {', '.join(self.strategies)}")
+        return strategy
+
+    def close(self):
+        for strategy in self.strategies.values():
+            strategy.close()
+
+    async def handle_client(self, reader, writer):
+        conn = Connection(writer)
+        self.connections.add(conn)
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):
+                    break  # Line too long or connection reset
+                if not line:
+                    break
+                received = time.perf_counter()
+                try:
+                    message = json.loads(line)
+                    if not isinstance(message, dict):
+                        raise ValueError("expected a JSON object")
+                except ValueError as error:
+                    conn.send({"type": "error", "message": f"bad message: {error}"})
+                    continue
+                self.dispatch(conn, message, received)
+                await writer.drain()
+        finally:
+            self.leave(conn)
+            self.connections.discard(conn)
+            writer.close()
+
+    def dispatch(self, conn, message, received):
+        op = message.get("op")
+        handler = {
+            "join": self.on_join,
+            "bid": self.on_bid,
+            "play": self.on_play,
+            "state": self.on_state,
+            "stats": self.on_stats,
+            "leave": self.on_leave,
+        }.get(op)
+        if handler is None:
+            conn.send({"type": "error", "message": f"unknown op {op!r}"})
+            return
+        try:
+            handler(conn, message, received)
+        except (KeyError, TypeError, ValueError) as error:
+            conn.send({"type": "error", "message": f"bad {op} message: {error}"})
+
+    def on_join(self, conn, message, received):
+        if conn.table is not None:
+            raise ValueError("already seated, leave first")
+        conn.name = str(message.get("name", conn.name))[:32]
+        if "table" in message:
+            table = self.tables.get(message["table"])
+            if table is None:
+                raise ValueError(f"no table {message['table']}")
+        else:
+            humans = int(message.get("humans", 1))
+            if not 1 <= humans <= 4:
+                raise ValueError("humans must be between 1 and 4")
+            strategy = self.strategy(message.get("strategy", self.default_strategy))
+            table = Table(next(self._table_ids), strategy, humans, int(message.get("target_score", 31)))
+            self.tables[table.id] = table
+        seat = table.free_seat()
+        if seat is None:
+            raise ValueError(f"table {table.id} is full")
+
+        table.clients[seat] = conn
+        table.game.players[seat].name = conn.name
+        conn.table, conn.seat = table, seat
+        conn.send({"type": "joined", "table": table.id, "seat": seat})
+        self.broadcast(table)
+        self.advance(table)
+
+    def on_bid(self, conn, message, received):
+        table, game = self.seated_turn(conn)
+        bid = int(message.get("bid", 0))
+        suit = message.get("suit")
+        if bid and suit not in Card.SUITS:
+            raise ValueError("a bid needs a suit")
+        if not game.bidding_phase or not game.place_bid(bid, suit):
+            raise ValueError("illegal bid")
+        self.moved(table, received)
+
+    def on_play(self, conn, message, received):
+        table, game = self.seated_turn(conn)
+        card_id = int(message["card"])
+        hand = game.players[conn.seat].hand
+        index = next((i for i, card in enumerate(hand) if card.id == card_id), -1)
+        if not game.trick_phase or None not in game.current_trick or not game.play_card(index):
+            raise ValueError("illegal card")
+        self.moved(table, received)
+
+    def on_state(self, conn, message, received):
+        if conn.table is None:
+            raise ValueError("not seated")
+        conn.send(conn.table.view(conn.seat))
+
+    def on_stats(self, conn, message, received):
+        conn.send(self.stats(message.get("table")))
+
+    def on_leave(self, conn, message, received):
+        self.leave(conn)
+
+    def seated_turn(self, conn):
+        table = conn.table
+        if table is None:
+            raise ValueError("not seated")
+        if table.game.current_player != conn.seat or table.runner is not None:
+            raise ValueError("not your turn")
+        return table, table.game
+
+    def moved(self, table, received):
+        """A human move was applied: update everyone and let the AI seats continue."""
+        self.broadcast(table)
+        table.response.add(time.perf_counter() - received)
+        self.advance(table)
+
+    def leave(self, conn):
+        table = conn.table
+        if table is None:
+            return
+        table.clients[conn.seat] = None
+        conn.table = conn.seat = None
+        if not table.connected():
+            # Nobody is left to play the human seats
+            if table.runner is not None:
+                table.runner.cancel()
+            self.tables.pop(table.id, None)
+
+    def broadcast(self, table):
+        for seat, conn in enumerate(table.clients):
+            if conn is not None:
+                conn.send(table.view(seat))
+        if table.game.is_over():
+            winner = table.game.winner()
+            for conn in table.connected():
+                conn.send({"type": "game_over", "winner": winner,
+                           "scores": [table.game.scores[0], table.game.scores[1]]})
+
+    def advance(self, table):
+        """Start the table's AI task unless it is already running or has nothing to do."""
+        if table.runner is None and self.needs_runner(table):
+            table.runner = asyncio.get_running_loop().create_task(self.run_table(table))
+
+    @staticmethod
+    def needs_runner(table):
+        game = table.game
+        if game.is_over():
+            return False
+        if game.trick_phase and None not in game.current_trick:
+            return True
+        return game.players[game.current_player].ai
+
+    async def run_table(self, table):
+        """Play AI moves and collect tricks until a human has to move."""
+        loop = asyncio.get_running_loop()
+        game = table.game
+        try:
+            while self.needs_runner(table):
+                if game.trick_phase and None not in game.current_trick:
+                    if self.trick_delay:
+                        await asyncio.sleep(self.trick_delay)
+                    game.complete_trick()
+                else:
+                    if self.ai_delay:
+                        await asyncio.sleep(self.ai_delay)
+                    player = game.players[game.current_player]
+                    start = time.perf_counter()
+                    if player.strategy.blocking:
+                        kind, move = await loop.run_in_executor(self.executor, decide, player, game)
+                    else:
+                        kind, move = decide(player, game)
+                        await asyncio.sleep(0)  # Let other tables and clients run between moves
+                    table.ai.add(time.perf_counter() - start)
+                    if kind == "bid":
+                        game.place_bid(*move)
+                    elif not game.play_card(move):
+                        raise RuntimeError(f"AI seat {player.id} chose an illegal card")
+                self.broadcast(table)
+        except Exception as error:
+            # Nobody awaits this task, so report the failure instead of losing it
+            print(f"Table {table.id} stopped:", file=sys.stderr)
+            traceback.print_exc()
+            for conn in table.connected():
+                conn.send({"type": "error", "message": f"table {table.id} stopped: {error}"})
+        finally:
+            table.runner = None
+
+    def stats(self, table_id=None):
+        """Server totals, or the statistics of one table."""
+        if table_id is not None:
+            table = self.tables.get(table_id)
+            if table is None:
+                return {"type": "error", "message": f"no table {table_id}"}
+            return dict(type="stats", **table.stats())
+        response, ai = LatencyStats(), LatencyStats()
+        for table in self.tables.values():
+            response.merge(table.response)
+            ai.merge(table.ai)
+        return {
+            "type": "stats",
+            "tables": len(self.tables),
+            "active_tables": sum(table.runner is not None for table in self.tables.values()),
+            "connections": len(self.connections),
+            "response": response.summary(),
+            "ai": ai.summary(),
+        }
+
+    async def report(self, interval):
+        """Print the server totals every ``interval`` seconds."""
+        while True:
+            await asyncio.sleep(interval)
+            print(json.dumps(self.stats()), flush=True)
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=4, ai_delay=0.0, trick_delay=0.0,
+                report_interval=0, strategies=("heuristic",)):
+    server = Server(ThreadPoolExecutor(max_workers=workers), ai_delay, trick_delay, strategies)
+    listener = await asyncio.start_server(server.handle_client, host, port, limit=MAX_LINE)
+    print(f"Serving Tarneeb tables on {host}:{port}", flush=True)
+    if report_interval:
+        asyncio.get_running_loop().create_task(server.report(report_interval))
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Host Tarneeb tables over TCP.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="address to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="port to listen on")
+    parser.add_argument("-w", "--workers", type=int, default=4, help="threads for AI decisions")
+    parser.add_argument("--ai-delay", type=float, default=0.0, help="seconds before each AI move")
+    parser.add_argument("--trick-delay", type=float, default=0.0, help="seconds a full trick stays on the table")
+    parser.add_argument("--report", type=float, default=0, help="print latency statistics every N seconds")
+    parser.add_argument("--strategy", action="append", metavar="SPEC",
+                        help="AI strategy clients may pick by name, repeatable; the first is the default "
+                             "(default: heuristic)")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.ai_delay, args.trick_delay, args.report,
+                          args.strategy or ["heuristic"]))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
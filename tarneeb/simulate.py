@@ -0,0 +1,226 @@
+"""Headless all-AI simulation of Tarneeb games.
+
+Run from the repository root with ``python -m tarneeb.simulate`` or from the
+``tarneeb`` folder with ``python simulate.py``. No pygame is needed.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# The game modules use flat imports, so make them importable when this file
+# is run as ``python -m tarneeb.simulate`` from the repository root.
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from game import TarneebGame
+from player import Player
+from records import RecordWriter
+from strategy import make_strategy
+
+# Large odd constant used to spread chunk seeds apart
+SEED_STRIDE = 0x9E3779B1
+
+
+def chunk_seed(seed, chunk_index):
+    """Derive the RNG seed for one chunk of games."""
+    return (seed * SEED_STRIDE + chunk_index) & 0xFFFFFFFFFFFF
+
+
+def new_stats():
+    """Create an empty statistics dictionary."""
+    return {
+        "games": 0,
+        "rounds": 0,
+        "tricks": 0,
+        "team_wins": [0, 0],
+        "contracts_made": 0,
+        "contracts_set": 0,
+        "forced_bids": 0,
+        "bid_total": 0,
+        "score_margin_total": 0,
+        "cache_hits": 0,
+        "cache_lookups": 0,
+    }
+
+
+def merge_stats(total, part):
+    """Add the counters of ``part`` into ``total``."""
+    for key, value in part.items():
+        if isinstance(value, list):
+            total[key] = [a + b for a, b in zip(total[key], value)]
+        else:
+            total[key] += value
+    return total
+
+
+def play_game(game, stats):
+    """Play a complete all-AI game, recording results into ``stats``."""
+    for player in game.players:
+        player.ai = True
+
+    while not game.is_over():
+        if game.bidding_phase:
+            game.ai_turn()
+            if not game.bidding_phase and game.bids.count(0) == 4:
+                stats["forced_bids"] += 1
+            continue
+
+        result = game.ai_turn()
+        if result != "trick_complete":
+            continue
+
+        last_trick = all(len(player.hand) == 0 for player in game.players)
+        if last_trick:
+            # complete_trick scores and resets the round, so capture it first
+            bidding_team = game.players[game.highest_bidder].team
+            bid = game.highest_bid
+            score_before = game.scores[bidding_team]
+
+        game.complete_trick()
+        stats["tricks"] += 1
+
+        if last_trick:
+            stats["rounds"] += 1
+            stats["bid_total"] += bid
+            # A made contract always adds points, a failed one subtracts the bid
+            if game.scores[bidding_team] > score_before:
+                stats["contracts_made"] += 1
+            else:
+                stats["contracts_set"] += 1
+
+    winner = game.winner()
+    stats["games"] += 1
+    stats["team_wins"][winner] += 1
+    stats["score_margin_total"] += game.scores[winner] - game.scores[1 - winner]
+    return winner
+
+
+def run_chunk(seed, chunk_index, num_games, target_score=31, record_path=None, strategy=None):
+    """Play ``num_games`` games with a dedicated RNG stream (worker entry point).
+
+    With ``record_path`` every round is also written to that record file.
+    ``strategy`` is a spec (see ``strategy.py``) played at every seat
+    instead of the built-in AI.
+    """
+    random.seed(chunk_seed(seed, chunk_index))
+    stats = new_stats()
+    # A part file left by an interrupted run must not end up in the merged records
+    writer = RecordWriter(record_path, truncate=True) if record_path else None
+    shared = make_strategy(strategy) if strategy else None
+    try:
+        for _ in range(num_games):
+            players = [Player(f"AI {i}", i, shared) for i in range(4)] if shared else None
+            game = TarneebGame(target_score, players)
+            game.recorder = writer
+            play_game(game, stats)
+    finally:
+        if writer is not None:
+            writer.close()
+        if shared is not None:
+            if hasattr(shared, "stats"):
+                # Decision cache counters, see decisions.py
+                cache = shared.stats()
+                stats["cache_hits"] += cache["hits"] + cache["disk_hits"]
+                stats["cache_lookups"] += cache["lookups"]
+            shared.close()
+    return stats
+
+
+def part_path(record_path, chunk_index):
+    """Record file a chunk writes before it is merged into ``record_path``."""
+    return f"{record_path}.part{chunk_index}"
+
+
+def merge_records(record_path, num_chunks):
+    """Append the chunk record files to ``record_path`` in chunk order and remove them."""
+    with RecordWriter(record_path) as writer:
+        for i in range(num_chunks):
+            path = part_path(record_path, i)
+            writer.append_file(path)
+            os.remove(path)
+
+
+def simulate(num_games, workers=None, seed=0, chunk_size=250, target_score=31, record_path=None,
+             strategy=None):
+    """Simulate ``num_games`` games across a process pool and return the stats.
+
+    With ``record_path`` every round played is appended to that record file
+    (see ``records``), in the same order for any number of workers.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = []
+    remaining = num_games
+    while remaining > 0:
+        size = min(chunk_size, remaining)
+        chunks.append(size)
+        remaining -= size
+
+    stats = new_stats()
+    start = time.perf_counter()
+    parts = [part_path(record_path, i) if record_path else None for i in range(len(chunks))]
+    if workers == 1:
+        for i, size in enumerate(chunks):
+            merge_stats(stats, run_chunk(seed, i, size, target_score, parts[i], strategy))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(run_chunk, seed, i, size, target_score, parts[i], strategy)
+                       for i, size in enumerate(chunks)]
+            for future in futures:
+                merge_stats(stats, future.result())
+    if record_path:
+        merge_records(record_path, len(chunks))
+    stats["elapsed"] = time.perf_counter() - start
+    stats["workers"] = workers
+    return stats
+
+
+def summarize(stats):
+    """Build the human readable summary of a simulation run."""
+    games = max(stats["games"], 1)
+    rounds = max(stats["rounds"], 1)
+    elapsed = max(stats["elapsed"], 1e-9)
+    summary = {
+        "games": stats["games"],
+        "workers": stats["workers"],
+        "elapsed_sec": round(stats["elapsed"], 3),
+        "games_per_sec": round(stats["games"] / elapsed, 1),
+        "rounds_per_game": round(stats["rounds"] / games, 2),
+        "team_win_rate": [round(w / games, 4) for w in stats["team_wins"]],
+        "contract_success_rate": round(stats["contracts_made"] / rounds, 4),
+        "forced_bid_rate": round(stats["forced_bids"] / rounds, 4),
+        "average_bid": round(stats["bid_total"] / rounds, 2),
+        "average_score_margin": round(stats["score_margin_total"] / games, 2),
+    }
+    if stats["cache_lookups"]:
+        summary["decision_cache_hit_rate"] = round(stats["cache_hits"] / stats["cache_lookups"], 4)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate all-AI Tarneeb games without a display.")
+    parser.add_argument("-n", "--games", type=int, default=1000, help="number of games to play")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("-s", "--seed", type=int, default=0, help="base RNG seed")
+    parser.add_argument("--chunk-size", type=int, default=250, help="games per worker task")
+    parser.add_argument("--target-score", type=int, default=31, help="score needed to win a game")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    parser.add_argument("--record", metavar="FILE", help="append every round to this binary record file")
+    parser.add_argument("--strategy", metavar="SPEC",
+                        help='strategy for every seat, e.g. "cached:path=decisions.db" (default: built-in AI)')
+    args = parser.parse_args(argv)
+
+    stats = simulate(args.games, args.workers, args.seed, args.chunk_size, args.target_score, args.record,
+                     args.strategy)
+    summary = summarize(stats)
+    if args.json:
+        print(json.dumps(summary))
+    else:
+        for key, value in summary.items():
+            print(f"{key:>24}: {value}")
+
+
+if __name__ == "__main__":
+    main()
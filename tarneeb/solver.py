@@ -0,0 +1,508 @@
+"""Double-dummy solver: exact trick counts with all four hands visible.
+
+The search works on bitboard hands (see ``bitboard``). It runs null-window
+alpha-beta searches ("can team 0 take at least N tricks?") and stores the
+proven bounds of every trick-boundary position in a transposition table.
+
+Table entries use partition search: alongside the bounds, each entry records
+how many top cards of each suit actually decided the result. Any position
+with the same suit lengths per hand and the same owners of those top cards
+has the same bounds, whatever the order of the smaller cards, so one entry
+answers many positions. The search also tries likely-best cards first, only
+searches one card of every run of equivalent cards (cards of one hand with no
+outstanding card between them) and cuts off with quick tricks the leader can
+cash.
+
+The same search is compiled from ``ddcore.c`` (see ``ddcore``), with a
+sharper move ordering. It solves a full deal in about a quarter of a second
+on average and the hardest in one to two, where the Python search needs
+seconds. Solvers use it whenever it can be built and the Python search
+otherwise, or with ``compiled=False``.
+"""
+import ddcore
+from bitboard import LANE, SUIT_MASK, SUIT_MASKS, popcount
+
+# Number of cards in a 13-bit suit lane
+_LANE_COUNT = [bin(lane).count("1") for lane in range(1 << 13)]
+
+# Owner encoding of a suit, keyed by the four hands' 13-bit lanes
+_suit_codes = {}
+
+
+def _suit_code(lanes):
+    """Encode who holds each outstanding card of a suit, from the top down.
+
+    The code is a leading 1 followed by two bits (the seat) per card, so the
+    owners of the top ``k`` of ``n`` cards are ``code >> 2 * (n - k)``.
+    """
+    code = _suit_codes.get(lanes)
+    if code is None:
+        l0, l1, l2, l3 = lanes
+        code = 1
+        for rank in range(12, -1, -1):
+            bit = 1 << rank
+            if l0 & bit:
+                code = code << 2
+            elif l1 & bit:
+                code = code << 2 | 1
+            elif l2 & bit:
+                code = code << 2 | 2
+            elif l3 & bit:
+                code = code << 2 | 3
+        _suit_codes[lanes] = code
+    return code
+
+
+def _top_of(cards, count):
+    """The ``count`` highest cards of a single-suit mask."""
+    top = 0
+    for _ in range(count):
+        bit = 1 << (cards.bit_length() - 1)
+        top |= bit
+        cards ^= bit
+    return top
+
+
+class DoubleDummySolver:
+    """Solver for one trump suit; its transposition table can be reused across solves."""
+
+    def __init__(self, trump_suit, compiled=True):
+        self.trump_suit = trump_suit
+        self.trump = SUIT_MASK[trump_suit] if trump_suit is not None else 0
+        self.table = {}
+        self.nodes = 0
+        library = ddcore.load() if compiled else None
+        self.core = ddcore.Search(library, self.trump) if library is not None else None
+
+    def clear(self):
+        """Empty the transposition table."""
+        self.table.clear()
+        if self.core is not None:
+            self.core.clear()
+
+    def solve(self, hands, leader, trick=()):
+        """Tricks (team 0, team 1) still to be won from a position.
+
+        ``hands`` are the four bitboards, ``leader`` is the seat that led or
+        will lead the current trick and ``trick`` lists the card ids already
+        played to it, in playing order.
+        """
+        hands = [int(hand) for hand in hands]
+        remaining = (popcount(hands[0] | hands[1] | hands[2] | hands[3]) + len(trick)) // 4
+        if self.core is not None:
+            low = self.core.solve(hands, leader, trick)
+            self.nodes = self.core.nodes
+            return low, remaining - low
+        low, high = 0, remaining
+        # Binary search on the value with null-window searches
+        while low < high:
+            target = (low + high + 1) // 2
+            if self._root(hands, leader, trick, target):
+                low = target
+            else:
+                high = target - 1
+        return low, remaining - low
+
+    def solve_moves(self, hands, leader, trick=()):
+        """Map every legal card of the seat to move to the tricks its team then wins.
+
+        Returns ``{card_id: tricks}`` counting the remaining tricks (current one
+        included) won by the mover's team if that card is played and everyone
+        plays perfectly afterwards.
+        """
+        hands = [int(hand) for hand in hands]
+        seat = (leader + len(trick)) % 4
+        hand = hands[seat]
+        lead = SUIT_MASKS[trick[0] // 13] if trick else 0
+        legal = hand & lead or hand
+        outstanding = hands[0] | hands[1] | hands[2] | hands[3]
+        for card_id in trick:
+            outstanding |= 1 << card_id
+
+        values = {}
+        for card_id in self._representatives(legal, hand, outstanding):
+            hands[seat] = hand & ~(1 << card_id)
+            team0, team1 = self.solve(hands, leader, tuple(trick) + (card_id,))
+            value = team0 if seat % 2 == 0 else team1
+            for equal_id in self._run_of(card_id, legal, hand, outstanding):
+                values[equal_id] = value
+        hands[seat] = hand
+        return values
+
+    # Search ---------------------------------------------------------------
+
+    def _root(self, hands, leader, trick, target):
+        """Null-window search starting inside a (possibly empty) trick."""
+        if not trick:
+            return self._search(tuple(hands), leader, target)[0]
+        lead = SUIT_MASKS[trick[0] // 13]
+        win_id, win_seat, contested = trick[0], leader, False
+        for i, card_id in enumerate(trick[1:], 1):
+            if card_id // 13 == win_id // 13:
+                contested = True
+            if self._beats(card_id, win_id, lead):
+                win_id, win_seat = card_id, (leader + i) % 4
+        if len(trick) == 4:
+            won = 1 if win_seat % 2 == 0 else 0
+            return self._search(tuple(hands), win_seat, target - won)[0]
+        outstanding = hands[0] | hands[1] | hands[2] | hands[3]
+        for card_id in trick:
+            outstanding |= 1 << card_id
+        return self._play(list(hands), leader, len(trick), lead, win_id, win_seat,
+                          contested, outstanding, target)[0]
+
+    def _search(self, hands, leader, target):
+        """Can team 0 win ``target`` of the remaining tricks with ``leader`` on lead?
+
+        Returns the answer and a mask of the cards whose ranks decided it.
+        """
+        if target <= 0:
+            return True, 0
+        h0, h1, h2, h3 = hands
+        outstanding = h0 | h1 | h2 | h3
+        remaining = popcount(outstanding) // 4
+        if target > remaining:
+            return False, 0
+
+        if remaining == 1:
+            team, relevant = self._last_trick(hands, leader)
+            return team == 0, relevant
+
+        # Tricks the leader can cash straight away and top trumps of the side
+        # not on lead bound the result
+        quick, quick_cards = self._quick_tricks(hands, leader)
+        sure, sure_cards = self._sure_trump_tricks(hands, leader + 1)
+        if leader % 2 == 0:
+            if quick >= target:
+                return True, quick_cards
+            if remaining - sure < target:
+                return False, sure_cards
+        else:
+            if remaining - quick < target:
+                return False, quick_cards
+            if sure >= target:
+                return True, sure_cards
+
+        # Positions are grouped by suit lengths, then by how many top cards of
+        # each suit an entry depends on and who holds those cards
+        lengths = leader
+        codes = []
+        counts = []
+        for shift in (0, 13, 26, 39):
+            l0 = h0 >> shift & LANE
+            l1 = h1 >> shift & LANE
+            l2 = h2 >> shift & LANE
+            l3 = h3 >> shift & LANE
+            lengths = (lengths << 16 | _LANE_COUNT[l0] << 12 | _LANE_COUNT[l1] << 8
+                       | _LANE_COUNT[l2] << 4 | _LANE_COUNT[l3])
+            codes.append(_suit_code((l0, l1, l2, l3)))
+            counts.append(_LANE_COUNT[l0 | l1 | l2 | l3])
+
+        entries = self.table.get(lengths)
+        if entries is None:
+            entries = self.table[lengths] = {}
+        else:
+            c0, c1, c2, c3 = codes
+            n0, n1, n2, n3 = counts
+            for tops, by_owners in entries.items():
+                k0, k1, k2, k3 = tops
+                bounds = by_owners.get((c0 >> 2 * (n0 - k0), c1 >> 2 * (n1 - k1),
+                                        c2 >> 2 * (n2 - k2), c3 >> 2 * (n3 - k3)))
+                if bounds is not None:
+                    if bounds[0] >= target:
+                        return True, self._pattern_cards(outstanding, tops)
+                    if bounds[1] < target:
+                        return False, self._pattern_cards(outstanding, tops)
+
+        self.nodes += 1
+        result, relevant = self._play(list(hands), leader, 0, 0, -1, -1, False,
+                                      outstanding, target)
+
+        # Widen the relevant cards to the top cards of each suit down to the
+        # lowest relevant one and store the bound under that pattern
+        tops = []
+        owners = []
+        relevant_top = 0
+        for s in range(4):
+            suit_cards = outstanding & SUIT_MASKS[s]
+            rel = relevant & suit_cards
+            if rel:
+                cards = suit_cards & ~((rel & -rel) - 1)
+                relevant_top |= cards
+                k = popcount(cards)
+            else:
+                k = 0
+            tops.append(k)
+            owners.append(codes[s] >> 2 * (counts[s] - k))
+        by_owners = entries.get(tuple(tops))
+        if by_owners is None:
+            by_owners = entries[tuple(tops)] = {}
+        bounds = by_owners.get(tuple(owners))
+        if bounds is None:
+            bounds = by_owners[tuple(owners)] = [0, remaining]
+        if result:
+            if target > bounds[0]:
+                bounds[0] = target
+        elif target - 1 < bounds[1]:
+            bounds[1] = target - 1
+        return result, relevant_top
+
+    def _play(self, hands, leader, index, lead, win_id, win_seat, contested, outstanding,
+              target):
+        """Try every card for the ``index``-th player of the trick."""
+        seat = (leader + index) % 4
+        hand = hands[seat]
+        legal = (hand & lead or hand) if index else hand
+        maximizing = seat % 2 == 0
+        relevant = 0
+
+        for card_id in self._ordered_moves(legal, hand, hands, seat, index, lead,
+                                           win_id, win_seat, outstanding):
+            if index == 0:
+                card_lead = SUIT_MASKS[card_id // 13]
+                new_win_id, new_win_seat, new_contested = card_id, seat, False
+            else:
+                card_lead = lead
+                new_contested = contested
+                if card_id // 13 == win_id // 13:
+                    # Decided by rank, which makes the winning rank relevant
+                    new_contested = True
+                if self._beats(card_id, win_id, lead):
+                    new_win_id, new_win_seat = card_id, seat
+                    if card_id // 13 != win_id // 13:
+                        new_contested = False
+                else:
+                    new_win_id, new_win_seat = win_id, win_seat
+
+            hands[seat] = hand & ~(1 << card_id)
+            if index == 3:
+                won = 1 if new_win_seat % 2 == 0 else 0
+                result, child_relevant = self._search(tuple(hands), new_win_seat, target - won)
+                if new_contested:
+                    child_relevant |= 1 << new_win_id
+            else:
+                result, child_relevant = self._play(hands, leader, index + 1, card_lead,
+                                                    new_win_id, new_win_seat, new_contested,
+                                                    outstanding, target)
+            hands[seat] = hand
+
+            if result == maximizing:
+                return result, child_relevant
+            relevant |= child_relevant
+        return not maximizing, relevant
+
+    def _last_trick(self, hands, leader):
+        """Team that wins the final trick and the card that won it by rank, if any."""
+        lead_id = hands[leader].bit_length() - 1
+        lead = SUIT_MASKS[lead_id // 13]
+        win_id, win_seat, contested = lead_id, leader, False
+        for i in range(1, 4):
+            seat = (leader + i) % 4
+            card_id = hands[seat].bit_length() - 1
+            same_suit = card_id // 13 == win_id // 13
+            if self._beats(card_id, win_id, lead):
+                win_id, win_seat, contested = card_id, seat, same_suit
+            elif same_suit:
+                contested = True
+        return win_seat % 2, (1 << win_id) if contested else 0
+
+    def _quick_tricks(self, hands, leader):
+        """Lower bound on the tricks the leader wins by cashing top cards.
+
+        Returns the count and the cards it relies on.
+        """
+        hand = hands[leader]
+        lho = hands[(leader + 1) % 4]
+        rho = hands[(leader + 3) % 4]
+        others = lho | rho | hands[(leader + 2) % 4]
+        trump = self.trump
+
+        tricks = 0
+        cards = 0
+        if trump:
+            tops = self._top_cards(hand & trump, others & trump)
+            tricks = popcount(tops)
+            cards = tops
+            # Side-suit winners only stand once the opponents are out of trumps
+            if popcount(lho & trump) > tricks or popcount(rho & trump) > tricks:
+                return tricks, cards
+
+        for suit in SUIT_MASKS:
+            if suit != trump:
+                tops = self._top_cards(hand & suit, others & suit)
+                if tops:
+                    tricks += popcount(tops)
+                    cards |= tops
+        return tricks, cards
+
+    def _sure_trump_tricks(self, hands, seat):
+        """Tricks the side of ``seat`` is sure to win with trumps above all of
+        the opponents' trumps; each one wins the trick it is played to.
+
+        Returns the count and the cards it relies on.
+        """
+        trump = self.trump
+        if not trump:
+            return 0, 0
+        mine = hands[seat % 4] & trump
+        partner = hands[(seat + 2) % 4] & trump
+        tops = self._top_cards(mine | partner,
+                               (hands[(seat + 1) % 4] | hands[(seat + 3) % 4]) & trump)
+        if not tops:
+            return 0, 0
+        # Partners' top trumps may fall on the same trick
+        return max(popcount(tops & mine), popcount(tops & partner)), tops
+
+    @staticmethod
+    def _top_cards(hand, others):
+        """Cards of ``hand`` ranked above every card of ``others`` (same suit)."""
+        if not others:
+            return hand
+        return hand & ~((1 << others.bit_length()) - 1)
+
+    @staticmethod
+    def _pattern_cards(outstanding, tops):
+        """Mask of the top cards of each suit named by a table pattern."""
+        cards = 0
+        for s, count in enumerate(tops):
+            if count:
+                cards |= _top_of(outstanding & SUIT_MASKS[s], count)
+        return cards
+
+    def _beats(self, card_id, win_id, lead):
+        """Does ``card_id`` beat the currently winning card ``win_id``?"""
+        bit = 1 << card_id
+        win_bit = 1 << win_id
+        if bit & self.trump:
+            return not win_bit & self.trump or card_id > win_id
+        if bit & lead:
+            return not win_bit & self.trump and card_id > win_id
+        return False
+
+    # Move generation ------------------------------------------------------
+
+    @staticmethod
+    def _representatives(legal, hand, outstanding):
+        """Lowest card of every run of equivalent legal cards."""
+        others = outstanding & ~hand
+        reps = []
+        cards = legal
+        while cards:
+            low = cards & -cards
+            card_id = low.bit_length() - 1
+            reps.append(card_id)
+            # Skip the rest of the run: all our cards up to the next card held elsewhere
+            suit = SUIT_MASKS[card_id // 13]
+            blockers = others & suit & ~((low << 1) - 1)
+            if blockers:
+                cards &= ~((blockers & -blockers) - 1)
+            else:
+                cards &= ~suit
+        return reps
+
+    @staticmethod
+    def _run_of(card_id, legal, hand, outstanding):
+        """All legal cards equivalent to the representative ``card_id``."""
+        others = outstanding & ~hand
+        suit = SUIT_MASKS[card_id // 13]
+        low = 1 << card_id
+        blockers = others & suit & ~((low << 1) - 1)
+        limit = (blockers & -blockers) - 1 if blockers else suit
+        members = legal & suit & limit & ~(low - 1)
+        return [i for i in range(card_id, card_id // 13 * 13 + 13) if members >> i & 1]
+
+    def _ordered_moves(self, legal, hand, hands, seat, index, lead, win_id, win_seat,
+                       outstanding):
+        """Representative cards, most promising first."""
+        reps = self._representatives(legal, hand, outstanding)
+        if len(reps) == 1:
+            return reps
+        trump = self.trump
+
+        if index == 0:
+            partner = hands[(seat + 2) % 4]
+            lho = hands[(seat + 1) % 4]
+            rho = hands[(seat + 3) % 4]
+            opponents = lho | rho
+
+            def lead_order(card_id):
+                suit = SUIT_MASKS[card_id // 13]
+                theirs = opponents & suit
+                if not theirs or theirs.bit_length() < (hand & suit).bit_length() and \
+                        not (theirs >> card_id):
+                    # Cashing a winner
+                    score = 4
+                elif (partner & suit).bit_length() > theirs.bit_length():
+                    # Leading towards partner's winner
+                    score = 3
+                else:
+                    score = 1
+                if suit != trump and trump:
+                    if (not lho & suit and lho & trump) or (not rho & suit and rho & trump):
+                        score -= 3  # An opponent can ruff
+                    elif not partner & suit and partner & trump:
+                        score += 1  # Partner can ruff
+                return (-score, -popcount(hand & suit), card_id % 13)
+            reps.sort(key=lead_order)
+            return reps
+
+        if win_seat % 2 == seat % 2:
+            # Partner is winning: the lowest cards first and never waste trumps
+            reps.sort(key=lambda c: ((1 << c) & trump != 0, c % 13))
+            return reps
+
+        winners = []
+        losers = []
+        for c in reps:
+            if self._beats(c, win_id, lead):
+                winners.append(c)
+            else:
+                losers.append(c)
+        # Cheapest winning card first, then the lowest losing cards
+        winners.sort(key=lambda c: ((1 << c) & trump != 0, c % 13))
+        losers.sort(key=lambda c: ((1 << c) & trump != 0, c % 13))
+        return winners + losers
+
+
+def current_trick_ids(game):
+    """Card ids of the current trick in playing order, starting with the leader."""
+    trick = []
+    for i in range(4):
+        card = game.current_trick[(game.trick_starter + i) % 4]
+        if card is None:
+            break
+        trick.append(card.id)
+    return tuple(trick)
+
+
+def solve_game(game, trump_suit=None, leader=None, solver=None):
+    """Tricks each team ends the round with if everyone plays double-dummy.
+
+    Starts from the current ``TarneebGame`` trick-phase state: the hands,
+    ``current_trick``, ``trick_starter`` and ``tricks_won``. ``trump_suit``
+    defaults to ``game.trump_suit``; ``leader`` may only be overridden on a
+    trick boundary. Returns ``{team: tricks}`` including tricks already won.
+    """
+    if trump_suit is None:
+        trump_suit = game.trump_suit
+    trick = current_trick_ids(game)
+    if leader is None:
+        leader = game.trick_starter
+    elif trick:
+        raise ValueError("The leader can only be chosen between tricks")
+    if solver is None or solver.trump_suit != trump_suit:
+        solver = DoubleDummySolver(trump_suit)
+    team0, team1 = solver.solve([player.mask for player in game.players], leader, trick)
+    return {0: game.tricks_won[0] + team0, 1: game.tricks_won[1] + team1}
+
+
+def trick_table(hands):
+    """Tricks won by team 0 for every trump suit and opening leader.
+
+    Returns ``{trump_suit: [tricks with seat 0 leading, ..., seat 3 leading]}``.
+    """
+    table = {}
+    for suit in SUIT_MASK:
+        solver = DoubleDummySolver(suit)
+        table[suit] = [solver.solve(hands, leader)[0] for leader in range(4)]
+    return table
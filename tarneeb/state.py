@@ -0,0 +1,298 @@
+"""Compact, undoable round state for search and analysis.
+
+``GameState`` holds one round as a handful of integers: a bitboard per hand
+(see ``bitboard``), the bids, the current trick as card ids, and a stack of
+the moves played so far. ``apply(move)`` makes a move and ``undo()`` takes
+back the last one without copying anything, so a search can walk a whole
+tree on a single object. ``copy()`` is a few short list copies, ``key()`` and
+``hash()`` identify the position for transposition tables, and
+``from_game``/``to_game`` convert to and from a ``TarneebGame`` without
+losing anything but the order of cards within a hand.
+
+Moves are small integers:
+
+    0-51      play the card with that id
+    COMPLETE  collect the full trick (the engine's ``complete_trick``)
+    bid_move(bid, suit)
+              a bid of 7-13, or 0 to pass, with a suit index 0-3. The
+              suit of a pass only matters for the dealer's forced bid after
+              four passes, where it is the chosen trump.
+"""
+from bitboard import iter_ids, legal_mask, popcount
+from card import Card
+from deck import Deck
+from game import TarneebGame
+from knowledge import Knowledge
+
+# Phases of a round
+BIDDING = 0
+PLAYING = 1
+DONE = 2
+
+COMPLETE = 52
+BID_BASE = 64
+PASS = BID_BASE
+
+# Four bids, 52 plays and 13 trick completions
+MAX_PLY = 69
+
+
+def bid_move(bid, suit=0):
+    """Move for a bid (0 to pass) with trump suit index ``suit``."""
+    return BID_BASE + bid * 4 + suit
+
+
+def is_bid(move):
+    return move >= BID_BASE
+
+
+def move_bid(move):
+    """``(bid, suit index)`` of a bid move."""
+    return (move - BID_BASE) >> 2, (move - BID_BASE) & 3
+
+
+def describe(move):
+    """Readable form of a move, for logs and debugging."""
+    if move == COMPLETE:
+        return "complete trick"
+    if is_bid(move):
+        bid, suit = move_bid(move)
+        return f"bid {bid} {Card.SUITS[suit]}" if bid else "pass"
+    return str(Card.from_id(move))
+
+
+def _sorted_cards(mask, cards):
+    """Cards of ``mask`` in the order ``Deck.deal`` sorts a hand."""
+    hand = [cards[card_id] for card_id in iter_ids(mask)]
+    Deck._sort_hand(hand)
+    return hand
+
+
+class GameState:
+    __slots__ = ("hands", "dealer", "phase", "to_move", "bids", "highest_bid", "bidder",
+                 "trump", "trick", "leader", "lead", "tricks_won", "trick_winner",
+                 "scores", "target_score", "moves", "undo_info", "ply")
+
+    def __init__(self, hands, dealer, scores=(0, 0), target_score=31):
+        self.hands = list(hands)  # Bitboard of each seat's remaining cards
+        self.dealer = dealer
+        self.phase = BIDDING
+        self.to_move = (dealer + 1) % 4
+        self.bids = [0, 0, 0, 0]
+        self.highest_bid = 0
+        self.bidder = -1
+        self.trump = -1  # Suit index, -1 before it is chosen
+        self.trick = [-1, -1, -1, -1]  # Card id played by each seat, -1 if none
+        self.leader = self.to_move
+        self.lead = -1  # Suit index of the trick's first card
+        self.tricks_won = [0, 0]
+        self.trick_winner = -1
+        self.scores = list(scores)
+        self.target_score = target_score
+        # Move stack and what undo needs for each move, preallocated so that
+        # undo only reads from it
+        self.moves = [0] * MAX_PLY
+        self.undo_info = [0] * MAX_PLY
+        self.ply = 0
+
+    def copy(self):
+        """Independent copy, including the move stack."""
+        state = GameState.__new__(GameState)
+        for name in GameState.__slots__:
+            value = getattr(self, name)
+            setattr(state, name, value[:] if isinstance(value, list) else value)
+        return state
+
+    def key(self):
+        """Hashable identity of the position, regardless of how it was reached."""
+        return (self.phase, self.to_move, self.trump, self.highest_bid, self.bidder,
+                tuple(self.hands), tuple(self.trick), tuple(self.bids),
+                self.leader, self.tricks_won[0], self.tricks_won[1])
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __eq__(self, other):
+        return isinstance(other, GameState) and self.key() == other.key()
+
+    def legal_moves(self):
+        """Every move the player to move may make."""
+        if self.phase == PLAYING:
+            if self.trick[(self.leader + 3) % 4] >= 0:
+                return [COMPLETE]
+            lead = Card.SUITS[self.lead] if self.lead >= 0 else None
+            return list(iter_ids(legal_mask(self.hands[self.to_move], lead)))
+        if self.phase == BIDDING:
+            if self.to_move == self.dealer and self.bidder < 0:
+                # Passing forces the dealer to take 7 with a trump of their choice
+                moves = [bid_move(0, suit) for suit in range(4)]
+            else:
+                moves = [PASS]
+            for bid in range(max(self.highest_bid + 1, 7), 14):
+                moves.extend(bid_move(bid, suit) for suit in range(4))
+            return moves
+        return []
+
+    def apply(self, move):
+        """Make a legal move (as returned by ``legal_moves``)."""
+        ply = self.ply
+        seat = self.to_move
+        self.moves[ply] = move
+        if move < COMPLETE:
+            self.undo_info[ply] = seat
+            self.hands[seat] ^= 1 << move
+            self.trick[seat] = move
+            if self.lead < 0:
+                self.lead = move // 13
+            self.to_move = (seat + 1) % 4
+        elif move == COMPLETE:
+            winner = self._trick_winner()
+            self.undo_info[ply] = winner | (self.trick_winner + 1) << 2 | self.leader << 5
+            self.tricks_won[winner % 2] += 1
+            self.trick[0] = self.trick[1] = self.trick[2] = self.trick[3] = -1
+            self.lead = -1
+            self.leader = self.to_move = self.trick_winner = winner
+            if self.tricks_won[0] + self.tricks_won[1] == 13:
+                self.phase = DONE
+        else:
+            bid, suit = move_bid(move)
+            self.undo_info[ply] = self.highest_bid | (self.bidder + 1) << 4 | (self.trump + 1) << 7
+            self.bids[seat] = bid
+            if bid > self.highest_bid:
+                self.highest_bid = bid
+                self.bidder = seat
+                self.trump = suit
+            self.to_move = (seat + 1) % 4
+            if seat == self.dealer:
+                if self.bidder < 0:
+                    # No one bid, the dealer is forced to bid 7
+                    self.highest_bid = 7
+                    self.bidder = seat
+                    self.trump = suit
+                self.phase = PLAYING
+        self.ply = ply + 1
+
+    def undo(self):
+        """Take back the last move."""
+        self.ply -= 1
+        ply = self.ply
+        move = self.moves[ply]
+        info = self.undo_info[ply]
+        if move < COMPLETE:
+            seat = info
+            self.hands[seat] ^= 1 << move
+            self.trick[seat] = -1
+            if seat == self.leader:
+                self.lead = -1
+            self.to_move = seat
+        elif move == COMPLETE:
+            winner = info & 3
+            leader = info >> 5
+            for i in range(4):
+                self.trick[(leader + i) % 4] = self.moves[ply - 4 + i]
+            self.lead = self.moves[ply - 4] // 13
+            self.tricks_won[winner % 2] -= 1
+            self.trick_winner = (info >> 2 & 7) - 1
+            self.leader = self.to_move = leader
+            self.phase = PLAYING
+        else:
+            seat = (self.to_move - 1) % 4
+            self.bids[seat] = 0
+            self.highest_bid = info & 15
+            self.bidder = (info >> 4 & 7) - 1
+            self.trump = (info >> 7 & 7) - 1
+            self.to_move = seat
+            self.phase = BIDDING
+
+    def _trick_winner(self):
+        """Seat winning the full current trick (same rules as ``Card.beats``)."""
+        trump = self.trump
+        seat = win_seat = self.leader
+        win_id = self.trick[seat]
+        for _ in range(3):
+            seat = (seat + 1) % 4
+            card_id = self.trick[seat]
+            suit = card_id // 13
+            win_suit = win_id // 13
+            if suit == win_suit:
+                if card_id > win_id:
+                    win_id, win_seat = card_id, seat
+            elif suit == trump:
+                win_id, win_seat = card_id, seat
+        return win_seat
+
+    def score_deltas(self):
+        """Points each team scores for the finished round, as ``TarneebGame.score_round``."""
+        bidding_team = self.bidder % 2
+        deltas = [self.tricks_won[0], self.tricks_won[1]]
+        if deltas[bidding_team] < self.highest_bid:
+            deltas[bidding_team] = -self.highest_bid
+        return deltas
+
+    def initial_hands(self):
+        """Bitboards of the hands as they were dealt."""
+        hands = self.hands[:]
+        for ply in range(self.ply):
+            if self.moves[ply] < COMPLETE:
+                hands[self.undo_info[ply]] |= 1 << self.moves[ply]
+        return hands
+
+    @classmethod
+    def from_game(cls, game):
+        """State of the current round of a ``TarneebGame``, with its full move history."""
+        played = [0, 0, 0, 0]
+        for seat, card in game.play_history:
+            played[seat] |= card.bit
+        state = cls([player.mask | played[i] for i, player in enumerate(game.players)],
+                    game.dealer, (game.scores[0], game.scores[1]), game.target_score)
+
+        # Replay the auction; only the winning bid's trump suit is known
+        trump = Card.SUIT_INDEX[game.trump_suit] if game.trump_suit is not None else 0
+        first = state.to_move
+        bids_made = (game.current_player - first) % 4 if game.bidding_phase else 4
+        for i in range(bids_made):
+            seat = (first + i) % 4
+            state.apply(bid_move(game.bids[seat], trump if seat == game.highest_bidder else 0))
+
+        for i, (seat, card) in enumerate(game.play_history):
+            state.apply(card.id)
+            if i % 4 == 3 and i // 4 < len(game.trick_winners):
+                state.apply(COMPLETE)
+
+        if state.to_move != game.current_player:
+            raise ValueError("game state is inconsistent with its history")
+        return state
+
+    def to_game(self, players=None):
+        """A ``TarneebGame`` in this state; ``players`` defaults to the usual four seats.
+
+        Hands are sorted as ``Deck.deal`` sorts them. A finished round is
+        left unscored with both phases off; call ``score_round`` to go on.
+        """
+        cards = [Card.from_id(card_id) for card_id in range(52)]
+        game = TarneebGame(self.target_score, players, dealer=self.dealer,
+                           hands=[_sorted_cards(mask, cards) for mask in self.hands])
+        game.scores = {0: self.scores[0], 1: self.scores[1]}
+        game.bidding_phase = self.phase == BIDDING
+        game.trick_phase = self.phase == PLAYING
+        game.bids = self.bids[:]
+        game.highest_bid = self.highest_bid
+        game.highest_bidder = self.bidder
+        game.trump_suit = Card.SUITS[self.trump] if self.trump >= 0 else None
+        game.tricks_won = {0: self.tricks_won[0], 1: self.tricks_won[1]}
+        game.current_trick = [cards[card_id] if card_id >= 0 else None for card_id in self.trick]
+        game.leading_suit = Card.SUITS[self.lead] if self.lead >= 0 else None
+        game.trick_winner = self.trick_winner if self.trick_winner >= 0 else None
+        game.trick_starter = self.leader
+        game.current_player = self.to_move
+        # What the table has seen is replayed from the start of the round
+        game.knowledge = Knowledge([popcount(mask) for mask in self.initial_hands()])
+        for ply in range(self.ply):
+            move = self.moves[ply]
+            if move < COMPLETE:
+                game.play_history.append((self.undo_info[ply], cards[move]))
+                game.knowledge.play(self.undo_info[ply], move)
+            elif move == COMPLETE:
+                game.trick_winners.append(self.undo_info[ply] & 3)
+                game.knowledge.complete_trick()
+        return game
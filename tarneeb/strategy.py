@@ -0,0 +1,126 @@
+"""Pluggable decision making for player seats.
+
+A strategy makes the three decisions of a seat: the bid (with its trump
+suit), the trump suit when the dealer is forced to bid, and the card to
+play. Every method gets the ``Player`` it decides for and the running
+``TarneebGame`` and must only rely on what that seat may see. Give a player
+a strategy with ``Player(name, seat, strategy=...)``; without one it uses
+``HeuristicStrategy``, the built-in AI.
+
+Strategies are named by spec strings such as ``"heuristic"`` or
+``"montecarlo:time_budget=0.05,workers=1"`` so they can be created inside
+worker processes (see ``make_strategy``).
+"""
+import abc
+import ast
+import importlib
+import random
+
+from card import Card
+
+# Spec name -> (module, class), imported on demand
+STRATEGIES = {
+    "heuristic": ("strategy", "HeuristicStrategy"),
+    "random": ("strategy", "RandomStrategy"),
+    "montecarlo": ("montecarlo", "MonteCarloStrategy"),
+    "cached": ("decisions", "CachedStrategy"),
+}
+
+
+class Strategy(abc.ABC):
+    """Interface of a seat's decisions; subclasses implement all three."""
+
+    name = "strategy"
+    # True if decisions take long enough that callers should run them off
+    # their main thread (see server.py)
+    blocking = False
+    # Decisions ("bid", "trump", "play") that depend only on the situation
+    # keys in decisions.py and are slow enough to be worth memoizing there
+    cacheable = ()
+
+    @abc.abstractmethod
+    def bid(self, player, game):
+        """Return ``(bid, trump_suit)``, or ``(0, None)`` to pass."""
+
+    @abc.abstractmethod
+    def choose_trump(self, player, game):
+        """Return the trump suit when the dealer is forced to take the bid."""
+
+    @abc.abstractmethod
+    def play(self, player, game):
+        """Return the hand index of the card to play."""
+
+    def close(self):
+        """Release any resources, such as worker processes."""
+
+    def __str__(self):
+        return self.name
+
+
+class HeuristicStrategy(Strategy):
+    """The built-in rule-based AI (``Player.ai_bid``, ``ai_trump`` and ``ai_play``)."""
+
+    name = "heuristic"
+    # A play takes about as long as a cache lookup, only the bids are worth keeping
+    cacheable = ("bid", "trump")
+
+    def bid(self, player, game):
+        return player.ai_bid(game.highest_bid, game.bids)
+
+    def choose_trump(self, player, game):
+        return player.ai_trump()
+
+    def play(self, player, game):
+        return player.ai_play(
+            [game.current_trick[i] for i in range(len(game.current_trick)) if i != player.id],
+            game.leading_suit,
+            game.trump_suit
+        )
+
+
+class RandomStrategy(Strategy):
+    """Uniformly random legal decisions, a floor for comparing other strategies."""
+
+    name = "random"
+
+    def __init__(self, seed=None, bid_rate=0.25):
+        self.rng = random.Random(seed)
+        self.bid_rate = bid_rate
+
+    def bid(self, player, game):
+        if game.highest_bid >= 13 or self.rng.random() >= self.bid_rate:
+            return 0, None
+        bid = max(game.highest_bid + 1, 7)
+        return bid, self.rng.choice(Card.SUITS)
+
+    def choose_trump(self, player, game):
+        return self.rng.choice(Card.SUITS)
+
+    def play(self, player, game):
+        return self.rng.choice(player.get_valid_cards(game.leading_suit))
+
+
+def parse_spec(spec):
+    """Split ``"name:key=value,..."`` into the name and keyword arguments."""
+    name, _, args = spec.partition(":")
+    kwargs = {}
+    for item in filter(None, args.split(",")):
+        key, _, value = item.partition("=")
+        try:
+            kwargs[key.strip()] = ast.literal_eval(value.strip())
+        except (ValueError, SyntaxError):
+            kwargs[key.strip()] = value.strip()
+    return name.strip(), kwargs
+
+
+def make_strategy(spec):
+    """Create a strategy from a spec string (or return a strategy unchanged)."""
+    if isinstance(spec, Strategy):
+        return spec
+    name, kwargs = parse_spec(spec)
+    if name not in STRATEGIES:
+        raise ValueError(f"unknown strategy {name!r}, expected one of {', '.join(STRATEGIES)}")
+    module, cls = STRATEGIES[name]
+    strategy = getattr(importlib.import_module(module), cls)(**kwargs)
+    strategy.name = spec
+    return strategy
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The modules import each other by plain name, as the scripts do
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
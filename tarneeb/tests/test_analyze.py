@@ -0,0 +1,16 @@
+from analyze import auction, bid_report, not_analysed
+
+
+def test_outbid_seat_that_wins_gets_a_trump():
+    # Seat 1 bids 8, seat 2 outbids it with 9 hearts
+    round_info = {"dealer": 0, "bids": [0, 8, 9, 0], "bidder": 2, "bid": 9, "forced": False, "trump": "hearts"}
+    tricks = [(9, 4), (6, 7), (4, 9), (5, 8)]
+    # Without seat 2's bid seat 1 plays 8 in the suit best for its team
+    assert auction(round_info, 1, (0, 0), tricks) == (1, 8, 2)
+    assert [bid["seat"] for bid in bid_report(round_info, tricks)] == [1, 2, 3, 0]
+
+
+def test_not_analysed():
+    assert not_analysed(13, True) == []
+    assert not_analysed(12, True) == ["card plays of trick 1"]
+    assert not_analysed(8, False) == ["card plays of tricks 1-5", "bids"]
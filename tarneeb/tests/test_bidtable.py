@@ -0,0 +1,16 @@
+import random
+
+import bidtable
+
+
+def test_fast_lookups_match_the_table():
+    rng = random.Random(1)
+    table = bidtable.get_table()
+    for _ in range(2000):
+        mask = sum(1 << card_id for card_id in rng.sample(range(52), 13))
+        assert bidtable.feature_indices(mask) == [bidtable.feature_index(mask, trump) for trump in range(4)]
+        if table is not None:
+            suit, row = bidtable.best_trump(mask)
+            table_suit, table_row = bidtable.best_trump(mask, table)
+            assert suit == table_suit
+            assert (row is None and table_row is None) or list(row) == list(table_row)
@@ -0,0 +1,104 @@
+import random
+
+import canonical
+from card import Card
+from solver import DoubleDummySolver
+
+LANE = 0x1FFF
+
+
+def random_position(rng):
+    """Hands, trump, lead and trick (card id per seat) of a random position mid-round."""
+    tricks = rng.randint(1, 5)
+    played = rng.randrange(4)
+    cards = rng.sample(range(52), 4 * tricks)
+    hands = [0, 0, 0, 0]
+    for i, card_id in enumerate(cards):
+        hands[i % 4] |= 1 << card_id
+    leader = rng.randrange(4)
+    trick = [-1, -1, -1, -1]
+    lead = -1
+    for i in range(played):
+        seat = (leader + i) % 4
+        held = [card_id for card_id in range(52) if hands[seat] >> card_id & 1]
+        follow = [card_id for card_id in held if card_id // 13 == lead]
+        card_id = rng.choice(follow or held)
+        hands[seat] &= ~(1 << card_id)
+        trick[seat] = card_id
+        if lead < 0:
+            lead = card_id // 13
+    return hands, rng.randrange(4), lead, trick, leader
+
+
+def transform(card_id, suits, ranks):
+    """Card id after moving suits by ``suits`` and ranks by ``ranks[suit]``."""
+    if card_id < 0:
+        return -1
+    suit, rank = divmod(card_id, 13)
+    return 13 * suits[suit] + ranks[suit][rank]
+
+
+def relabelled(rng, hands, trump, lead, trick):
+    """The position with free suits swapped and ranks spread out, keeping their order."""
+    free = [suit for suit in range(4) if suit not in (trump, lead)]
+    targets = rng.sample(free, len(free))
+    suits = list(range(4))
+    for suit, target in zip(free, targets):
+        suits[suit] = target
+    live = hands[0] | hands[1] | hands[2] | hands[3]
+    for card_id in trick:
+        if card_id >= 0:
+            live |= 1 << card_id
+    ranks = []
+    for suit in range(4):
+        in_play = [rank for rank in range(13) if live >> 13 * suit + rank & 1]
+        ranks.append(dict(zip(in_play, sorted(rng.sample(range(13), len(in_play))))))
+    new_hands = []
+    for hand in hands:
+        mask = 0
+        for card_id in range(52):
+            if hand >> card_id & 1:
+                mask |= 1 << transform(card_id, suits, ranks)
+        new_hands.append(mask)
+    new_trick = [transform(card_id, suits, ranks) for card_id in trick]
+    return new_hands, trump, suits[lead] if lead >= 0 else -1, new_trick
+
+
+def solve(hands, trump, trick, leader):
+    ordered = tuple(trick[(leader + i) % 4] for i in range(4) if trick[(leader + i) % 4] >= 0)
+    return DoubleDummySolver(Card.SUITS[trump]).solve(hands, leader, ordered)
+
+
+def test_restore_round_trips():
+    rng = random.Random(1)
+    for _ in range(500):
+        hands, trump, lead, trick, _ = random_position(rng)
+        position, relabeling = canonical.canonicalize(hands, trump, lead, trick)
+        assert canonical.restore(position, relabeling) == (tuple(hands), tuple(trick), trump, lead)
+        assert position.trump == 0
+        assert lead < 0 or lead == trump or position.lead == 1
+        for card_id, canonical_id in relabeling.cards.items():
+            assert relabeling.restore_card(canonical_id) == card_id
+        for hand, mask in zip(hands, position.hands):
+            assert relabeling.mask(hand) == mask
+            assert relabeling.restore_mask(mask) == hand
+
+
+def test_equivalent_positions_share_their_form():
+    rng = random.Random(2)
+    for _ in range(500):
+        hands, trump, lead, trick, _ = random_position(rng)
+        position, _ = canonical.canonicalize(hands, trump, lead, trick)
+        other, _ = canonical.canonicalize(*relabelled(rng, hands, trump, lead, trick))
+        assert other == position
+
+
+def test_canonical_positions_solve_the_same():
+    rng = random.Random(3)
+    for _ in range(100):
+        hands, trump, lead, trick, leader = random_position(rng)
+        position, _ = canonical.canonicalize(hands, trump, lead, trick)
+        other_hands, _, _, other_trick = relabelled(rng, hands, trump, lead, trick)
+        expected = solve(hands, trump, trick, leader)
+        assert solve(position.hands, position.trump, position.trick, leader) == expected
+        assert solve(other_hands, trump, other_trick, leader) == expected
@@ -0,0 +1,34 @@
+import threading
+
+from decisions import FLUSH_EVERY, DecisionCache
+
+
+def test_cache_is_shared_between_threads(tmp_path):
+    path = str(tmp_path / "decisions.db")
+    cache = DecisionCache(size=500, path=path)
+    errors = []
+
+    def work(offset):
+        try:
+            for i in range(2 * FLUSH_EVERY):
+                key = ("bid", offset + i, 7)
+                if cache.get(key) is None:
+                    cache.put(key, (8, "hearts"))
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=work, args=(1000 * n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    cache.close()
+    assert not errors
+    stats = cache.stats()
+    assert stats["lookups"] == 4 * 2 * FLUSH_EVERY
+    assert stats["entries"] == 500
+
+    # Everything reached the file, keys overlapping between threads once each
+    reopened = DecisionCache(size=10, path=path)
+    assert all(reopened.get(("bid", i, 7)) == (8, "hearts") for i in range(0, 5000, 7))
+    reopened.close()
@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+
+from server import Server
+
+
+class FakeConnection:
+    def __init__(self):
+        self.name = "Player"
+        self.table = None
+        self.seat = None
+        self.sent = []
+
+    def send(self, message):
+        self.sent.append(message)
+
+
+def join(server, **message):
+    async def run():
+        conn = FakeConnection()
+        server.dispatch(conn, dict(op="join", **message), 0.0)
+        for table in server.tables.values():
+            if table.runner is not None:
+                table.runner.cancel()
+        return conn
+    return asyncio.run(run())
+
+
+def test_clients_pick_strategies_by_name_only():
+    server = Server(strategies=["heuristic", "random:seed=1"])
+    assert join(server).table.game.players[1].strategy is server.strategies["heuristic"]
+    assert join(server, strategy="random").table.game.players[1].strategy is server.strategies["random"]
+    for spec in ("montecarlo", "random:seed=2", "cached:path='/tmp/anything.db'"):
+        conn = join(server, strategy=spec)
+        assert conn.table is None
+        assert conn.sent[-1]["type"] == "error"
+    assert list(server.strategies) == ["heuristic", "random"]
+    server.close()
+
+
+def test_strategy_names_are_unique():
+    with pytest.raises(ValueError):
+        Server(strategies=["random", "random:seed=1"])
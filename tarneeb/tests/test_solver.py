@@ -0,0 +1,106 @@
+import random
+from functools import lru_cache
+
+import pytest
+
+import ddcore
+from card import Card
+from solver import DoubleDummySolver
+from tricktable import strengths
+
+
+@lru_cache(maxsize=None)
+def minimax(hands, leader, trick, trump_suit):
+    """Tricks team 0 wins with every card of every seat tried (``hands`` a tuple)."""
+    if len(trick) == 4:
+        strength = strengths(Card.SUITS[trick[0] // 13], trump_suit)
+        winner = (leader + max(range(4), key=lambda i: strength[trick[i]])) % 4
+        won = 1 - winner % 2
+        if not any(hands):
+            return won
+        return won + minimax(hands, winner, (), trump_suit)
+
+    seat = (leader + len(trick)) % 4
+    hand = hands[seat]
+    follow = [card_id for card_id in range(52) if hand >> card_id & 1
+              and (not trick or card_id // 13 == trick[0] // 13)]
+    legal = follow or [card_id for card_id in range(52) if hand >> card_id & 1]
+    values = []
+    for card_id in legal:
+        after = list(hands)
+        after[seat] = hand & ~(1 << card_id)
+        values.append(minimax(tuple(after), leader, trick + (card_id,), trump_suit))
+    return max(values) if seat % 2 == 0 else min(values)
+
+
+def random_ending(rng):
+    """Hands, leader and trick of a random position 1 to 4 tricks from the end."""
+    tricks = rng.randint(1, 4)
+    # Few suits make for following, ruffing and discarding
+    suits = rng.sample(range(4), rng.randint(2, 4))
+    deck = [13 * suit + rank for suit in suits for rank in range(13)]
+    hands = [0, 0, 0, 0]
+    for i, card_id in enumerate(rng.sample(deck, 4 * tricks)):
+        hands[i % 4] |= 1 << card_id
+    leader = rng.randrange(4)
+    trick = ()
+    for _ in range(rng.randrange(4)):
+        seat = (leader + len(trick)) % 4
+        cards = [card_id for card_id in range(52) if hands[seat] >> card_id & 1]
+        follow = [card_id for card_id in cards if trick and card_id // 13 == trick[0] // 13]
+        card_id = rng.choice(follow or cards)
+        hands[seat] &= ~(1 << card_id)
+        trick += (card_id,)
+    return hands, leader, trick
+
+
+@pytest.fixture(params=[True, False], ids=["compiled", "python"])
+def compiled(request):
+    if request.param and ddcore.load() is None:
+        pytest.skip("no C compiler for the search core")
+    return request.param
+
+
+def test_solve_matches_minimax(compiled):
+    rng = random.Random(1)
+    solvers = {suit: DoubleDummySolver(suit, compiled=compiled) for suit in Card.SUITS + [None]}
+    for _ in range(300):
+        hands, leader, trick = random_ending(rng)
+        trump_suit = rng.choice(list(solvers))
+        remaining = (sum(bin(hand).count("1") for hand in hands) + len(trick)) // 4
+        expected = minimax(tuple(hands), leader, trick, trump_suit)
+        assert solvers[trump_suit].solve(hands, leader, trick) == (expected, remaining - expected)
+
+
+def test_solve_moves_matches_minimax(compiled):
+    rng = random.Random(2)
+    solvers = {suit: DoubleDummySolver(suit, compiled=compiled) for suit in Card.SUITS + [None]}
+    for _ in range(100):
+        hands, leader, trick = random_ending(rng)
+        trump_suit = rng.choice(list(solvers))
+        seat = (leader + len(trick)) % 4
+        remaining = (sum(bin(hand).count("1") for hand in hands) + len(trick)) // 4
+        values = solvers[trump_suit].solve_moves(hands, leader, trick)
+        follow = hands[seat] & (0x1FFF << 13 * (trick[0] // 13)) if trick else 0
+        assert sum(1 << card_id for card_id in values) == (follow or hands[seat])
+        for card_id, tricks in values.items():
+            after = list(hands)
+            after[seat] &= ~(1 << card_id)
+            team0 = minimax(tuple(after), leader, trick + (card_id,), trump_suit)
+            assert tricks == (team0 if seat % 2 == 0 else remaining - team0)
+
+
+def test_full_deal_agrees_with_python_search():
+    if ddcore.load() is None:
+        pytest.skip("no C compiler for the search core")
+    rng = random.Random(3)
+    deck = rng.sample(range(52), 52)
+    # Seven tricks keep the Python search quick
+    hands = [0, 0, 0, 0]
+    for i, card_id in enumerate(deck[:28]):
+        hands[i % 4] |= 1 << card_id
+    for trump_suit in ("spades", None):
+        fast = DoubleDummySolver(trump_suit)
+        slow = DoubleDummySolver(trump_suit, compiled=False)
+        for leader in range(4):
+            assert fast.solve(hands, leader) == slow.solve(hands, leader)
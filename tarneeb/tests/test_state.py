@@ -0,0 +1,49 @@
+import random
+
+from game import TarneebGame
+from state import GameState
+
+
+def play_into_round(seed, cards):
+    """A game with every seat AI, ``cards`` cards into the card play."""
+    random.seed(seed)
+    game = TarneebGame(dealer=0)
+    for player in game.players:
+        player.ai = True
+    while game.bidding_phase:
+        game.ai_turn()
+    for _ in range(cards):
+        if game.ai_turn() == "trick_complete":
+            game.complete_trick()
+    return game
+
+
+def test_to_game_keeps_knowledge():
+    for seed in range(20):
+        game = play_into_round(seed, 9 + seed)
+        copy = GameState.from_game(game).to_game()
+        for player in copy.players:
+            player.ai = True
+        assert copy.knowledge.unseen == game.knowledge.unseen
+        assert copy.knowledge.cannot == game.knowledge.cannot
+        assert copy.knowledge.sizes == game.knowledge.sizes
+        assert copy.knowledge.lead == game.knowledge.lead
+
+        seat = copy.current_player
+        hand = copy.players[seat].mask
+        sampler = copy.knowledge.sampler(seat, hand)
+        rng = random.Random(seed)
+        for _ in range(20):
+            hands = sampler.deal(rng)
+            assert hands[seat] == hand
+            assert hands[0] | hands[1] | hands[2] | hands[3] == copy.knowledge.unseen
+            for other in range(4):
+                assert not hands[other] & copy.knowledge.cannot[other]
+
+
+def test_mid_round_hands_are_the_cards_in_play():
+    game = play_into_round(3, 14)
+    hands = [list(player.hand) for player in game.players]
+    fresh = TarneebGame(dealer=0, hands=hands)
+    assert fresh.knowledge.unseen == game.knowledge.unseen
+    fresh.knowledge.sampler(0, fresh.players[0].mask).deal()
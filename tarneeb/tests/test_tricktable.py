@@ -0,0 +1,60 @@
+import random
+
+import numpy as np
+
+import tricktable
+from card import Card
+
+SUITS = Card.SUITS + [None]
+CARDS = [Card.from_id(card_id) for card_id in range(52)]
+
+
+def beats_winner(cards, leading_suit, trump_suit):
+    """Index of the winning card when ``Card.beats`` is applied in order."""
+    winner = None
+    index = -1
+    for i, card in enumerate(cards):
+        if card is not None and card.beats(winner, leading_suit, trump_suit):
+            winner = card
+            index = i
+    return index
+
+
+def test_strength_orders_cards_as_beats():
+    for trump_suit in SUITS:
+        for leading_suit in SUITS:
+            strength = tricktable.strengths(leading_suit, trump_suit)
+            for card in CARDS:
+                for other in CARDS:
+                    if card is not other:
+                        # A card beats the one winning so far exactly when it is stronger
+                        assert card.beats(other, leading_suit, trump_suit) == (strength[card.id] > strength[other.id])
+
+
+def test_winning_index_matches_beats():
+    rng = random.Random(1)
+    for _ in range(5000):
+        cards = [CARDS[card_id] for card_id in rng.sample(range(52), 4)]
+        for i in rng.sample(range(4), rng.randrange(3)):
+            cards[i] = None
+        leading_suit = rng.choice(SUITS)
+        trump_suit = rng.choice(SUITS)
+        assert tricktable.winning_index(cards, leading_suit, trump_suit) == beats_winner(cards, leading_suit, trump_suit)
+    assert tricktable.winning_index([None] * 4, "hearts", "spades") == -1
+
+
+def test_trick_winners_matches_beats():
+    rng = np.random.default_rng(2)
+    tricks = np.array([rng.choice(52, 4, replace=False) for _ in range(5000)])
+    trumps = rng.integers(-1, 4, len(tricks))
+    assert (tricktable.trick_winners(tricks, trumps)
+            == [beats_winner([CARDS[card_id] for card_id in trick], Card.SUITS[trick[0] // 13],
+                             Card.SUITS[trump] if trump >= 0 else None)
+                for trick, trump in zip(tricks, trumps)]).all()
+
+    # Given leads, empty places and one trump for all rows
+    tricks[:, 3] = -1
+    leads = rng.integers(0, 4, len(tricks))
+    assert (tricktable.trick_winners(tricks, 2, leads)
+            == [beats_winner([CARDS[card_id] for card_id in trick[:3]], Card.SUITS[lead], "hearts")
+                for trick, lead in zip(tricks, leads)]).all()
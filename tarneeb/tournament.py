@@ -0,0 +1,191 @@
+"""Self-play tournaments between AI strategies.
+
+Run from the repository root with for example
+
+    python -m tarneeb.tournament heuristic random -n 100000
+    python -m tarneeb.tournament heuristic "montecarlo:time_budget=0.02,workers=1" -n 200
+
+Every pairing is played as duplicate game pairs: both games of a pair start
+from the same RNG seed, so the first deal and dealer are the same, and the
+strategies swap seats (team 0 on seats 0/2, team 1 on seats 1/3) between the
+two games. Pairs are spread over a process pool. The report gives each
+strategy's win rate and Elo difference with 95% confidence intervals, taken
+over the pair scores (0, 0.5 or 1) because the two games of a pair are
+correlated.
+"""
+import argparse
+import itertools
+import json
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from game import TarneebGame
+from player import Player
+from simulate import chunk_seed, new_stats, play_game
+from strategy import make_strategy
+
+# Normal quantile for 95% confidence intervals
+Z_95 = 1.959964
+
+
+def new_result():
+    """Empty counters for one pairing, from the first strategy's point of view."""
+    return {
+        "games": 0,
+        "wins": 0,
+        "wins_by_team": [0, 0],  # Wins while seated as team 0 and as team 1
+        "pairs": 0,
+        "pair_score_total": 0.0,
+        "pair_score_squares": 0.0,
+        "margin_total": 0,
+    }
+
+
+def merge_result(total, part):
+    """Add the counters of ``part`` into ``total``."""
+    for key, value in part.items():
+        if isinstance(value, list):
+            total[key] = [a + b for a, b in zip(total[key], value)]
+        else:
+            total[key] += value
+    return total
+
+
+def play_seated(strategies, team_of_first, target_score):
+    """Play one game with ``strategies[0]`` on team ``team_of_first``; returns (won, margin)."""
+    players = []
+    for seat in range(4):
+        strategy = strategies[0] if seat % 2 == team_of_first else strategies[1]
+        players.append(Player(f"{strategy} {seat}", seat, strategy))
+    game = TarneebGame(target_score, players)
+    winner = play_game(game, new_stats())
+    margin = game.scores[team_of_first] - game.scores[1 - team_of_first]
+    return winner == team_of_first, margin
+
+
+def run_chunk(specs, seed, chunk_index, num_pairs, target_score=31):
+    """Play ``num_pairs`` duplicate pairs between two strategy specs (worker entry point)."""
+    strategies = [make_strategy(spec) for spec in specs]
+    result = new_result()
+    pair_seeds = random.Random(chunk_seed(seed, chunk_index))
+    try:
+        for _ in range(num_pairs):
+            game_seed = pair_seeds.getrandbits(48)
+            score = 0
+            for team in (0, 1):
+                random.seed(game_seed)
+                won, margin = play_seated(strategies, team, target_score)
+                result["games"] += 1
+                result["wins"] += won
+                result["wins_by_team"][team] += won
+                result["margin_total"] += margin
+                score += won
+            score /= 2
+            result["pairs"] += 1
+            result["pair_score_total"] += score
+            result["pair_score_squares"] += score * score
+    finally:
+        for strategy in strategies:
+            strategy.close()
+    return result
+
+
+def elo(score):
+    """Elo rating difference for an expected score, clamped away from 0 and 1."""
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return 400 * math.log10(score / (1 - score))
+
+
+def summarize_pairing(specs, result):
+    """Win rate, Elo and their confidence intervals for one pairing."""
+    pairs = max(result["pairs"], 1)
+    mean = result["pair_score_total"] / pairs
+    variance = max(result["pair_score_squares"] / pairs - mean * mean, 0.0)
+    error = Z_95 * math.sqrt(variance / max(pairs - 1, 1))
+    low, high = max(mean - error, 0.0), min(mean + error, 1.0)
+    games = max(result["games"], 1)
+    return {
+        "first": specs[0],
+        "second": specs[1],
+        "games": result["games"],
+        "win_rate": round(result["wins"] / games, 4),
+        "win_rate_ci": [round(low, 4), round(high, 4)],
+        "elo": round(elo(mean), 1),
+        "elo_ci": [round(elo(low), 1), round(elo(high), 1)],
+        "win_rate_by_team": [round(w / max(result["games"] / 2, 1), 4) for w in result["wins_by_team"]],
+        "average_score_margin": round(result["margin_total"] / games, 2),
+    }
+
+
+def run_tournament(specs, num_games, workers=None, seed=0, chunk_size=100, target_score=31):
+    """Play ``num_games`` games for every pairing of ``specs`` and return the summaries."""
+    workers = workers or os.cpu_count() or 1
+    num_pairs = (num_games + 1) // 2
+    pairings = list(itertools.combinations(specs, 2))
+    tasks = []
+    for pairing_index, pairing in enumerate(pairings):
+        for chunk_index, start in enumerate(range(0, num_pairs, chunk_size)):
+            size = min(chunk_size, num_pairs - start)
+            # Every pairing replays the same seeds, so all strategies see the same deals
+            tasks.append((pairing_index, pairing, chunk_index, size))
+
+    results = [new_result() for _ in pairings]
+    start = time.perf_counter()
+    if workers == 1:
+        for pairing_index, pairing, chunk_index, size in tasks:
+            merge_result(results[pairing_index], run_chunk(pairing, seed, chunk_index, size, target_score))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [(pairing_index, pool.submit(run_chunk, pairing, seed, chunk_index, size, target_score))
+                       for pairing_index, pairing, chunk_index, size in tasks]
+            for pairing_index, future in futures:
+                merge_result(results[pairing_index], future.result())
+    elapsed = time.perf_counter() - start
+
+    total_games = sum(result["games"] for result in results)
+    return {
+        "elapsed_sec": round(elapsed, 3),
+        "games_per_sec": round(total_games / max(elapsed, 1e-9), 1),
+        "workers": workers,
+        "pairings": [summarize_pairing(pairing, result) for pairing, result in zip(pairings, results)],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play AI strategies against each other.")
+    parser.add_argument("strategies", nargs="+", help="strategy specs, e.g. heuristic, random or montecarlo:time_budget=0.05")
+    parser.add_argument("-n", "--games", type=int, default=10000, help="games per pairing")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("-s", "--seed", type=int, default=0, help="base RNG seed")
+    parser.add_argument("--chunk-size", type=int, default=100, help="game pairs per worker task")
+    parser.add_argument("--target-score", type=int, default=31, help="score needed to win a game")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+    if len(args.strategies) < 2:
+        parser.error("need at least two strategies")
+    for spec in args.strategies:
+        make_strategy(spec).close()  # Fail early on unknown names or bad options
+
+    report = run_tournament(args.strategies, args.games, args.workers, args.seed,
+                            args.chunk_size, args.target_score)
+    if args.json:
+        print(json.dumps(report))
+        return
+
+    print(f"{report['elapsed_sec']}s, {report['games_per_sec']} games/s, {report['workers']} workers")
+    for pairing in report["pairings"]:
+        low, high = pairing["win_rate_ci"]
+        elo_low, elo_high = pairing["elo_ci"]
+        print(f"{pairing['first']} vs {pairing['second']}: {pairing['games']} games, "
+              f"win rate {pairing['win_rate']:.3f} [{low:.3f}, {high:.3f}], "
+              f"Elo {pairing['elo']:+.0f} [{elo_low:+.0f}, {elo_high:+.0f}]")
+
+
+if __name__ == "__main__":
+    main()
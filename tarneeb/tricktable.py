@@ -0,0 +1,85 @@
+"""Precomputed trick-winner tables.
+
+``Card.beats`` decides a trick one comparison at a time. Its rules amount to
+a strength per card that depends only on the trump and the led suit: trumps
+beat the led suit, which beats every other suit, ranks decide within a suit,
+and a card that neither follows nor trumps can never take the lead. So
+
+    STRENGTH[trump][lead][card_id]
+
+is that strength for suit indices ``trump`` and ``lead`` (``NO_SUIT`` when
+there is none), and a trick is won by its strongest card. Off-suit cards all
+have strength 0, and keeping the first of equally strong cards is what
+``beats`` does too.
+
+``NO_SUIT`` is 4, the last index, so the -1 used for "no suit" in
+``GameState`` and ``VecEnv`` picks the same row. ``STRENGTH_TABLE`` is the
+NumPy version with one extra column per row holding -1, which card id -1
+(no card) picks; ``trick_winners`` uses it to resolve any number of tricks
+in one call.
+"""
+import numpy as np
+
+from card import Card
+
+NO_SUIT = 4
+
+# Suit index of every suit name, and None for no suit
+SUIT_NUMBER = dict(Card.SUIT_INDEX)
+SUIT_NUMBER[None] = NO_SUIT
+
+
+def _strength(card_id, trump, lead):
+    suit, rank = divmod(card_id, 13)
+    if suit == trump:
+        return 27 + rank
+    if suit == lead:
+        return 14 + rank
+    return 0
+
+
+STRENGTH = [[[_strength(card_id, trump, lead) for card_id in range(52)]
+             for lead in range(5)] for trump in range(5)]
+
+STRENGTH_TABLE = np.array([[row + [-1] for row in rows] for rows in STRENGTH], dtype=np.int8)
+
+
+def strengths(leading_suit, trump_suit):
+    """Strength of every card id for suit names (or None)."""
+    return STRENGTH[SUIT_NUMBER[trump_suit]][SUIT_NUMBER[leading_suit]]
+
+
+def winning_index(cards, leading_suit, trump_suit):
+    """Index of the card that wins among ``cards`` (``Card`` or None), or -1 if there are none."""
+    strength = STRENGTH[SUIT_NUMBER[trump_suit]][SUIT_NUMBER[leading_suit]]
+    best = -1
+    winner = -1
+    i = 0
+    for card in cards:
+        if card is not None:
+            value = strength[card.id]
+            if value > best:
+                best = value
+                winner = i
+        i += 1
+    return winner
+
+
+def trick_winners(tricks, trumps, leads=None):
+    """Column of the winning card of every row of an ``(n, k)`` array of card ids.
+
+    ``trumps`` and ``leads`` are suit indices per row (or one for all rows),
+    with -1 or ``NO_SUIT`` for none; card id -1 marks an empty place. With
+    ``leads`` None the first column is taken to be the led card. Ties go to
+    the first column, as with ``Card.beats`` applied in column order.
+    """
+    tricks = np.asarray(tricks, dtype=np.int64)
+    if leads is None:
+        leads = tricks[:, 0] // 13
+    trumps = np.asarray(trumps, dtype=np.int64)
+    leads = np.asarray(leads, dtype=np.int64)
+    if trumps.ndim:
+        trumps = trumps[:, None]
+    if leads.ndim:
+        leads = leads[:, None]
+    return np.argmax(STRENGTH_TABLE[trumps, leads, tricks], axis=1)
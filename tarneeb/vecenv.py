@@ -0,0 +1,221 @@
+"""Batched Tarneeb environment for training agents.
+
+``VecEnv(num_tables)`` runs many games in lockstep. All table state lives in
+NumPy arrays and every ``step`` applies one action per table with array
+operations, so the cost per step barely depends on Python per table.
+
+Each table is a full game to ``target_score``: bidding, 13 tricks per round,
+scoring as in ``TarneebGame.score_round`` and a new deal with the next
+dealer. A single policy plays whichever seat is to move, and observations
+are given from that seat's point of view (its own team first). Actions:
+
+    0-51      play the card with that id
+    PASS      pass in the auction
+    53-80     bid ``7 + (action - 53) // 4`` with trump suit ``(action - 53) % 4``
+
+Tricks are collected as soon as the fourth card is played. When everyone
+passes, the dealer may not pass and must bid, which has the same effect as
+the engine's forced bid of 7 with a trump of the dealer's choice.
+
+``step`` returns ``(observations, rewards, dones, info)``. Rewards are the
+points each team scored when a round ends, shaped ``(num_tables, 2)`` by
+team. Finished games start over automatically; the observation returned
+for them is the first one of the new game.
+"""
+import numpy as np
+
+import tricktable
+
+NUM_CARDS = 52
+PASS = 52
+BID_BASE = 53
+NUM_ACTIONS = BID_BASE + 7 * 4
+
+# Phases of a table
+BIDDING = 0
+PLAYING = 1
+
+SUIT_OF = np.arange(NUM_CARDS) // 13
+# Rank of the lowest bid each bid action makes
+BID_OF = 7 + np.arange(7 * 4) // 4
+
+
+class VecEnv:
+    def __init__(self, num_tables, target_score=31, seed=None):
+        self.num_tables = num_tables
+        self.target_score = target_score
+        self.rng = np.random.default_rng(seed)
+        n = num_tables
+        self.rows = np.arange(n)
+
+        self.hands = np.zeros((n, 4, NUM_CARDS), dtype=bool)  # Cards each seat holds
+        self.played = np.zeros((n, NUM_CARDS), dtype=bool)  # Cards played this round
+        self.trick = np.full((n, 4), -1, dtype=np.int8)  # Card id played by each seat
+        self.trick_size = np.zeros(n, dtype=np.int8)
+        self.leader = np.zeros(n, dtype=np.int8)
+        self.lead = np.full(n, -1, dtype=np.int8)  # Suit index of the trick's first card
+        self.to_move = np.zeros(n, dtype=np.int8)
+        self.dealer = np.zeros(n, dtype=np.int8)
+        self.phase = np.zeros(n, dtype=np.int8)
+        self.bids = np.zeros((n, 4), dtype=np.int8)
+        self.highest_bid = np.zeros(n, dtype=np.int8)
+        self.bidder = np.full(n, -1, dtype=np.int8)
+        self.trump = np.full(n, -1, dtype=np.int8)
+        self.tricks_won = np.zeros((n, 2), dtype=np.int8)
+        self.tricks_played = np.zeros(n, dtype=np.int8)
+        self.scores = np.zeros((n, 2), dtype=np.int16)
+        self.legal = np.zeros((n, NUM_ACTIONS), dtype=bool)
+
+    def reset(self):
+        """Start a new game at every table; returns the observations."""
+        self._new_games(self.rows)
+        return self.observe()
+
+    def _new_games(self, rows):
+        self.scores[rows] = 0
+        self.dealer[rows] = self.rng.integers(0, 4, len(rows))
+        self._deal(rows)
+
+    def _deal(self, rows):
+        """Shuffle and deal a new round at ``rows``."""
+        k = len(rows)
+        decks = np.argsort(self.rng.random((k, NUM_CARDS)), axis=1)
+        hands = np.zeros((k, 4, NUM_CARDS), dtype=bool)
+        hands[np.arange(k)[:, None], np.arange(NUM_CARDS) // 13, decks] = True
+        self.hands[rows] = hands
+        self.played[rows] = False
+        self.trick[rows] = -1
+        self.trick_size[rows] = 0
+        self.lead[rows] = -1
+        self.phase[rows] = BIDDING
+        self.bids[rows] = 0
+        self.highest_bid[rows] = 0
+        self.bidder[rows] = -1
+        self.trump[rows] = -1
+        self.tricks_won[rows] = 0
+        self.tricks_played[rows] = 0
+        # The player after the dealer bids and leads first
+        self.leader[rows] = self.to_move[rows] = (self.dealer[rows] + 1) % 4
+
+    def legal_actions(self):
+        """``(num_tables, NUM_ACTIONS)`` mask of the legal actions at every table."""
+        legal = self.legal
+        legal[:] = False
+
+        play = np.flatnonzero(self.phase == PLAYING)
+        hand = self.hands[play, self.to_move[play]]
+        follow = hand & (SUIT_OF == self.lead[play, None])
+        can_follow = follow.any(axis=1, keepdims=True)
+        legal[play, :NUM_CARDS] = np.where(can_follow, follow, hand)
+
+        bid = np.flatnonzero(self.phase == BIDDING)
+        forced = (self.to_move[bid] == self.dealer[bid]) & (self.bidder[bid] < 0)
+        legal[bid, PASS] = ~forced
+        legal[bid, BID_BASE:] = BID_OF > self.highest_bid[bid, None]
+        return legal
+
+    def observe(self):
+        """Observations of the seat to move at every table, as a dict of arrays."""
+        rows = self.rows
+        seat = self.to_move.astype(np.int64)
+        order = (seat[:, None] + np.arange(4)) % 4  # Seats from the mover's point of view
+        team = seat % 2
+        teams = np.stack([team, 1 - team], axis=1)
+        bidder = np.where(self.bidder >= 0, (self.bidder - seat) % 4, -1)
+        return {
+            "seat": seat,
+            "phase": self.phase.copy(),
+            "hand": self.hands[rows, seat].copy(),
+            "played": self.played.copy(),
+            "trick": self.trick[rows[:, None], order],
+            "lead": self.lead.copy(),
+            "trump": self.trump.copy(),
+            "bids": self.bids[rows[:, None], order],
+            "highest_bid": self.highest_bid.copy(),
+            "bidder": bidder.astype(np.int8),
+            "tricks_won": self.tricks_won[rows[:, None], teams],
+            "scores": self.scores[rows[:, None], teams],
+            "legal": self.legal_actions().copy(),
+        }
+
+    def step(self, actions):
+        """Apply one action per table; see the module docstring for the result."""
+        actions = np.asarray(actions, dtype=np.int64)
+        legal = self.legal_actions()
+        if not legal[self.rows, actions].all():
+            bad = np.flatnonzero(~legal[self.rows, actions])
+            raise ValueError(f"illegal actions at tables {bad[:10].tolist()}")
+
+        bidding = np.flatnonzero(self.phase == BIDDING)
+        playing = np.flatnonzero(self.phase == PLAYING)
+        self._bid(bidding, actions[bidding])
+        rewards = np.zeros((self.num_tables, 2), dtype=np.int16)
+        round_over = self._play(playing, actions[playing], rewards)
+
+        dones = np.zeros(self.num_tables, dtype=bool)
+        if len(round_over):
+            dones[round_over] = self.scores[round_over].max(axis=1) >= self.target_score
+            # TarneebGame.winner checks team 0 first
+            winners = np.where(dones, np.where(self.scores[:, 0] >= self.target_score, 0, 1), -1)
+            finished = np.flatnonzero(dones)
+            going_on = round_over[~dones[round_over]]
+            self.dealer[going_on] = (self.dealer[going_on] + 1) % 4
+            self._deal(going_on)
+            self._new_games(finished)
+        else:
+            winners = np.full(self.num_tables, -1)
+
+        info = {"round_over": np.isin(self.rows, round_over), "winner": winners}
+        return self.observe(), rewards, dones, info
+
+    def _bid(self, rows, actions):
+        seat = self.to_move[rows]
+        bid = np.where(actions == PASS, 0, 7 + (actions - BID_BASE) // 4)
+        self.bids[rows, seat] = bid
+        higher = bid > self.highest_bid[rows]
+        raised = rows[higher]
+        self.highest_bid[raised] = bid[higher]
+        self.bidder[raised] = seat[higher]
+        self.trump[raised] = (actions[higher] - BID_BASE) % 4
+
+        # The auction ends after the dealer, who bids last
+        closed = seat == self.dealer[rows]
+        done = rows[closed]
+        self.phase[done] = PLAYING
+        self.to_move[rows] = (seat + 1) % 4
+        self.to_move[done] = self.leader[done]
+
+    def _play(self, rows, cards, rewards):
+        """Play ``cards``, collect full tricks and score finished rounds; returns those rows."""
+        seat = self.to_move[rows]
+        self.hands[rows, seat, cards] = False
+        self.played[rows, cards] = True
+        self.trick[rows, seat] = cards
+        first = self.lead[rows] < 0
+        self.lead[rows[first]] = SUIT_OF[cards[first]]
+        self.trick_size[rows] += 1
+        self.to_move[rows] = (seat + 1) % 4
+
+        full = rows[self.trick_size[rows] == 4]
+        if len(full) == 0:
+            return full
+        winner = tricktable.trick_winners(self.trick[full], self.trump[full], self.lead[full]).astype(np.int8)
+        self.tricks_won[full, winner % 2] += 1
+        self.tricks_played[full] += 1
+        self.trick[full] = -1
+        self.trick_size[full] = 0
+        self.lead[full] = -1
+        self.leader[full] = self.to_move[full] = winner
+
+        over = full[self.tricks_played[full] == 13]
+        if len(over):
+            # TarneebGame.score_round: the bidding team scores its tricks if it
+            # made the bid and loses the bid otherwise; the others score their tricks
+            team = (self.bidder[over] % 2).astype(np.int64)
+            won = self.tricks_won[over].astype(np.int16)
+            made = won[np.arange(len(over)), team] >= self.highest_bid[over]
+            won[np.arange(len(over)), team] = np.where(made, won[np.arange(len(over)), team],
+                                                       -self.highest_bid[over])
+            rewards[over] = won
+            self.scores[over] += won
+        return over